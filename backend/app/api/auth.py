@@ -2,34 +2,49 @@ import uuid
 import logging
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.models.user import User
 from app.schemas.auth import LoginRequest, RegisterRequest, TokenResponse, UserResponse
-from app.utils.auth import create_access_token, hash_password, verify_password
+from app.services.password_hasher import PasswordHasherBusy, password_hasher
+from app.utils.auth import create_access_token
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
+def _busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-ins right now. Please try again in a moment.",
+        headers={"Retry-After": "2"},
+    )
+
+
 @router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
-def register(request: RegisterRequest, db: Session = Depends(get_db)):
-    if db.query(User).filter(User.email == request.email).first():
+async def register(request: RegisterRequest, db: AsyncSession = Depends(get_db)):
+    if await db.scalar(select(User.id).where(User.email == request.email)):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="An account with this email already exists.",
         )
 
+    try:
+        password_hash = await password_hasher.hash(request.password)
+    except PasswordHasherBusy:
+        raise _busy()
+
     user = User(
         id=str(uuid.uuid4()),
         email=request.email,
-        password_hash=hash_password(request.password),
+        password_hash=password_hash,
         name=request.name.strip(),
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
     logger.info("New user registered: %s", user.email)
     token = create_access_token(user.id)
@@ -37,14 +52,26 @@ def register(request: RegisterRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(request: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == request.email).first()
+async def login(request: LoginRequest, db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(User).where(User.email == request.email))
 
-    if not user or not verify_password(request.password, user.password_hash):
+    valid, new_hash = False, None
+    if user:
+        try:
+            valid, new_hash = await password_hasher.verify(request.password, user.password_hash)
+        except PasswordHasherBusy:
+            raise _busy()
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password.",
         )
 
+    if new_hash:
+        # BCRYPT_ROUNDS changed since this hash was made — upgrade it in place
+        user.password_hash = new_hash
+        await db.commit()
+        logger.info("Rehashed password for user %s at bcrypt cost %d", user.id, password_hasher.rounds)
+
     token = create_access_token(user.id)
     return TokenResponse(token=token, user=UserResponse.model_validate(user))
@@ -1,86 +1,156 @@
+import asyncio
+import hashlib
+import json
 import logging
 import uuid
-from typing import List, Optional
+from typing import Dict, List, Optional
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import AsyncSessionLocal, get_db
+from app.models.flashcard import Flashcard
 from app.models.lecture import Lecture, ProcessingStatus
-from app.models.user import User
+from app.models.lecture_bundle import LectureBundle
+from app.models.mcq import MCQ
+from app.models.note import Note
+from app.models.pipeline_checkpoint import PipelineCheckpoint, PipelineStage
+from app.models.resource import Resource
+from app.models.transcript import Transcript
+from app.models.transcript_segment import TranscriptSegment
 from app.schemas.lecture import (
     FlashcardResponse,
     LectureDetailResponse,
     LectureResponse,
     LectureStatusResponse,
     MCQResponse,
+    NotesResponse,
+    PartialTranscriptResponse,
+    ProgressStreamRequest,
+    ProgressStreamResponse,
     ResourceResponse,
     TranscriptData,
+    TranscriptSegmentPage,
+    TranscriptSegmentResponse,
+    UploadInitRequest,
+    UploadInitResponse,
 )
+from app.services.lecture_bundle import (
+    DETAIL_SECTIONS,
+    build_lecture_detail,
+    bundle_key,
+    is_bundled,
+    load_bundle,
+    transcript_data,
+    write_bundle,
+)
+from app.services.principal_cache import Principal
+from app.services.progress_events import TERMINAL_STATUSES, progress_broadcaster, publish_progress
 from app.services.storage import storage_service
 from app.tasks.process_lecture import process_lecture_task
-from app.utils.auth import get_current_user
+from app.config import settings
+from app.utils.auth import (
+    create_events_token,
+    create_upload_token,
+    decode_events_token,
+    decode_upload_token,
+    get_current_user,
+)
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 ALLOWED_EXTENSIONS = {"mp3", "wav", "m4a", "ogg", "flac"}
 MAX_FILE_SIZE_BYTES = 100 * 1024 * 1024  # 100 MB
+UPLOAD_CHUNK_BYTES = 1024 * 1024          # read/write granularity for uploads
+SSE_KEEPALIVE_SECONDS = 15
 
 
-@router.post("/upload", response_model=LectureResponse, status_code=status.HTTP_201_CREATED)
-async def upload_lecture(
-    file: UploadFile = File(...),
-    title: Optional[str] = Form(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
-    # ── Validate file type ──────────────────────────────────────────────
-    filename = file.filename or "upload"
+def _extension_or_400(filename: str) -> str:
     ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
     if ext not in ALLOWED_EXTENSIONS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"File type '.{ext}' not supported. Allowed: {', '.join(sorted(ALLOWED_EXTENSIONS))}",
         )
+    return ext
 
-    # ── Read + validate size ────────────────────────────────────────────
-    file_bytes = await file.read()
-    if not file_bytes:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Uploaded file is empty.")
-    if len(file_bytes) > MAX_FILE_SIZE_BYTES:
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail="File too large. Maximum allowed size is 100 MB.",
-        )
 
-    # ── Store audio ─────────────────────────────────────────────────────
-    lecture_id = str(uuid.uuid4())
+def _lecture_title(title: Optional[str], filename: str) -> str:
+    return (title or filename.rsplit(".", 1)[0]).strip()[:200] or "Untitled Lecture"
+
+
+async def _queue_processing(lecture_id: str, status_value: str, progress: int, user_id: str) -> None:
+    """Announce the new state and queue the pipeline — both are blocking
+    network calls (Redis, broker), so they run off the event loop."""
+    await run_in_threadpool(publish_progress, lecture_id, status_value, progress, user_id=user_id)
+    await run_in_threadpool(process_lecture_task.delay, lecture_id)
+
+
+async def _stream_to_storage(file: UploadFile, lecture_id: str, ext: str) -> str:
+    """Copy an UploadFile into storage chunk by chunk. Returns the storage key."""
+    writer = storage_service.open_writer(lecture_id, ext)
+    size = 0
     try:
-        storage_key = storage_service.save_audio(file_bytes, lecture_id, ext)
+        while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+            size += len(chunk)
+            if size > MAX_FILE_SIZE_BYTES:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail="File too large. Maximum allowed size is 100 MB.",
+                )
+            await run_in_threadpool(writer.write, chunk)
+        if size == 0:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Uploaded file is empty.")
+        return await run_in_threadpool(writer.commit)
+    except HTTPException:
+        await run_in_threadpool(writer.abort)
+        raise
     except Exception as e:
+        await run_in_threadpool(writer.abort)
         logger.error("Audio storage failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to store the audio file. Please try again.",
         )
 
+
+@router.post("/upload", response_model=LectureResponse, status_code=status.HTTP_201_CREATED)
+async def upload_lecture(
+    file: UploadFile = File(...),
+    title: Optional[str] = Form(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    # ── Validate file type ──────────────────────────────────────────────
+    filename = file.filename or "upload"
+    ext = _extension_or_400(filename)
+
+    # ── Stream to storage, validating size as we go ─────────────────────
+    lecture_id = str(uuid.uuid4())
+    storage_key = await _stream_to_storage(file, lecture_id, ext)
+
     # ── Create DB record ────────────────────────────────────────────────
-    lecture_title = (title or filename.rsplit(".", 1)[0]).strip()[:200] or "Untitled Lecture"
+    lecture_title = _lecture_title(title, filename)
     lecture = Lecture(
         id=lecture_id,
         user_id=current_user.id,
         title=lecture_title,
         s3_key=storage_key,
-        status=ProcessingStatus.UPLOADING,
+        status=ProcessingStatus.PROCESSING,   # audio is stored — queued right below
         progress=0,
     )
     db.add(lecture)
-    db.commit()
-    db.refresh(lecture)
+    await db.commit()
+    await db.refresh(lecture)
 
     # ── Queue Celery task ───────────────────────────────────────────────
-    process_lecture_task.delay(lecture_id)
+    await _queue_processing(lecture_id, lecture.status.value, 0, current_user.id)
     logger.info(
         "Lecture %s uploaded by user %s → %s backend",
         lecture_id, current_user.id, storage_service.get_backend()
@@ -89,31 +159,134 @@ async def upload_lecture(
     return lecture
 
 
+# ---------------------------------------------------------------------------
+# Direct upload: init → client uploads to storage → finalize
+#
+# S3: the client POSTs straight to the bucket with a presigned form, so
+# audio bytes never pass through the API. Local storage: the same form is
+# POSTed to /uploads/local, authorised by a short-lived upload token.
+# ---------------------------------------------------------------------------
+
+@router.post("/uploads", response_model=UploadInitResponse, status_code=status.HTTP_201_CREATED)
+async def init_direct_upload(
+    body: UploadInitRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    ext = _extension_or_400(body.filename)
+    lecture_id = str(uuid.uuid4())
+    storage_key = storage_service.storage_key_for(lecture_id, ext)
+    expiry = settings.upload_url_expiry_seconds
+
+    target = await run_in_threadpool(
+        storage_service.get_presigned_upload,
+        storage_key, f"audio/{ext}", MAX_FILE_SIZE_BYTES, expiry=expiry,
+    )
+    if target is None:
+        target = {
+            "url": str(request.url_for("upload_local_target")),
+            "fields": {"token": create_upload_token(lecture_id, expiry)},
+        }
+
+    lecture = Lecture(
+        id=lecture_id,
+        user_id=current_user.id,
+        title=_lecture_title(body.title, body.filename),
+        s3_key=storage_key,
+        status=ProcessingStatus.UPLOADING,
+        progress=0,
+    )
+    db.add(lecture)
+    await db.commit()
+    await run_in_threadpool(publish_progress, lecture_id, lecture.status.value, 0, user_id=current_user.id)
+
+    return UploadInitResponse(
+        lecture_id=lecture_id,
+        url=target["url"],
+        fields=target["fields"],
+        max_bytes=MAX_FILE_SIZE_BYTES,
+        expires_in=expiry,
+    )
+
+
+@router.post("/uploads/local", status_code=status.HTTP_204_NO_CONTENT, name="upload_local_target")
+async def upload_local_target(
+    token: str = Form(...),
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db),
+):
+    """Local-storage stand-in for the S3 presigned POST target."""
+    lecture_id = decode_upload_token(token)
+    if not lecture_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid or expired upload token.")
+    lecture = await db.get(Lecture, lecture_id)
+    if not lecture or lecture.status != ProcessingStatus.UPLOADING:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Upload is not pending for this lecture.")
+
+    ext = lecture.s3_key.rsplit(".", 1)[-1]
+    await _stream_to_storage(file, lecture_id, ext)
+
+
+@router.post("/{lecture_id}/finalize", response_model=LectureResponse)
+async def finalize_direct_upload(
+    lecture_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    lecture = await _get_lecture_or_404(db, lecture_id, current_user.id)
+    if lecture.status != ProcessingStatus.UPLOADING:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Lecture has already been finalized.")
+
+    size = await run_in_threadpool(storage_service.get_size, lecture.s3_key)
+    if not size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No uploaded audio found for this lecture. Upload the file before finalizing.",
+        )
+    if size > MAX_FILE_SIZE_BYTES:
+        await run_in_threadpool(storage_service.delete_audio, lecture.s3_key)
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="File too large. Maximum allowed size is 100 MB.",
+        )
+
+    lecture.status = ProcessingStatus.PROCESSING
+    await db.commit()
+    await db.refresh(lecture)
+
+    await _queue_processing(lecture_id, lecture.status.value, lecture.progress, current_user.id)
+    logger.info(
+        "Lecture %s finalized by user %s (%d bytes) → %s backend",
+        lecture_id, current_user.id, size, storage_service.get_backend()
+    )
+    return lecture
+
+
 @router.get("", response_model=List[LectureResponse])
-def list_lectures(
+async def list_lectures(
     page: int = 1,
     limit: int = 20,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    lectures = (
-        db.query(Lecture)
-        .filter(Lecture.user_id == current_user.id)
+    lectures = await db.scalars(
+        select(Lecture)
+        .where(Lecture.user_id == current_user.id)
         .order_by(Lecture.uploaded_at.desc())
         .offset((page - 1) * limit)
         .limit(min(limit, 50))
-        .all()
     )
-    return lectures
+    return lectures.all()
 
 
 @router.get("/{lecture_id}/status", response_model=LectureStatusResponse)
-def get_status(
+async def get_status(
     lecture_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    lecture = _get_lecture_or_404(db, lecture_id, current_user.id)
+    lecture = await _get_lecture_or_404(db, lecture_id, current_user.id)
     return LectureStatusResponse(
         id=lecture.id,
         status=lecture.status.value,
@@ -122,65 +295,569 @@ def get_status(
     )
 
 
-@router.get("/{lecture_id}", response_model=LectureDetailResponse)
-def get_lecture(
+async def _snapshot_from_db(lecture_id: str) -> Optional[dict]:
+    async with AsyncSessionLocal() as db:
+        lecture = await db.get(Lecture, lecture_id)
+        if not lecture:
+            return None
+        return {
+            "id": lecture.id,
+            "status": lecture.status.value,
+            "progress": lecture.progress,
+            "error_message": lecture.error_message,
+            "user_id": lecture.user_id,
+        }
+
+
+async def _progress_snapshot(lecture_id: str) -> Optional[dict]:
+    """Latest state from Redis; Postgres only if nothing was published yet."""
+    try:
+        snapshot = await progress_broadcaster.snapshot(lecture_id)
+    except Exception as e:
+        logger.warning("Progress snapshot unavailable for %s: %s", lecture_id, e)
+        snapshot = None
+    if snapshot and snapshot.get("user_id"):
+        return snapshot
+    return await _snapshot_from_db(lecture_id)
+
+
+def _sse(event: dict) -> str:
+    return f"event: progress\ndata: {json.dumps(event)}\n\n"
+
+
+def _public_event(snapshot: dict) -> dict:
+    return {k: v for k, v in snapshot.items() if k != "user_id"}
+
+
+async def _progress_stream(request: Request, queue: asyncio.Queue, snapshots: Dict[str, dict]):
+    """One stream for several lectures; ends once every one has completed or failed."""
+    latest = {lecture_id: _public_event(snap) for lecture_id, snap in snapshots.items()}
+    try:
+        yield "retry: 5000\n\n"
+        for event in latest.values():
+            yield _sse(event)
+        pending = {i for i, event in latest.items() if event["status"] not in TERMINAL_STATUSES}
+        while pending:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                # A pub/sub message can be missed (listener still subscribing,
+                # Redis reconnect, slow-client drop) — re-read the stored state
+                # so a finished lecture still ends the stream
+                changed = []
+                for lecture_id in sorted(pending):
+                    snapshot = await _progress_snapshot(lecture_id)
+                    if snapshot is None:
+                        pending.discard(lecture_id)   # deleted meanwhile
+                        continue
+                    event = _public_event(snapshot)
+                    last = latest[lecture_id]
+                    if (event["status"], event["progress"]) != (last["status"], last["progress"]):
+                        changed.append(event)
+                if not changed:
+                    yield ": keepalive\n\n"
+                for event in changed:
+                    latest[event["id"]] = event
+                    yield _sse(event)
+                    if event["status"] in TERMINAL_STATUSES:
+                        pending.discard(event["id"])
+                continue
+
+            if event["id"] not in pending:
+                continue
+            latest[event["id"]] = event
+            yield _sse(event)
+            if event["status"] in TERMINAL_STATUSES:
+                pending.discard(event["id"])
+    finally:
+        for lecture_id in snapshots:
+            progress_broadcaster.unsubscribe(lecture_id, queue)
+
+
+@router.post("/events/token", response_model=ProgressStreamResponse)
+async def create_progress_stream(
+    body: ProgressStreamRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """
+    URL of a progress stream over the given lectures. EventSource can't send
+    an Authorization header, so the URL carries a token that is valid only
+    for these lectures and only for EVENTS_TOKEN_EXPIRY_SECONDS — not the
+    login JWT, which would otherwise land in access logs and history.
+    """
+    lecture_ids = list(dict.fromkeys(body.lecture_ids))
+    owned = set((await db.scalars(
+        select(Lecture.id).where(Lecture.id.in_(lecture_ids), Lecture.user_id == current_user.id)
+    )).all())
+    if len(owned) != len(lecture_ids):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lecture not found.")
+
+    expiry = settings.events_token_expiry_seconds
+    token = create_events_token(current_user.id, lecture_ids, expiry)
+    return ProgressStreamResponse(
+        url=str(request.url_for("stream_progress").include_query_params(token=token)),
+        expires_in=expiry,
+    )
+
+
+@router.get("/events", name="stream_progress")
+async def stream_progress(
+    request: Request,
+    token: str = Query(..., description="Token from POST /api/lectures/events/token"),
+):
+    """
+    Server-sent events with the same payload as /status for every lecture
+    the token covers — one connection however many lectures are processing —
+    pushed on every change until each completes or fails. Progress comes
+    from Redis, so waiting clients don't hit Postgres.
+    """
+    scope = decode_events_token(token)
+    if not scope:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired stream token.")
+    user_id, lecture_ids = scope
+
+    # Subscribe before reading the snapshots so no update falls in between
+    queue: asyncio.Queue = asyncio.Queue(maxsize=100)
+    for lecture_id in lecture_ids:
+        progress_broadcaster.subscribe(lecture_id, queue)
+    snapshots = {}
+    for lecture_id in lecture_ids:
+        snapshot = await _progress_snapshot(lecture_id)
+        if snapshot and snapshot["user_id"] == user_id:
+            snapshots[lecture_id] = snapshot
+        else:
+            progress_broadcaster.unsubscribe(lecture_id, queue)   # deleted since the token was issued
+    if not snapshots:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lecture not found.")
+
+    return StreamingResponse(
+        _progress_stream(request, queue, snapshots),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/{lecture_id}/transcript/partial", response_model=PartialTranscriptResponse)
+async def get_partial_transcript(
     lecture_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    after: int = Query(0, ge=0, description="Only return segments at or past this position"),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    lecture = _get_lecture_or_404(db, lecture_id, current_user.id)
+    """Segments decoded so far — usable while the lecture is still transcribing."""
+    lecture = await _get_lecture_or_404(db, lecture_id, current_user.id)
+
+    rows = []
+    transcript_id = await db.scalar(select(Transcript.id).where(Transcript.lecture_id == lecture_id))
+    if transcript_id:
+        rows = (await db.scalars(
+            select(TranscriptSegment)
+            .where(
+                TranscriptSegment.transcript_id == transcript_id,
+                TranscriptSegment.position >= after,
+            )
+            .order_by(TranscriptSegment.position)
+        )).all()
 
-    transcript_data = None
-    if lecture.transcript:
-        transcript_data = TranscriptData(
-            full_text=lecture.transcript.full_text,
-            segments=lecture.transcript.segments,
-            language=lecture.transcript.language,
+    complete = lecture.status == ProcessingStatus.COMPLETED or (
+        await db.scalar(
+            select(PipelineCheckpoint.id).where(
+                PipelineCheckpoint.lecture_id == lecture_id,
+                PipelineCheckpoint.stage == PipelineStage.TRANSCRIBE,
+            )
         )
+        is not None
+    )
 
-    return LectureDetailResponse(
+    return PartialTranscriptResponse(
         id=lecture.id,
-        title=lecture.title,
         status=lecture.status.value,
         progress=lecture.progress,
-        duration=lecture.duration,
-        uploaded_at=lecture.uploaded_at,
-        processed_at=lecture.processed_at,
-        transcript=transcript_data,
-        notes=lecture.note.content if lecture.note else None,
-        key_concepts=lecture.note.key_concepts if lecture.note else [],
-        flashcards=[FlashcardResponse.model_validate(fc) for fc in lecture.flashcards],
-        mcqs=[MCQResponse.model_validate(m) for m in lecture.mcqs],
-        resources=[ResourceResponse.model_validate(r) for r in lecture.resources],
+        segments=[TranscriptSegmentResponse.model_validate(r) for r in rows],
+        text=" ".join(r.text for r in rows),
+        next_position=rows[-1].position + 1 if rows else after,
+        complete=complete,
+    )
+
+
+@router.get("/{lecture_id}/transcript/segments", response_model=TranscriptSegmentPage)
+async def get_transcript_segments(
+    lecture_id: str,
+    start: Optional[float] = Query(None, alias="from", ge=0, description="Window start, seconds"),
+    end: Optional[float] = Query(None, alias="to", ge=0, description="Window end, seconds"),
+    page: int = Query(1, ge=1),
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """
+    Segments overlapping [from, to) seconds, or page N of the whole
+    transcript when no time window is given. Touches only transcript_segments
+    through the (transcript_id, start|end) indexes; the transcript's
+    full_text and JSON segments are not loaded. `total` is counted on page 1
+    only — later pages and time windows leave it null.
+    """
+    await _ensure_lecture_owned(db, lecture_id, current_user.id)
+    transcript_id = await db.scalar(select(Transcript.id).where(Transcript.lecture_id == lecture_id))
+    if not transcript_id:
+        return TranscriptSegmentPage(lecture_id=lecture_id, total=0, limit=limit)
+
+    windowed = start is not None or end is not None
+    if windowed and start is not None and end is not None and end <= start:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'to' must be greater than 'from'.")
+
+    in_transcript = TranscriptSegment.transcript_id == transcript_id
+    query = (
+        select(TranscriptSegment)
+        .where(in_transcript)
+        .order_by(TranscriptSegment.start, TranscriptSegment.position)
+    )
+    offset = 0
+    if windowed:
+        # Plain overlap test — segments have no length bound (VAD remapping can
+        # stretch one past Whisper's 30s window), so nothing narrower is safe.
+        # Each side is a range scan on its (transcript_id, start|end) index.
+        if start is not None:
+            query = query.where(TranscriptSegment.end > start)
+        if end is not None:
+            query = query.where(TranscriptSegment.start < end)
+    else:
+        offset = (page - 1) * limit
+        query = query.offset(offset)
+    query = query.limit(limit + 1)
+
+    rows = (await db.scalars(query)).all()
+    if not rows and await db.run_sync(_backfill_segment_rows, transcript_id):
+        rows = (await db.scalars(query)).all()
+
+    total = None
+    if not windowed and page == 1:
+        total = (
+            len(rows) if len(rows) <= limit
+            else await db.scalar(select(func.count(TranscriptSegment.id)).where(in_transcript))
+        )
+    return TranscriptSegmentPage(
+        lecture_id=lecture_id,
+        total=total,
+        page=None if windowed else page,
+        limit=limit,
+        segments=[TranscriptSegmentResponse.model_validate(r) for r in rows[:limit]],
+        has_more=len(rows) > limit,
+    )
+
+
+def _parse_include(include: Optional[str]) -> set:
+    if include is None:
+        return set(DETAIL_SECTIONS)
+    sections = {part.strip() for part in include.split(",") if part.strip()}
+    unknown = sections - set(DETAIL_SECTIONS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown section(s): {', '.join(sorted(unknown))}. Allowed: {', '.join(DETAIL_SECTIONS)}",
+        )
+    return sections
+
+
+@router.get(
+    "/{lecture_id}",
+    response_model=LectureDetailResponse,
+    response_model_exclude_unset=True,
+)
+async def get_lecture(
+    lecture_id: str,
+    request: Request,
+    response: Response,
+    include: Optional[str] = Query(
+        None,
+        description="Comma-separated sections to return: transcript, notes, flashcards, mcqs, resources. "
+                    "Omit for all; pass an empty value for lecture metadata only.",
+    ),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    sections = _parse_include(include)
+    # A completed lecture's full detail, and the detail page's include= view,
+    # are sent as precomputed gzip bytes — no child tables, no per-request work
+    use_bundle = _accepts_gzip(request) and is_bundled(sections)
+    # Strong ETags must differ per content coding — the gzip bundle and the
+    # identity JSON each get their own, and each response carries the one
+    # for the coding it is actually sent in
+    variant = "detail:" + ",".join(sorted(sections))
+    gzip_variant = variant + ";gzip"
+
+    # Revalidation: answer from the lectures row alone, before any child
+    # table. Either coding of the current version is still fresh.
+    if request.headers.get("if-none-match"):
+        row = await _ensure_lecture_owned(db, lecture_id, current_user.id)
+        for candidate in (gzip_variant, variant) if use_bundle else (variant,):
+            not_modified = _cache_validators(request, response, row, candidate)
+            if not_modified:
+                return not_modified
+
+    if use_bundle:
+        bundle = await db.run_sync(load_bundle, lecture_id, current_user.id, sections)
+        if bundle:
+            return _bundle_response(bundle, gzip_variant)
+
+    # One query for the lecture + requested one-to-one rows, one per requested
+    # collection — sections that weren't asked for are never loaded
+    lecture = await db.scalar(
+        select(Lecture)
+        .options(*(DETAIL_SECTIONS[name] for name in sections))
+        .where(Lecture.id == lecture_id, Lecture.user_id == current_user.id)
     )
+    if not lecture:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lecture not found.")
+
+    # Built before any bundle write below: a rollback would expire `lecture`
+    detail = build_lecture_detail(lecture, sections)
+    _cache_validators(request, response, lecture, variant)
+
+    if use_bundle and lecture.status == ProcessingStatus.COMPLETED:
+        # Completed before bundles existed (or the worker's write failed) — build
+        # them now, lazy-loading any section this request didn't ask for
+        try:
+            bundles = await db.run_sync(write_bundle, lecture)
+            bundle = next((b for b in bundles if b.sections == bundle_key(sections)), None)
+        except IntegrityError:
+            await db.rollback()   # the worker wrote them concurrently — send that one
+            bundle = await db.run_sync(load_bundle, lecture_id, current_user.id, sections)
+        if bundle:
+            return _bundle_response(bundle, gzip_variant)
+
+    return detail
+
+
+# ── Sections as sub-resources ──────────────────────────────────────────────
+
+@router.get("/{lecture_id}/transcript", response_model=Optional[TranscriptData])
+async def get_lecture_transcript(
+    lecture_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    row = await _ensure_lecture_owned(db, lecture_id, current_user.id)
+    not_modified = _cache_validators(request, response, row, "transcript")
+    if not_modified:
+        return not_modified
+    transcript = await db.scalar(select(Transcript).where(Transcript.lecture_id == lecture_id))
+    return transcript_data(transcript)
+
+
+@router.get("/{lecture_id}/notes", response_model=NotesResponse)
+async def get_lecture_notes(
+    lecture_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    row = await _ensure_lecture_owned(db, lecture_id, current_user.id)
+    not_modified = _cache_validators(request, response, row, "notes")
+    if not_modified:
+        return not_modified
+    note = await db.scalar(select(Note).where(Note.lecture_id == lecture_id))
+    if not note:
+        return NotesResponse()
+    return NotesResponse(notes=note.content, key_concepts=note.key_concepts or [])
+
+
+@router.get("/{lecture_id}/flashcards", response_model=List[FlashcardResponse])
+async def get_lecture_flashcards(
+    lecture_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    row = await _ensure_lecture_owned(db, lecture_id, current_user.id)
+    not_modified = _cache_validators(request, response, row, "flashcards")
+    if not_modified:
+        return not_modified
+    cards = await db.scalars(select(Flashcard).where(Flashcard.lecture_id == lecture_id).order_by(Flashcard.order))
+    return cards.all()
+
+
+@router.get("/{lecture_id}/mcqs", response_model=List[MCQResponse])
+async def get_lecture_mcqs(
+    lecture_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    row = await _ensure_lecture_owned(db, lecture_id, current_user.id)
+    not_modified = _cache_validators(request, response, row, "mcqs")
+    if not_modified:
+        return not_modified
+    mcqs = await db.scalars(select(MCQ).where(MCQ.lecture_id == lecture_id).order_by(MCQ.order))
+    return mcqs.all()
+
+
+@router.get("/{lecture_id}/resources", response_model=List[ResourceResponse])
+async def get_lecture_resources(
+    lecture_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    row = await _ensure_lecture_owned(db, lecture_id, current_user.id)
+    not_modified = _cache_validators(request, response, row, "resources")
+    if not_modified:
+        return not_modified
+    resources = await db.scalars(select(Resource).where(Resource.lecture_id == lecture_id))
+    return resources.all()
 
 
 @router.delete("/{lecture_id}", status_code=status.HTTP_200_OK)
-def delete_lecture(
+async def delete_lecture(
     lecture_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    lecture = _get_lecture_or_404(db, lecture_id, current_user.id)
+    lecture = await _get_lecture_or_404(db, lecture_id, current_user.id)
 
-    try:
-        storage_service.delete_audio(lecture.s3_key)
-    except Exception as e:
-        logger.warning("Audio delete failed for %s (non-fatal): %s", lecture_id, e)
+    # The original upload and the normalized FLAC made from it
+    for key in (lecture.s3_key, storage_service.normalized_key_for(lecture.s3_key)):
+        try:
+            await run_in_threadpool(storage_service.delete_audio, key)
+        except Exception as e:
+            logger.warning("Audio delete failed for %s (non-fatal): %s", lecture_id, e)
 
-    db.delete(lecture)
-    db.commit()
+    await db.delete(lecture)
+    await db.commit()
     return {"message": f"Lecture '{lecture.title}' deleted successfully."}
 
 
 # ── Helpers ────────────────────────────────────────────────────────────────
 
-def _get_lecture_or_404(db: Session, lecture_id: str, user_id: str) -> Lecture:
-    lecture = (
-        db.query(Lecture)
-        .filter(Lecture.id == lecture_id, Lecture.user_id == user_id)
+def _backfill_segment_rows(db: Session, transcript_id: str) -> bool:
+    """
+    Transcripts written before transcript_segments existed only have the JSON
+    column — copy it into rows once. Called only after a range read came back
+    empty; returns True if rows were written. Sync — run it with
+    AsyncSession.run_sync.
+    """
+    has_rows = (
+        db.query(TranscriptSegment.id)
+        .filter(TranscriptSegment.transcript_id == transcript_id)
         .first()
     )
+    if has_rows:
+        return False
+    segments = db.query(Transcript.segments).filter(Transcript.id == transcript_id).scalar()
+    if not segments:
+        return False
+    db.bulk_insert_mappings(TranscriptSegment, [
+        {
+            "transcript_id": transcript_id,
+            "position": i,
+            "start": seg.get("start", 0.0),
+            "end": seg.get("end", 0.0),
+            "text": seg.get("text", ""),
+        }
+        for i, seg in enumerate(segments)
+    ])
+    db.commit()
+    logger.info("Backfilled %d transcript segments for transcript %s", len(segments), transcript_id)
+    return True
+
+
+async def _ensure_lecture_owned(db: AsyncSession, lecture_id: str, user_id: str):
+    """
+    404 unless the lecture exists and belongs to the user. Loads only the
+    columns needed for cache validation — returns (id, status, processed_at).
+    """
+    found = (await db.execute(
+        select(Lecture.id, Lecture.status, Lecture.processed_at)
+        .where(Lecture.id == lecture_id, Lecture.user_id == user_id)
+    )).first()
+    if not found:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lecture not found.")
+    return found
+
+
+# ── HTTP caching ───────────────────────────────────────────────────────────
+# A completed lecture's artifacts only change when it is processed again,
+# which stamps a new processed_at — so (id, processed_at, representation)
+# identifies the bytes and makes a strong validator.
+
+def _lecture_etag(lecture_id: str, processed_at, variant: str) -> str:
+    raw = f"{lecture_id}:{processed_at.isoformat()}:{variant}"
+    return '"' + hashlib.sha1(raw.encode("utf-8")).hexdigest()[:24] + '"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison — ignore a W/ prefix
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def _cache_headers(lecture_id: str, processed_at, variant: str) -> dict:
+    return {
+        "ETag": _lecture_etag(lecture_id, processed_at, variant),
+        "Cache-Control": f"private, max-age={settings.lecture_cache_max_age_seconds}",
+        "Vary": "Authorization, Accept-Encoding",
+    }
+
+
+def _cache_validators(request: Request, response: Response, lecture, variant: str) -> Optional[Response]:
+    """
+    For a completed lecture, set ETag / Cache-Control on `response` and return
+    a 304 if the client already holds this version. In-progress lectures are
+    left uncached. `lecture` needs id, status and processed_at.
+    """
+    if lecture.status != ProcessingStatus.COMPLETED or lecture.processed_at is None:
+        return None
+    headers = _cache_headers(lecture.id, lecture.processed_at, variant)
+    if _etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+async def _get_lecture_or_404(db: AsyncSession, lecture_id: str, user_id: str) -> Lecture:
+    lecture = await db.scalar(
+        select(Lecture).where(Lecture.id == lecture_id, Lecture.user_id == user_id)
+    )
     if not lecture:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lecture not found.")
     return lecture
+
+
+def _accepts_gzip(request: Request) -> bool:
+    for part in request.headers.get("accept-encoding", "").split(","):
+        coding, _, params = part.partition(";")
+        if coding.strip().lower() not in ("gzip", "*"):
+            continue
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                return float(q[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+def _bundle_response(bundle: LectureBundle, variant: str) -> Response:
+    """A precomputed detail payload, sent compressed exactly as stored."""
+    return Response(
+        content=bundle.body,
+        media_type="application/json",
+        headers={
+            "Content-Encoding": bundle.encoding,
+            **_cache_headers(bundle.lecture_id, bundle.processed_at, variant),
+        },
+    )
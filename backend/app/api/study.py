@@ -3,14 +3,15 @@ import uuid
 from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.models.lecture import Lecture, ProcessingStatus
 from app.models.mcq import MCQ
 from app.models.quiz_attempt import QuizAttempt
-from app.models.user import User
 from app.schemas.study import QuizResultDetail, QuizResultResponse, QuizSubmitRequest
+from app.services.principal_cache import Principal
 from app.utils.auth import get_current_user
 
 router = APIRouter()
@@ -18,16 +19,14 @@ logger = logging.getLogger(__name__)
 
 
 @router.post("/{lecture_id}/quiz/submit", response_model=QuizResultResponse)
-def submit_quiz(
+async def submit_quiz(
     lecture_id: str,
     request: QuizSubmitRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    lecture = (
-        db.query(Lecture)
-        .filter(Lecture.id == lecture_id, Lecture.user_id == current_user.id)
-        .first()
+    lecture = await db.scalar(
+        select(Lecture).where(Lecture.id == lecture_id, Lecture.user_id == current_user.id)
     )
     if not lecture:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lecture not found.")
@@ -39,11 +38,8 @@ def submit_quiz(
         )
 
     mcqs = (
-        db.query(MCQ)
-        .filter(MCQ.lecture_id == lecture_id)
-        .order_by(MCQ.order)
-        .all()
-    )
+        await db.scalars(select(MCQ).where(MCQ.lecture_id == lecture_id).order_by(MCQ.order))
+    ).all()
     if not mcqs:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -83,7 +79,7 @@ def submit_quiz(
         answers=request.answers,
         attempted_at=datetime.utcnow(),
     ))
-    db.commit()
+    await db.commit()
 
     logger.info(
         "Quiz submitted: user=%s lecture=%s score=%d/%d (%.1f%%)",
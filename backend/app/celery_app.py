@@ -1,4 +1,5 @@
 from celery import Celery
+from celery.signals import celeryd_init, worker_process_init, worker_ready
 from app.config import settings
 
 celery_app = Celery(
@@ -18,6 +19,48 @@ celery_app.conf.update(
     task_acks_late=True,
     worker_prefetch_multiplier=1,
     task_routes={
-        "app.tasks.process_lecture.*": {"queue": "lectures"},
+        # CPU-bound Whisper — low concurrency, one task per process
+        "app.tasks.process_lecture.ingest": {"queue": "transcribe"},
+        "app.tasks.process_lecture.transcribe": {"queue": "transcribe"},
+        # Network-bound Groq / YouTube — run with a high-concurrency thread pool
+        "app.tasks.process_lecture.run": {"queue": "generate"},
+        "app.tasks.process_lecture.generate": {"queue": "generate"},
+        "app.tasks.process_lecture.persist": {"queue": "generate"},
+        "app.tasks.process_lecture.link_resources": {"queue": "resources"},
     },
 )
+
+
+# ---------------------------------------------------------------------------
+# Whisper warm-up
+# Workers that consume the "transcribe" queue (or every queue, when -Q is not
+# given) load the configured Whisper models before taking their first task.
+# Prefork children and the solo pool fire worker_process_init; the threads
+# pool has no child processes, so it warms up once the worker is ready.
+# ---------------------------------------------------------------------------
+
+_warm_whisper = False
+
+
+@celeryd_init.connect
+def _plan_whisper_warmup(sender=None, options=None, **kwargs):
+    global _warm_whisper
+    queues = (options or {}).get("queues") or []
+    if isinstance(queues, str):
+        queues = queues.split(",")
+    _warm_whisper = settings.whisper_preload and (not queues or "transcribe" in queues)
+
+
+@worker_process_init.connect
+def _preload_whisper(**kwargs):
+    if _warm_whisper:
+        from app.services.transcriber import preload_models
+        preload_models()
+
+
+@worker_ready.connect
+def _preload_whisper_threads(sender=None, **kwargs):
+    pool = getattr(sender, "pool", None)
+    if _warm_whisper and pool is not None and type(pool).__module__ == "celery.concurrency.thread":
+        from app.services.transcriber import preload_models
+        preload_models()
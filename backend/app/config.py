@@ -22,19 +22,85 @@ class Settings(BaseSettings):
     aws_secret_access_key: str
     aws_region: str = "ap-south-1"
     s3_bucket_name: str
+    upload_url_expiry_seconds: int = 3600  # presigned / local direct-upload targets
+    events_token_expiry_seconds: int = 60  # progress-stream tokens (checked at connect)
+
+    # Worker-local audio cache for S3 downloads
+    audio_cache_dir: str = ".cache/audio"
+    audio_cache_max_mb: int = 2048        # 0 = off (temp file per task)
+    audio_download_concurrency: int = 8   # parallel ranged GETs per download
+    audio_download_part_mb: int = 8
 
     # AI Services
     groq_api_key: str
     youtube_api_key: str
 
+    # LLM generation
+    generation_chunk_tokens: int = 1500   # transcript window per map call
+    groq_max_concurrency: int = 4         # in-flight Groq requests per process
+
+    # LLM response cache
+    llm_cache_backend: str = "redis"      # "redis" | "disk" | "off"
+    llm_cache_ttl_seconds: int = 7 * 24 * 3600
+    llm_cache_max_entries: int = 5000
+    llm_cache_dir: str = ".cache/llm"     # used by the disk backend
+
+    # Resource linking (YouTube Data API)
+    resource_max_topics: int = 3          # topics searched per lecture (100 quota units each)
+    youtube_max_concurrency: int = 4      # parallel topic searches per lecture
+    youtube_timeout_seconds: int = 10
+    youtube_cache_backend: str = "redis"  # "redis" | "memory" | "off"
+    youtube_cache_ttl_seconds: int = 7 * 24 * 3600
+    youtube_cache_max_entries: int = 5000  # memory backend only — Redis entries just expire
+
     # Whisper
     whisper_model: str = "base"
+    whisper_long_model: str = ""          # e.g. "small" — used at/above the threshold below
+    whisper_long_audio_seconds: int = 1800
+    whisper_preload: bool = True          # warm models when a transcribe worker starts
+    whisper_memory_budget_mb: int = 3072  # resident models are LRU-evicted above this
+    whisper_backend: str = "auto"         # "auto" | "openai" | "faster"
+    whisper_benchmark_clip: str = ""      # audio for the "auto" benchmark (default: synthetic)
+
+    # faster-whisper tuning
+    faster_whisper_compute_type: str = "int8"   # "int8" | "int8_float32" | "float32" ...
+    faster_whisper_cpu_threads: int = 0         # 0 = CTranslate2 default (OMP_NUM_THREADS)
+    faster_whisper_num_workers: int = 1         # concurrent transcriptions per model
+    faster_whisper_beam_size: int = 5
+
+    # Ingest — transcode uploads once to 16 kHz mono FLAC before transcription
+    audio_normalize: bool = True
+
+    # Voice activity detection (silence trimming before Whisper)
+    vad_enabled: bool = True
+    vad_threshold_db: float = 12.0        # speech = this much above noise floor
+    vad_min_silence_seconds: float = 2.0  # shorter pauses are kept
+    vad_padding_seconds: float = 0.4
+
+    # Parallel transcription (process pool, one model per process)
+    transcribe_workers: int = 1           # 1 = off, 0 = one per CPU core
+    transcribe_chunk_seconds: int = 300
+    transcribe_chunk_overlap_seconds: float = 2.0
+    transcribe_stream_batch: int = 20     # segments persisted per progress update
+
+    # HTTP caching of completed lectures (ETag + Cache-Control)
+    lecture_cache_max_age_seconds: int = 300   # browsers reuse without revalidating this long
 
     # JWT
     jwt_secret_key: str
     jwt_algorithm: str = "HS256"
     jwt_expire_days: int = 7
 
+    # Password hashing (bcrypt in a dedicated process pool)
+    bcrypt_rounds: int = 12               # changing it rehashes each user on next login
+    password_hash_workers: int = 2
+    password_hash_max_pending: int = 64   # queued + running; beyond this → 503
+
+    # Authenticated-user cache (token subject → principal)
+    auth_cache_backend: str = "memory"    # "memory" | "redis" | "off"
+    auth_cache_ttl_seconds: int = 60      # bounds staleness across API processes
+    auth_cache_max_entries: int = 10000
+
     # CORS
     cors_origins: str = "http://localhost:5173"
 
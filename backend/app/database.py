@@ -1,4 +1,6 @@
 from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import NullPool
@@ -7,6 +9,7 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Sync engine — Celery tasks and startup table creation
 engine = create_engine(
     settings.database_url,
     poolclass=NullPool if settings.app_env == "test" else None,
@@ -16,16 +19,39 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async drivers for the same database, used by the API
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def async_database_url(url: str) -> str:
+    """postgresql://… → postgresql+asyncpg://… (sqlite → aiosqlite for local runs)."""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        return url
+    return parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+
+# Async engine — FastAPI routes, so a commit never blocks the event loop
+async_engine = create_async_engine(
+    async_database_url(settings.database_url),
+    poolclass=NullPool if settings.app_env == "test" else None,
+    pool_pre_ping=True,
+    echo=settings.app_debug,
+)
+
+# expire_on_commit=False: attributes stay readable after commit without an
+# implicit (and, under asyncio, forbidden) lazy refresh
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 
-def get_db():
-    """FastAPI dependency — yields a DB session and ensures it closes."""
-    db = SessionLocal()
-    try:
-        yield db
-    except Exception:
-        db.rollback()
-        raise
-    finally:
-        db.close()
+async def get_db():
+    """FastAPI dependency — yields an async DB session and ensures it closes."""
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception:
+            await db.rollback()
+            raise
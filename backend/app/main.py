@@ -4,8 +4,12 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
-from app.database import Base, engine
+from app.database import Base, async_engine, engine
 from app.api import auth, lectures, study
+from app.services.llm_cache import llm_cache
+from app.services.password_hasher import password_hasher
+from app.services.principal_cache import principal_cache
+from app.services.progress_events import progress_broadcaster
 
 # Configure logging
 logging.basicConfig(
@@ -22,6 +26,9 @@ async def lifespan(app: FastAPI):
     Base.metadata.create_all(bind=engine)
     logger.info("Database tables verified.")
     yield
+    await progress_broadcaster.close()
+    await async_engine.dispose()
+    password_hasher.close()
     logger.info("Shutting down LectureIQ API.")
 
 
@@ -52,3 +59,21 @@ app.include_router(study.router, prefix="/api/lectures", tags=["Study Tools"])
 @app.get("/health", tags=["Health"])
 def health_check():
     return {"status": "ok", "env": settings.app_env}
+
+
+@app.get("/health/llm-cache", tags=["Health"])
+def llm_cache_stats():
+    """Groq response cache hit/miss counters and tokens saved."""
+    return llm_cache.stats()
+
+
+@app.get("/health/auth-cache", tags=["Health"])
+def auth_cache_stats():
+    """Authenticated-user cache hit/miss counters for this process."""
+    return principal_cache.stats()
+
+
+@app.get("/health/password-hasher", tags=["Health"])
+def password_hasher_stats():
+    """bcrypt pool queue depth, wait times and rehash count for this process."""
+    return password_hasher.stats()
@@ -1,8 +1,11 @@
 from app.models.user import User
 from app.models.lecture import Lecture, ProcessingStatus
 from app.models.transcript import Transcript
+from app.models.transcript_segment import TranscriptSegment
 from app.models.note import Note
 from app.models.flashcard import Flashcard
 from app.models.mcq import MCQ
 from app.models.resource import Resource
 from app.models.quiz_attempt import QuizAttempt
+from app.models.pipeline_checkpoint import PipelineCheckpoint, PipelineStage
+from app.models.lecture_bundle import LectureBundle
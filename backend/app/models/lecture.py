@@ -49,3 +49,11 @@ class Lecture(Base):
         cascade="all, delete-orphan"
     )
     quiz_attempts = relationship("QuizAttempt", back_populates="lecture")
+    bundles = relationship(
+        "LectureBundle", back_populates="lecture",
+        cascade="all, delete-orphan"
+    )
+    checkpoints = relationship(
+        "PipelineCheckpoint", back_populates="lecture",
+        cascade="all, delete-orphan"
+    )
@@ -0,0 +1,24 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, DateTime, LargeBinary, ForeignKey
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+
+class LectureBundle(Base):
+    """
+    A lecture detail payload for one set of sections, serialized and
+    compressed once when processing completes. Valid only while
+    `processed_at` matches the lecture's — re-processing stamps a new one.
+    """
+
+    __tablename__ = "lecture_bundles"
+
+    lecture_id = Column(String, ForeignKey("lectures.id", ondelete="CASCADE"), primary_key=True)
+    sections = Column(String, primary_key=True)                  # sorted, comma-separated
+    processed_at = Column(DateTime, nullable=False)
+    encoding = Column(String, nullable=False, default="gzip")   # Content-Encoding of `body`
+    body = Column(LargeBinary, nullable=False)
+    raw_bytes = Column(Integer, nullable=False)                 # uncompressed JSON size
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    lecture = relationship("Lecture", back_populates="bundles")
@@ -0,0 +1,30 @@
+import uuid
+import enum
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Enum, JSON, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+
+class PipelineStage(str, enum.Enum):
+    INGEST = "ingest"
+    FETCH = "fetch"
+    TRANSCRIBE = "transcribe"
+    CONCEPTS = "concepts"
+    NOTES = "notes"
+    FLASHCARDS = "flashcards"
+    MCQS = "mcqs"
+    RESOURCES = "resources"   # no longer written — kept so older rows still load
+
+
+class PipelineCheckpoint(Base):
+    __tablename__ = "pipeline_checkpoints"
+    __table_args__ = (UniqueConstraint("lecture_id", "stage", name="uq_checkpoint_lecture_stage"),)
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    lecture_id = Column(String, ForeignKey("lectures.id", ondelete="CASCADE"), nullable=False, index=True)
+    stage = Column(Enum(PipelineStage), nullable=False)
+    data = Column(JSON, nullable=True)           # stage output needed to resume
+    completed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    lecture = relationship("Lecture", back_populates="checkpoints")
@@ -16,3 +16,7 @@ class Transcript(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     lecture = relationship("Lecture", back_populates="transcript")
+    segment_rows = relationship(
+        "TranscriptSegment", back_populates="transcript",
+        cascade="all, delete-orphan", order_by="TranscriptSegment.position"
+    )
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, Float, Text, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+
+class TranscriptSegment(Base):
+    """
+    One Whisper segment per row. Written in batches while transcription is
+    still running, so partial transcripts can be served before it finishes.
+    """
+
+    __tablename__ = "transcript_segments"
+    __table_args__ = (
+        Index("ix_transcript_segments_transcript_start", "transcript_id", "start"),
+        Index("ix_transcript_segments_transcript_end", "transcript_id", "end"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    transcript_id = Column(String, ForeignKey("transcripts.id", ondelete="CASCADE"), nullable=False)
+    position = Column(Integer, nullable=False)   # 0-based order within the transcript
+    start = Column(Float, nullable=False)        # seconds
+    end = Column(Float, nullable=False)
+    text = Column(Text, nullable=False)
+
+    transcript = relationship("Transcript", back_populates="segment_rows")
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, ConfigDict
-from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Dict, Optional, List
 from datetime import datetime
 
 
@@ -16,6 +16,28 @@ class LectureResponse(BaseModel):
     error_message: Optional[str] = None
 
 
+class UploadInitRequest(BaseModel):
+    filename: str
+    title: Optional[str] = None
+
+
+class UploadInitResponse(BaseModel):
+    lecture_id: str
+    url: str                      # POST `fields` + `file` here as multipart/form-data
+    fields: Dict[str, str]
+    max_bytes: int
+    expires_in: int               # seconds
+
+
+class ProgressStreamRequest(BaseModel):
+    lecture_ids: List[str] = Field(..., min_length=1, max_length=50)
+
+
+class ProgressStreamResponse(BaseModel):
+    url: str                      # open with EventSource — the token is in the query
+    expires_in: int               # seconds to connect; the stream itself doesn't expire
+
+
 class LectureStatusResponse(BaseModel):
     id: str
     status: str
@@ -54,12 +76,45 @@ class ResourceResponse(BaseModel):
     topic: Optional[str] = None
 
 
+class TranscriptSegmentResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    position: int
+    start: float
+    end: float
+    text: str
+
+
+class PartialTranscriptResponse(BaseModel):
+    id: str
+    status: str
+    progress: int
+    segments: List[TranscriptSegmentResponse] = []
+    text: str = ""                # text of the returned segments only
+    next_position: int = 0        # pass back as ?after= to fetch only new segments
+    complete: bool = False        # transcription finished — no more segments coming
+
+
+class TranscriptSegmentPage(BaseModel):
+    lecture_id: str
+    total: Optional[int] = None   # segments in the whole transcript (page 1 only)
+    page: Optional[int] = None    # set for ?page= requests
+    limit: int
+    segments: List[TranscriptSegmentResponse] = []
+    has_more: bool = False        # more segments past this page / time window
+
+
 class TranscriptData(BaseModel):
     full_text: str
     segments: List[dict]
     language: Optional[str] = None
 
 
+class NotesResponse(BaseModel):
+    notes: Optional[str] = None           # Markdown
+    key_concepts: List[str] = []
+
+
 class LectureDetailResponse(BaseModel):
     id: str
     title: str
@@ -0,0 +1,68 @@
+import logging
+import subprocess
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Whisper's native input: 16 kHz mono float32
+SAMPLE_RATE = 16000
+
+
+def load_audio(path: str, sr: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Decode any ffmpeg-readable file to a mono float32 array in [-1, 1].
+    Both Whisper backends accept this array directly, so the file is
+    decoded exactly once per transcription.
+    """
+    cmd = [
+        "ffmpeg", "-nostdin", "-threads", "0",
+        "-i", path,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sr),
+        "-",
+    ]
+    try:
+        out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    except FileNotFoundError:
+        raise RuntimeError("ffmpeg is not installed — required to decode audio")
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to decode audio: {e.stderr.decode(errors='ignore')[-500:]}")
+
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
+
+
+def transcode_for_whisper(src: str, dest: str, sr: int = SAMPLE_RATE) -> None:
+    """
+    Re-encode any ffmpeg-readable file as 16 kHz mono 16-bit FLAC — lossless
+    for what Whisper sees, and typically a fraction of the size of a WAV or
+    high-bitrate upload.
+    """
+    cmd = [
+        "ffmpeg", "-nostdin", "-y", "-threads", "0",
+        "-i", src,
+        "-vn", "-ac", "1", "-ar", str(sr), "-sample_fmt", "s16", "-c:a", "flac",
+        dest,
+    ]
+    try:
+        subprocess.run(cmd, capture_output=True, check=True)
+    except FileNotFoundError:
+        raise RuntimeError("ffmpeg is not installed — required to decode audio")
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to transcode audio: {e.stderr.decode(errors='ignore')[-500:]}")
+
+
+def probe_duration(path: str) -> float:
+    """Container duration in seconds, via ffprobe."""
+    cmd = [
+        "ffprobe", "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        path,
+    ]
+    try:
+        out = subprocess.run(cmd, capture_output=True, check=True, text=True).stdout
+        return float(out.strip())
+    except FileNotFoundError:
+        raise RuntimeError("ffprobe is not installed — required to read audio duration")
+    except (subprocess.CalledProcessError, ValueError) as e:
+        raise RuntimeError(f"Failed to read audio duration: {e}")
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+HASH_BLOCK = 1024 * 1024
+
+# ---------------------------------------------------------------------------
+# Worker-local cache of downloaded lecture audio
+#
+# Keyed by storage key. Each file has a JSON sidecar recording the object's
+# ETag, size and the sha256 of the bytes on disk. A hit must match the
+# object's current ETag/size (so a re-uploaded object is fetched again) and
+# its own checksum (so a truncated or corrupted file is never handed to
+# Whisper). Least recently used files are evicted past the size budget.
+# ---------------------------------------------------------------------------
+
+
+def _digests(path: Path, *algorithms: str) -> dict:
+    hashes = {name: hashlib.new(name) for name in algorithms}
+    with open(path, "rb") as f:
+        while block := f.read(HASH_BLOCK):
+            for h in hashes.values():
+                h.update(block)
+    return {name: h.hexdigest() for name, h in hashes.items()}
+
+
+class AudioCache:
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory).resolve()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _paths(self, storage_key: str):
+        name = hashlib.sha256(storage_key.encode("utf-8")).hexdigest()[:32]
+        suffix = Path(storage_key).suffix or ".mp3"
+        path = self.directory / f"{name}{suffix}"
+        return path, path.with_name(path.name + ".json")
+
+    def contains(self, path: Optional[str]) -> bool:
+        return bool(path) and Path(path).resolve().parent == self.directory
+
+    def lookup(self, storage_key: str, etag: str, size: int) -> Optional[str]:
+        """Path of a valid cached copy of this object version, or None."""
+        path, meta_path = self._paths(storage_key)
+        if not path.exists() or not meta_path.exists():
+            return None
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self._discard(path, meta_path)
+            return None
+
+        if meta.get("etag") != etag or meta.get("size") != size or path.stat().st_size != size:
+            logger.info("Audio cache: %s changed upstream — refetching", storage_key)
+            self._discard(path, meta_path)
+            return None
+        if _digests(path, "sha256")["sha256"] != meta.get("sha256"):
+            logger.warning("Audio cache: checksum mismatch for %s — refetching", storage_key)
+            self._discard(path, meta_path)
+            return None
+
+        os.utime(path)  # LRU touch
+        return str(path)
+
+    def store(self, storage_key: str, etag: str, size: int, download: Callable[[str], None]) -> str:
+        """
+        Run `download(dest_path)` into a private temp name, validate the result
+        against `size` (and the ETag when it is a plain MD5), then publish it
+        atomically. Returns the cached path.
+        """
+        path, meta_path = self._paths(storage_key)
+        part = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.part")
+        try:
+            download(str(part))
+            actual = part.stat().st_size
+            if actual != size:
+                raise IOError(f"Downloaded {actual} bytes of {storage_key}, expected {size}")
+            digests = _digests(part, "sha256", "md5")
+            # Multipart ETags ("<md5-of-md5s>-<parts>") aren't a checksum of the bytes
+            if "-" not in etag and digests["md5"] != etag:
+                raise IOError(f"MD5 mismatch for {storage_key}: got {digests['md5']}, ETag {etag}")
+
+            os.replace(part, path)
+            meta_tmp = meta_path.with_name(part.name + ".json")
+            meta_tmp.write_text(
+                json.dumps({"key": storage_key, "etag": etag, "size": size, "sha256": digests["sha256"]}),
+                encoding="utf-8",
+            )
+            os.replace(meta_tmp, meta_path)
+        finally:
+            part.unlink(missing_ok=True)
+
+        self._evict(keep=path)
+        return str(path)
+
+    def _discard(self, path: Path, meta_path: Path) -> None:
+        path.unlink(missing_ok=True)
+        meta_path.unlink(missing_ok=True)
+
+    def _evict(self, keep: Path) -> None:
+        with self._lock:
+            files = []
+            for p in self.directory.iterdir():
+                if p.name.endswith((".json", ".part")):
+                    continue
+                try:
+                    st = p.stat()
+                except FileNotFoundError:   # evicted by another worker meanwhile
+                    continue
+                files.append((st.st_mtime, st.st_size, p))
+
+            total = sum(size for _, size, _ in files)
+            for _, size, path in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                total -= size
+                self._discard(path, path.with_name(path.name + ".json"))
+                logger.info("Audio cache: evicted %s", path.name)
@@ -0,0 +1,74 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Shared base for the service caches (LLM responses, YouTube searches,
+# authenticated principals)
+#
+# Hit/miss counters, stats(), and an in-process TTL + LRU map for backends
+# that keep entries locally. Subclasses add their own store (Redis, disk)
+# and wrap every call to it in try/except → _failed(): a broken cache is
+# logged and behaves as a miss, it never fails the request or task it fronts.
+# ---------------------------------------------------------------------------
+
+
+class CountingCache:
+    name = "Cache"        # log prefix, e.g. "LLM cache"
+    backend = "memory"
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits, misses = self._hits, self._misses
+        total = hits + misses
+        return {
+            "backend": self.backend,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 3) if total else 0.0,
+        }
+
+    # ------------------------------------------------------------------
+
+    def _record(self, hits: int = 0, misses: int = 0) -> None:
+        with self._lock:
+            self._hits += hits
+            self._misses += misses
+
+    def _failed(self, action: str, error: Exception) -> None:
+        logger.warning("%s %s failed (%s): %s", self.name, action, self.backend, error)
+
+    def _get_local(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)   # LRU touch
+            return value
+
+    def _set_local(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _delete_local(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
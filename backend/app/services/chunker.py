@@ -0,0 +1,97 @@
+import logging
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+# Rough English average for Llama-family tokenizers — good enough for budgeting
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (no tokenizer dependency)."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _split_text(text: str, max_tokens: int) -> List[str]:
+    """Split a long string on whitespace into pieces of at most max_tokens."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    pieces, current, size = [], [], 0
+    for word in text.split():
+        if current and size + len(word) + 1 > max_chars:
+            pieces.append(" ".join(current))
+            current, size = [], 0
+        current.append(word)
+        size += len(word) + 1
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def chunk_segments(segments: List[dict], max_tokens: int) -> List[dict]:
+    """
+    Group consecutive Whisper segments into token-budgeted windows.
+
+    Windows always break on segment boundaries, so no sentence is cut in half
+    unless a single segment is itself larger than the budget.
+
+    Returns:
+        [{"index": int, "start": float, "end": float, "text": str, "tokens": int}]
+    """
+    chunks: List[dict] = []
+    current: List[dict] = []
+    tokens = 0
+
+    def _flush():
+        nonlocal current, tokens
+        if current:
+            chunks.append({
+                "index": len(chunks),
+                "start": current[0].get("start", 0.0),
+                "end": current[-1].get("end", 0.0),
+                "text": " ".join(s["text"] for s in current),
+                "tokens": tokens,
+            })
+        current, tokens = [], 0
+
+    for seg in segments:
+        text = (seg.get("text") or "").strip()
+        if not text:
+            continue
+        seg_tokens = estimate_tokens(text) + 1
+
+        if seg_tokens > max_tokens:
+            # Oversized segment — emit it on its own, split on whitespace
+            _flush()
+            for piece in _split_text(text, max_tokens):
+                current = [{**seg, "text": piece}]
+                tokens = estimate_tokens(piece)
+                _flush()
+            continue
+
+        if current and tokens + seg_tokens > max_tokens:
+            _flush()
+        current.append({**seg, "text": text})
+        tokens += seg_tokens
+
+    _flush()
+    return chunks
+
+
+def chunk_transcript(full_text: str, segments: List[dict], max_tokens: int) -> List[dict]:
+    """
+    Chunk a transcript, preferring segment boundaries.
+    Falls back to whitespace splitting of full_text when no segments exist.
+    """
+    if segments:
+        chunks = chunk_segments(segments, max_tokens)
+    else:
+        chunks = [
+            {"index": i, "start": 0.0, "end": 0.0, "text": piece, "tokens": estimate_tokens(piece)}
+            for i, piece in enumerate(_split_text(full_text, max_tokens))
+        ]
+
+    logger.debug(
+        "Chunked transcript into %d window(s) of ≤%d tokens",
+        len(chunks), max_tokens,
+    )
+    return chunks
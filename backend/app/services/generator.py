@@ -1,35 +1,83 @@
 import json
 import logging
+import math
 import re
-from typing import List
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, List, Optional
 
 from groq import Groq
 
 from app.config import settings
+from app.services.chunker import CHARS_PER_TOKEN, chunk_transcript
+from app.services.llm_cache import llm_cache
 
 logger = logging.getLogger(__name__)
 
 _client = Groq(api_key=settings.groq_api_key)
 MODEL = "llama-3.3-70b-versatile"
 
-# Transcript character limits to avoid token overflows
-NOTES_LIMIT = 8000
-CARDS_LIMIT = 6000
-CONCEPT_LIMIT = 3000
+# Transcript character limits to avoid token overflows. Never below one
+# chunk, so a single-chunk lecture is sent whole rather than cut short.
+_CHUNK_CHARS = settings.generation_chunk_tokens * CHARS_PER_TOKEN
+NOTES_LIMIT = max(8000, _CHUNK_CHARS)
+CARDS_LIMIT = max(6000, _CHUNK_CHARS)
+CONCEPT_LIMIT = max(3000, _CHUNK_CHARS)
+
+# Combined partial-notes size a single merge call may receive
+MERGE_LIMIT = 12000
+
+FLASHCARD_COUNT = 12
+MCQ_COUNT = 8
+MAX_FLASHCARDS = 15
+MAX_MCQS = 10
+MAX_CONCEPTS = 8
+
+# Caps in-flight Groq requests across every thread in this process
+_groq_slots = threading.BoundedSemaphore(max(1, settings.groq_max_concurrency))
 
 
 # ---------------------------------------------------------------------------
 # Core Groq caller
 # ---------------------------------------------------------------------------
 
-def _call_groq(prompt: str, max_tokens: int = 4096, temperature: float = 0.3) -> str:
-    response = _client.chat.completions.create(
-        model=MODEL,
-        messages=[{"role": "user", "content": prompt}],
-        max_tokens=max_tokens,
-        temperature=temperature,
-    )
-    return response.choices[0].message.content.strip()
+def _call_groq(
+    prompt: str,
+    max_tokens: int = 4096,
+    temperature: float = 0.3,
+    parse: Optional[Callable[[str], Any]] = None,
+):
+    """
+    Groq completion through the response cache. With `parse`, returns
+    parse(content) and a response is only cached once parse() accepts it —
+    a malformed cached response is dropped and requested again, so retries
+    and re-processing can recover from a bad generation.
+    """
+    key = llm_cache.make_key(MODEL, prompt, max_tokens, temperature)
+    cached = llm_cache.get(key)
+    if cached is not None:
+        if parse is None:
+            return cached
+        try:
+            return parse(cached)
+        except Exception as e:
+            logger.warning("Dropping unparsable cached response: %s", e)
+            llm_cache.delete(key)
+
+    with _groq_slots:
+        response = _client.chat.completions.create(
+            model=MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=temperature,
+        )
+    content = response.choices[0].message.content.strip()
+    result = parse(content) if parse else content   # raises before anything is cached
+
+    usage = getattr(response, "usage", None)
+    llm_cache.set(key, content, tokens=getattr(usage, "total_tokens", 0) or 0)
+    return result
 
 
 def _extract_json(text: str) -> str:
@@ -47,8 +95,7 @@ def _extract_json(text: str) -> str:
 # Notes
 # ---------------------------------------------------------------------------
 
-def generate_notes(transcript: str) -> str:
-    """Generate structured Markdown notes from a transcript."""
+def _notes(transcript: str) -> str:
     prompt = f"""You are an expert academic note-taker for college students in India.
 
 Given the lecture transcript below, write comprehensive, well-structured study notes in Markdown.
@@ -63,29 +110,63 @@ Requirements:
 - Be thorough but concise — a student should be able to revise from these notes alone
 
 TRANSCRIPT:
-{transcript[:NOTES_LIMIT]}
+{transcript}
 
 ---
 Generate Markdown notes now:"""
 
+    return _call_groq(prompt, max_tokens=4000, temperature=0.2)
+
+
+def _merge_notes(parts: List[str]) -> str:
+    sections = "\n\n".join(
+        f"--- PART {i + 1} ---\n{part}" for i, part in enumerate(parts)
+    )
+    prompt = f"""You are an expert academic note-taker for college students in India.
+
+Below are Markdown study notes written for consecutive parts of the SAME lecture, in order.
+Merge them into one coherent set of study notes.
+
+Requirements:
+- Keep the lecture's original order and every definition, formula and code snippet
+- Merge duplicate or overlapping headers and bullets — do not repeat content
+- Use clear hierarchical headers (##, ###), bold for key terms, LaTeX for math
+- Do not mention "parts" — the result should read as a single set of notes
+
+{sections}
+
+---
+Generate the merged Markdown notes now:"""
+
+    return _call_groq(prompt, max_tokens=4000, temperature=0.2)
+
+
+def _notes_fallback(e: Exception) -> str:
+    return (
+        "# Lecture Notes\n\n"
+        "> ⚠️ Notes could not be generated automatically. "
+        "Please re-process this lecture.\n\n"
+        f"**Error:** `{e}`"
+    )
+
+
+def generate_notes(transcript: str) -> str:
+    """Generate structured Markdown notes from a transcript."""
     try:
-        return _call_groq(prompt, max_tokens=4000, temperature=0.2)
+        return _notes(transcript[:NOTES_LIMIT])
     except Exception as e:
         logger.error("Notes generation failed: %s", e)
-        return (
-            "# Lecture Notes\n\n"
-            "> ⚠️ Notes could not be generated automatically. "
-            "Please re-process this lecture.\n\n"
-            f"**Error:** `{e}`"
-        )
+        return _notes_fallback(e)
 
 
 # ---------------------------------------------------------------------------
 # Flashcards
 # ---------------------------------------------------------------------------
 
-def generate_flashcards(transcript: str, count: int = 12) -> List[dict]:
-    """Return a list of {question, answer} dicts."""
+FLASHCARD_FALLBACK = [{"question": "Flashcard generation failed.", "answer": "Please re-process this lecture."}]
+
+
+def _flashcards(transcript: str, count: int) -> List[dict]:
     prompt = f"""You are an expert educator creating study flashcards for college students.
 
 Based on the lecture transcript below, create exactly {count} high-quality flashcards.
@@ -103,33 +184,52 @@ Return ONLY a valid JSON array, no markdown, no extra text:
 ]
 
 TRANSCRIPT:
-{transcript[:CARDS_LIMIT]}
+{transcript}
 
 JSON array ({count} flashcards):"""
 
+    return _call_groq(prompt, max_tokens=3000, temperature=0.4, parse=_parse_flashcards)
+
+
+def _parse_flashcards(raw: str) -> List[dict]:
+    cards = json.loads(_extract_json(raw))
+    if not isinstance(cards, list):
+        raise ValueError("flashcard response is not a JSON array")
+    valid = [
+        {"question": c["question"].strip(), "answer": c["answer"].strip()}
+        for c in cards
+        if isinstance(c, dict) and c.get("question") and c.get("answer")
+    ]
+    if not valid:
+        raise ValueError("no valid flashcards in response")
+    return valid
+
+
+def generate_flashcards(transcript: str, count: int = FLASHCARD_COUNT) -> List[dict]:
+    """Return a list of {question, answer} dicts."""
     try:
-        raw = _call_groq(prompt, max_tokens=3000, temperature=0.4)
-        cards = json.loads(_extract_json(raw))
-        if isinstance(cards, list):
-            valid = [
-                {"question": c["question"].strip(), "answer": c["answer"].strip()}
-                for c in cards
-                if isinstance(c, dict) and c.get("question") and c.get("answer")
-            ]
-            if valid:
-                return valid[:15]
+        valid = _flashcards(transcript[:CARDS_LIMIT], count)
+        if valid:
+            return valid[:MAX_FLASHCARDS]
     except Exception as e:
         logger.error("Flashcard parsing failed: %s", e)
 
-    return [{"question": "Flashcard generation failed.", "answer": "Please re-process this lecture."}]
+    return list(FLASHCARD_FALLBACK)
 
 
 # ---------------------------------------------------------------------------
 # MCQs
 # ---------------------------------------------------------------------------
 
-def generate_mcqs(transcript: str, count: int = 8) -> List[dict]:
-    """Return a list of {question, options, correct_index, explanation} dicts."""
+MCQ_FALLBACK = [{
+    "question": "MCQ generation failed for this lecture.",
+    "options": ["Re-process", "Contact support", "Try again", "All of the above"],
+    "correct_index": 3,
+    "explanation": "MCQ generation failed. Please try re-processing this lecture.",
+}]
+
+
+def _mcqs(transcript: str, count: int) -> List[dict]:
     prompt = f"""You are an expert exam question writer for college students in India.
 
 Based on the lecture transcript below, create exactly {count} multiple-choice questions (MCQs).
@@ -152,50 +252,57 @@ Return ONLY a valid JSON array, no markdown, no extra text:
 ]
 
 TRANSCRIPT:
-{transcript[:CARDS_LIMIT]}
+{transcript}
 
 JSON array ({count} MCQs):"""
 
+    return _call_groq(prompt, max_tokens=3000, temperature=0.4, parse=_parse_mcqs)
+
+
+def _parse_mcqs(raw: str) -> List[dict]:
+    mcqs = json.loads(_extract_json(raw))
+    if not isinstance(mcqs, list):
+        raise ValueError("MCQ response is not a JSON array")
+
+    valid = []
+    for m in mcqs:
+        if (
+            isinstance(m, dict) and
+            m.get("question") and
+            isinstance(m.get("options"), list) and
+            len(m["options"]) == 4 and
+            isinstance(m.get("correct_index"), int) and
+            0 <= m["correct_index"] <= 3 and
+            m.get("explanation")
+        ):
+            valid.append({
+                "question": m["question"].strip(),
+                "options": [str(o).strip() for o in m["options"]],
+                "correct_index": m["correct_index"],
+                "explanation": m["explanation"].strip(),
+            })
+    if not valid:
+        raise ValueError("no valid MCQs in response")
+    return valid
+
+
+def generate_mcqs(transcript: str, count: int = MCQ_COUNT) -> List[dict]:
+    """Return a list of {question, options, correct_index, explanation} dicts."""
     try:
-        raw = _call_groq(prompt, max_tokens=3000, temperature=0.4)
-        mcqs = json.loads(_extract_json(raw))
-        if isinstance(mcqs, list):
-            valid = []
-            for m in mcqs:
-                if (
-                    isinstance(m, dict) and
-                    m.get("question") and
-                    isinstance(m.get("options"), list) and
-                    len(m["options"]) == 4 and
-                    isinstance(m.get("correct_index"), int) and
-                    0 <= m["correct_index"] <= 3 and
-                    m.get("explanation")
-                ):
-                    valid.append({
-                        "question": m["question"].strip(),
-                        "options": [str(o).strip() for o in m["options"]],
-                        "correct_index": m["correct_index"],
-                        "explanation": m["explanation"].strip(),
-                    })
-            if valid:
-                return valid[:10]
+        valid = _mcqs(transcript[:CARDS_LIMIT], count)
+        if valid:
+            return valid[:MAX_MCQS]
     except Exception as e:
         logger.error("MCQ parsing failed: %s", e)
 
-    return [{
-        "question": "MCQ generation failed for this lecture.",
-        "options": ["Re-process", "Contact support", "Try again", "All of the above"],
-        "correct_index": 3,
-        "explanation": "MCQ generation failed. Please try re-processing this lecture.",
-    }]
+    return list(MCQ_FALLBACK)
 
 
 # ---------------------------------------------------------------------------
 # Key concept extraction (used for resource linking)
 # ---------------------------------------------------------------------------
 
-def extract_key_concepts(transcript: str) -> List[str]:
-    """Return 5–8 searchable topic strings for YouTube/docs lookup."""
+def _concepts(transcript: str) -> List[str]:
     prompt = f"""Extract the 5–8 most important, specific, searchable topics from this lecture transcript.
 
 Rules:
@@ -205,16 +312,222 @@ Rules:
 - Avoid generic terms like "introduction" or "overview"
 
 TRANSCRIPT:
-{transcript[:CONCEPT_LIMIT]}
+{transcript}
 
 Return ONLY a JSON array:"""
 
+    return _call_groq(prompt, max_tokens=400, temperature=0.2, parse=_parse_concepts)
+
+
+def _parse_concepts(raw: str) -> List[str]:
+    concepts = json.loads(_extract_json(raw))
+    if not isinstance(concepts, list):
+        raise ValueError("concept response is not a JSON array")
+    return [str(c).strip() for c in concepts if c]
+
+
+def extract_key_concepts(transcript: str) -> List[str]:
+    """Return 5–8 searchable topic strings for YouTube/docs lookup."""
     try:
-        raw = _call_groq(prompt, max_tokens=400, temperature=0.2)
-        concepts = json.loads(_extract_json(raw))
-        if isinstance(concepts, list):
-            return [str(c).strip() for c in concepts if c][:8]
+        return _concepts(transcript[:CONCEPT_LIMIT])[:MAX_CONCEPTS]
     except Exception as e:
         logger.error("Concept extraction failed: %s", e)
 
     return []
+
+
+# ---------------------------------------------------------------------------
+# Chunked map-reduce (long transcripts)
+# ---------------------------------------------------------------------------
+
+def _map_chunks(pool: ThreadPoolExecutor, fn: Callable, chunks: List[dict], *args) -> List:
+    """
+    Run fn(chunk_text, *args) over every chunk in parallel. Keeps chunk order.
+    An arg may be a callable, in which case it is resolved per chunk.
+    Failed chunks yield None so one bad window doesn't sink the whole lecture.
+    """
+    def _run(chunk):
+        try:
+            return fn(chunk["text"], *(a(chunk) if callable(a) else a for a in args))
+        except Exception as e:
+            logger.warning("Chunk %d: %s failed: %s", chunk["index"], fn.__name__, e)
+            return None
+
+    return list(pool.map(_run, chunks))
+
+
+def _chunk_share(count: int, chunk: dict, total_tokens: int) -> int:
+    """Items to request from one chunk, proportional to its share of the lecture."""
+    return max(2, math.ceil(count * chunk["tokens"] / max(total_tokens, 1)))
+
+
+def _spread(items: List[dict], count: int) -> List[dict]:
+    """
+    Dedupe by question text, then pick `count` items evenly across the
+    (chronological) list so every part of the lecture is represented.
+    """
+    seen, unique = set(), []
+    for item in items:
+        key = re.sub(r"\W+", " ", item["question"].lower()).strip()
+        if key not in seen:
+            seen.add(key)
+            unique.append(item)
+
+    if len(unique) <= count:
+        return unique
+    step = len(unique) / count
+    return [unique[int(i * step)] for i in range(count)]
+
+
+def notes_from_chunks(chunks: List[dict], pool: ThreadPoolExecutor) -> str:
+    """Map: notes per chunk. Reduce: merge groups of partial notes until one remains."""
+    if len(chunks) == 1:
+        return generate_notes(chunks[0]["text"])
+
+    parts = [p for p in _map_chunks(pool, _notes, chunks) if p]
+    if not parts:
+        return _notes_fallback(RuntimeError("all chunks failed"))
+
+    while len(parts) > 1:
+        groups, current, size = [], [], 0
+        for part in parts:
+            if current and size + len(part) > MERGE_LIMIT:
+                groups.append(current)
+                current, size = [], 0
+            current.append(part)
+            size += len(part)
+        groups.append(current)
+
+        if len(groups) == len(parts):
+            # Every partial is too large to pair up — stitch them in order
+            logger.warning("Partial notes exceed merge budget — concatenating %d parts", len(parts))
+            return "\n\n---\n\n".join(parts)
+
+        def _merge(group: List[str]) -> str:
+            if len(group) == 1:
+                return group[0]
+            try:
+                return _merge_notes(group)
+            except Exception as e:
+                logger.warning("Notes merge failed (%s) — concatenating %d parts", e, len(group))
+                return "\n\n---\n\n".join(group)
+
+        parts = list(pool.map(_merge, groups))
+
+    return parts[0]
+
+
+def flashcards_from_chunks(
+    chunks: List[dict], pool: ThreadPoolExecutor, count: int = FLASHCARD_COUNT
+) -> List[dict]:
+    """Map: cards per chunk, sized by its share. Reduce: dedupe + spread."""
+    if len(chunks) == 1:
+        return generate_flashcards(chunks[0]["text"], count)
+
+    total = sum(c["tokens"] for c in chunks)
+    partials = _map_chunks(pool, _flashcards, chunks, lambda c: _chunk_share(count, c, total))
+    cards = [card for partial in partials for card in partial or []]
+    return _spread(cards, count) or list(FLASHCARD_FALLBACK)
+
+
+def mcqs_from_chunks(
+    chunks: List[dict], pool: ThreadPoolExecutor, count: int = MCQ_COUNT
+) -> List[dict]:
+    """Map: MCQs per chunk, sized by its share. Reduce: dedupe + spread."""
+    if len(chunks) == 1:
+        return generate_mcqs(chunks[0]["text"], count)
+
+    total = sum(c["tokens"] for c in chunks)
+    partials = _map_chunks(pool, _mcqs, chunks, lambda c: _chunk_share(count, c, total))
+    mcqs = [mcq for partial in partials for mcq in partial or []]
+    return _spread(mcqs, count) or list(MCQ_FALLBACK)
+
+
+def concepts_from_chunks(chunks: List[dict], pool: ThreadPoolExecutor) -> List[str]:
+    """Map: concepts per chunk. Reduce: rank by how many chunks mention them."""
+    if len(chunks) == 1:
+        return extract_key_concepts(chunks[0]["text"])
+
+    counts: Counter = Counter()
+    display = {}
+    for partial in _map_chunks(pool, _concepts, chunks):
+        for concept in partial or []:
+            key = concept.lower()
+            counts[key] += 1
+            display.setdefault(key, concept)
+
+    # Counter.most_common is stable, so ties keep first-seen (lecture) order
+    return [display[key] for key, _ in counts.most_common(MAX_CONCEPTS)]
+
+
+# ---------------------------------------------------------------------------
+# Concurrent generation stage
+# ---------------------------------------------------------------------------
+
+GENERATION_STEPS = {
+    "concepts": concepts_from_chunks,
+    "notes": notes_from_chunks,
+    "flashcards": flashcards_from_chunks,
+    "mcqs": mcqs_from_chunks,
+}
+
+
+def generate_study_materials(
+    transcript: str,
+    segments: Optional[List[dict]] = None,
+    steps: Optional[List[str]] = None,
+    on_step_done: Optional[Callable[[str, object, int], None]] = None,
+) -> dict:
+    """
+    Fan out concept extraction, notes, flashcards and MCQs over a thread pool.
+
+    Short transcripts go out as one Groq call per step. Long ones are split
+    into token-budgeted windows along segment boundaries; every step maps
+    over the windows in parallel and then reduces the partial results, so
+    cost and latency grow linearly with lecture length instead of the tail
+    being truncated away. All Groq calls share the `groq_max_concurrency` cap.
+
+    `steps` restricts the run to a subset of GENERATION_STEPS (e.g. the ones a
+    retried task has not finished yet). `on_step_done(step, result, count)` is
+    invoked from the calling thread as each step finishes — in completion
+    order, not submission order.
+
+    Returns {"concepts": [...], "notes": str, "flashcards": [...], "mcqs": [...]}
+    (only the requested steps)
+    """
+    steps = [s for s in GENERATION_STEPS if steps is None or s in steps]
+    if not steps:
+        return {}
+
+    chunks = chunk_transcript(transcript, segments or [], settings.generation_chunk_tokens)
+    if not chunks:
+        chunks = [{"index": 0, "start": 0.0, "end": 0.0, "text": transcript, "tokens": 0}]
+    logger.info("Generating %s over %d chunk(s)", ", ".join(steps), len(chunks))
+
+    results = {}
+    with ThreadPoolExecutor(
+        max_workers=settings.groq_max_concurrency, thread_name_prefix="groq-chunk"
+    ) as chunk_pool, ThreadPoolExecutor(
+        max_workers=len(steps), thread_name_prefix="groq"
+    ) as pool:
+        futures = {
+            pool.submit(GENERATION_STEPS[step], chunks, chunk_pool): step
+            for step in steps
+        }
+        errors = []
+        for future in as_completed(futures):
+            step = futures[future]
+            try:
+                results[step] = future.result()
+            except Exception as e:
+                # Let the other steps finish (and be reported) before raising
+                logger.error("Generation step '%s' failed: %s", step, e)
+                errors.append(e)
+                continue
+            logger.info("Generation step '%s' finished (%d/%d)", step, len(results), len(futures))
+            if on_step_done:
+                on_step_done(step, results[step], len(results))
+
+    if errors:
+        raise errors[0]
+    return results
@@ -0,0 +1,159 @@
+import gzip
+import logging
+from typing import List, Optional
+
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from app.models.lecture import Lecture, ProcessingStatus
+from app.models.lecture_bundle import LectureBundle
+from app.models.transcript import Transcript
+from app.schemas.lecture import (
+    FlashcardResponse,
+    LectureDetailResponse,
+    MCQResponse,
+    ResourceResponse,
+    TranscriptData,
+)
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_ENCODING = "gzip"
+
+# Detail sections → the relationship load each one needs
+DETAIL_SECTIONS = {
+    "transcript": joinedload(Lecture.transcript),
+    "notes": joinedload(Lecture.note),
+    "flashcards": selectinload(Lecture.flashcards),
+    "mcqs": selectinload(Lecture.mcqs),
+    "resources": selectinload(Lecture.resources),
+}
+
+# Section sets stored as bundles: the full detail, and the detail page's
+# study view (everything but the transcript, which it fetches on demand)
+BUNDLED_SECTIONS = (
+    frozenset(DETAIL_SECTIONS),
+    frozenset(DETAIL_SECTIONS) - {"transcript"},
+)
+
+
+# ---------------------------------------------------------------------------
+# Lecture detail payload + its precomputed bundle
+#
+# A completed lecture's detail never changes until it is processed again, so
+# each of BUNDLED_SECTIONS is serialized and gzipped once, when the pipeline
+# finishes, and GET /api/lectures/{id} sends those bytes as-is. A bundle is
+# current only while its processed_at equals the lecture's.
+# ---------------------------------------------------------------------------
+
+def transcript_data(transcript: Optional[Transcript]) -> Optional[TranscriptData]:
+    if not transcript:
+        return None
+    return TranscriptData(
+        full_text=transcript.full_text,
+        segments=transcript.segments,
+        language=transcript.language,
+    )
+
+
+def build_lecture_detail(lecture: Lecture, sections: set) -> LectureDetailResponse:
+    """Detail payload with only `sections` set (the rest stay unset, so excluded)."""
+    fields = dict(
+        id=lecture.id,
+        title=lecture.title,
+        status=lecture.status.value,
+        progress=lecture.progress,
+        duration=lecture.duration,
+        uploaded_at=lecture.uploaded_at,
+        processed_at=lecture.processed_at,
+    )
+    if "transcript" in sections:
+        fields["transcript"] = transcript_data(lecture.transcript)
+    if "notes" in sections:
+        fields["notes"] = lecture.note.content if lecture.note else None
+        fields["key_concepts"] = lecture.note.key_concepts if lecture.note else []
+    if "flashcards" in sections:
+        fields["flashcards"] = [FlashcardResponse.model_validate(fc) for fc in lecture.flashcards]
+    if "mcqs" in sections:
+        fields["mcqs"] = [MCQResponse.model_validate(m) for m in lecture.mcqs]
+    if "resources" in sections:
+        fields["resources"] = [ResourceResponse.model_validate(r) for r in lecture.resources]
+    return LectureDetailResponse(**fields)
+
+
+def load_lecture_detail(db: Session, lecture_id: str) -> Optional[Lecture]:
+    """The lecture with every detail section eagerly loaded."""
+    return (
+        db.query(Lecture)
+        .options(*DETAIL_SECTIONS.values())
+        .filter(Lecture.id == lecture_id)
+        .first()
+    )
+
+
+def bundle_key(sections) -> str:
+    return ",".join(sorted(sections))
+
+
+def is_bundled(sections) -> bool:
+    """True if this section set is stored as a bundle."""
+    return frozenset(sections) in BUNDLED_SECTIONS
+
+
+def write_bundle(db: Session, lecture: Lecture, commit: bool = True) -> List[LectureBundle]:
+    """
+    Serialize and compress every BUNDLED_SECTIONS payload of a completed
+    lecture and upsert their bundles. Sections not loaded on `lecture` are
+    lazy-loaded. Returns [] for lectures that aren't completed. With
+    commit=False the caller commits them together with its own writes.
+    """
+    if lecture.status != ProcessingStatus.COMPLETED or lecture.processed_at is None:
+        return []
+    bundles = []
+    for sections in BUNDLED_SECTIONS:
+        payload = (
+            build_lecture_detail(lecture, sections)
+            .model_dump_json(exclude_unset=True)
+            .encode("utf-8")
+        )
+        body = gzip.compress(payload, compresslevel=9)   # compressed once, read many times
+
+        key = bundle_key(sections)
+        bundle = db.get(LectureBundle, (lecture.id, key))
+        if bundle is None:
+            bundle = LectureBundle(lecture_id=lecture.id, sections=key)
+            db.add(bundle)
+        bundle.processed_at = lecture.processed_at
+        bundle.encoding = BUNDLE_ENCODING
+        bundle.body = body
+        bundle.raw_bytes = len(payload)
+        bundles.append(bundle)
+        logger.info(
+            "[%s] Detail bundle (%s) written: %d bytes JSON → %d bytes %s",
+            lecture.id, key, len(payload), len(body), BUNDLE_ENCODING,
+        )
+    if commit:
+        db.commit()
+    return bundles
+
+
+def load_bundle(
+    db: Session, lecture_id: str, user_id: str, sections=BUNDLED_SECTIONS[0]
+) -> Optional[LectureBundle]:
+    """The user's bundle of `sections` if it is current — one query, no child tables."""
+    return (
+        db.query(LectureBundle)
+        .join(Lecture, Lecture.id == LectureBundle.lecture_id)
+        .filter(
+            Lecture.id == lecture_id,
+            Lecture.user_id == user_id,
+            Lecture.status == ProcessingStatus.COMPLETED,
+            LectureBundle.sections == bundle_key(sections),
+            LectureBundle.processed_at == Lecture.processed_at,
+        )
+        .first()
+    )
+
+
+def invalidate_bundle(db: Session, lecture_id: str) -> None:
+    """Drop the lecture's bundles (caller commits)."""
+    db.query(LectureBundle).filter(LectureBundle.lecture_id == lecture_id).delete()
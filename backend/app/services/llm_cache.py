@@ -0,0 +1,241 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+from app.config import settings
+from app.services.cache_base import CountingCache
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Content-addressed cache for Groq responses
+#
+# Key = sha256(model, prompt, max_tokens, temperature). A retried Celery task
+# or a re-processed lecture sends byte-identical prompts, so every call that
+# already succeeded once is served from here instead of being paid for again.
+# ---------------------------------------------------------------------------
+
+
+class LLMCache(CountingCache):
+    """Base class (caching off) — adds saved-token counting. Subclasses implement _get/_set/_delete."""
+
+    name = "LLM cache"
+    backend = "off"
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        super().__init__(ttl_seconds, max_entries)
+        self._saved_tokens = 0
+
+    @staticmethod
+    def make_key(model: str, prompt: str, max_tokens: int, temperature: float) -> str:
+        payload = json.dumps([model, prompt, max_tokens, temperature], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            entry = self._get(key)
+        except Exception as e:
+            self._failed("read", e)
+            entry = None
+
+        if entry is None:
+            self._record(misses=1)
+            return None
+        self._record(hits=1, saved_tokens=entry.get("tokens", 0))
+        return entry["content"]
+
+    def set(self, key: str, content: str, tokens: int = 0) -> None:
+        try:
+            self._set(key, {"content": content, "tokens": tokens, "created": time.time()})
+        except Exception as e:
+            self._failed("write", e)
+
+    def delete(self, key: str) -> None:
+        try:
+            self._delete(key)
+        except Exception as e:
+            self._failed("delete", e)
+
+    def stats(self) -> dict:
+        with self._lock:
+            saved = self._saved_tokens
+        return {**super().stats(), "saved_tokens": saved}
+
+    # ------------------------------------------------------------------
+
+    def _record(self, hits: int = 0, misses: int = 0, saved_tokens: int = 0) -> None:
+        super()._record(hits, misses)
+        with self._lock:
+            self._saved_tokens += saved_tokens
+
+    def _get(self, key: str) -> Optional[dict]:
+        return None
+
+    def _set(self, key: str, entry: dict) -> None:
+        pass
+
+    def _delete(self, key: str) -> None:
+        pass
+
+
+class RedisLLMCache(LLMCache):
+    """
+    Redis backend — shared by every worker.
+    TTL via SETEX; size cap via a sorted-set LRU index trimmed on write.
+    Counters live in a Redis hash so stats() reports fleet-wide numbers.
+    """
+
+    backend = "redis"
+    PREFIX = "llmcache:"
+    INDEX = "llmcache:index"
+    STATS = "llmcache:stats"
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        super().__init__(ttl_seconds, max_entries)
+        from app.utils.redis_client import get_redis
+        self._redis = get_redis()
+
+    def _get(self, key: str) -> Optional[dict]:
+        raw = self._redis.get(self.PREFIX + key)
+        if raw is None:
+            return None
+        self._redis.zadd(self.INDEX, {key: time.time()})  # LRU touch
+        return json.loads(raw)
+
+    def _set(self, key: str, entry: dict) -> None:
+        now = time.time()
+        pipe = self._redis.pipeline()
+        pipe.set(self.PREFIX + key, json.dumps(entry), ex=self.ttl_seconds)
+        pipe.zadd(self.INDEX, {key: now})
+        # Index entries older than the TTL point at keys Redis already expired
+        pipe.zremrangebyscore(self.INDEX, "-inf", now - self.ttl_seconds)
+        pipe.zcard(self.INDEX)
+        size = pipe.execute()[-1]
+
+        excess = size - self.max_entries
+        if excess > 0:
+            evicted = [k.decode() for k, _ in self._redis.zpopmin(self.INDEX, excess)]
+            if evicted:
+                self._redis.delete(*(self.PREFIX + k for k in evicted))
+                logger.debug("LLM cache evicted %d entries", len(evicted))
+
+    def _delete(self, key: str) -> None:
+        pipe = self._redis.pipeline()
+        pipe.delete(self.PREFIX + key)
+        pipe.zrem(self.INDEX, key)
+        pipe.execute()
+
+    def _record(self, hits: int = 0, misses: int = 0, saved_tokens: int = 0) -> None:
+        super()._record(hits, misses, saved_tokens)
+        try:
+            pipe = self._redis.pipeline()
+            if hits:
+                pipe.hincrby(self.STATS, "hits", hits)
+                pipe.hincrby(self.STATS, "saved_tokens", saved_tokens)
+            if misses:
+                pipe.hincrby(self.STATS, "misses", misses)
+            pipe.execute()
+        except Exception as e:
+            logger.debug("LLM cache stats update failed: %s", e)
+
+    def stats(self) -> dict:
+        local = super().stats()
+        try:
+            raw = self._redis.hgetall(self.STATS)
+            hits = int(raw.get(b"hits", 0))
+            misses = int(raw.get(b"misses", 0))
+            total = hits + misses
+            local.update({
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / total, 3) if total else 0.0,
+                "saved_tokens": int(raw.get(b"saved_tokens", 0)),
+                "entries": self._redis.zcard(self.INDEX),
+            })
+        except Exception as e:
+            logger.warning("LLM cache stats read failed: %s", e)
+        return local
+
+
+class DiskLLMCache(LLMCache):
+    """
+    Local on-disk stand-in — one JSON file per entry, sharded by key prefix.
+    TTL checked on read; oldest-accessed files evicted past max_entries.
+    """
+
+    backend = "disk"
+    EVICT_EVERY = 50  # writes between directory scans
+
+    def __init__(self, ttl_seconds: int, max_entries: int, directory: str):
+        super().__init__(ttl_seconds, max_entries)
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._writes = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _get(self, key: str) -> Optional[dict]:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        entry = json.loads(path.read_text(encoding="utf-8"))
+        if time.time() - entry.get("created", 0) > self.ttl_seconds:
+            path.unlink(missing_ok=True)
+            return None
+        os.utime(path)  # LRU touch
+        return entry
+
+    def _set(self, key: str, entry: dict) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(entry), encoding="utf-8")
+        os.replace(tmp, path)  # atomic — concurrent readers never see half a file
+
+        with self._lock:
+            self._writes += 1
+            should_evict = self._writes % self.EVICT_EVERY == 0
+        if should_evict:
+            self._evict()
+
+    def _delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        files = sorted(self.directory.glob("*/*.json"), key=lambda p: p.stat().st_mtime)
+        cutoff = time.time() - self.ttl_seconds
+        excess = len(files) - self.max_entries
+        for i, path in enumerate(files):
+            if i >= excess and path.stat().st_mtime >= cutoff:
+                break
+            path.unlink(missing_ok=True)
+
+
+def _build_cache() -> LLMCache:
+    backend = settings.llm_cache_backend.lower()
+    ttl, max_entries = settings.llm_cache_ttl_seconds, settings.llm_cache_max_entries
+
+    if backend == "redis":
+        try:
+            cache = RedisLLMCache(ttl, max_entries)
+            logger.info("LLM cache → Redis (ttl=%ds, max=%d)", ttl, max_entries)
+            return cache
+        except Exception as e:
+            logger.warning("Redis LLM cache unavailable (%s) — falling back to disk", e)
+            backend = "disk"
+
+    if backend == "disk":
+        logger.info("LLM cache → disk %s (ttl=%ds, max=%d)", settings.llm_cache_dir, ttl, max_entries)
+        return DiskLLMCache(ttl, max_entries, settings.llm_cache_dir)
+
+    logger.info("LLM cache disabled")
+    return LLMCache(ttl, max_entries)
+
+
+# Singleton — used by generator._call_groq
+llm_cache = _build_cache()
@@ -0,0 +1,114 @@
+import gc
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Rough resident size per Whisper model on CPU (MB). Used when RSS can't be
+# measured (non-Linux) or the measured delta is implausibly small because
+# weights were already mapped by a previous load.
+MODEL_MEMORY_MB = {
+    "tiny": 150,
+    "base": 300,
+    "small": 900,
+    "medium": 2600,
+    "large": 5500,
+}
+DEFAULT_MEMORY_MB = 1000
+
+
+def estimate_memory_mb(model_name: str) -> int:
+    size = model_name.split(".")[0].split("-")[0]   # "base.en", "large-v3" → family
+    return MODEL_MEMORY_MB.get(size, DEFAULT_MEMORY_MB)
+
+
+def rss_mb() -> Optional[float]:
+    """Current resident set size of this process, or None if unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+@dataclass
+class LoadedModel:
+    name: str
+    backend: str          # "openai" | "faster"
+    model: Any
+    memory_mb: float
+    load_seconds: float
+
+
+# ---------------------------------------------------------------------------
+# Model registry
+#
+# Keeps several Whisper models resident per process (e.g. `base` for short
+# clips, `small` for long lectures). When the sum of their sizes exceeds the
+# memory budget the least recently used model is dropped. The model being
+# requested is never evicted, so a single model larger than the budget still
+# loads.
+# ---------------------------------------------------------------------------
+
+class ModelRegistry:
+    def __init__(self, loader: Callable[[str], Tuple[str, Any]], budget_mb: int):
+        """`loader(model_name)` returns (backend, model)."""
+        self._loader = loader
+        self._budget_mb = budget_mb
+        self._models: "OrderedDict[str, LoadedModel]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, model_name: str) -> LoadedModel:
+        """Return a resident model, loading (and evicting) as needed."""
+        with self._lock:
+            loaded = self._models.get(model_name)
+            if loaded is not None:
+                self._models.move_to_end(model_name)
+                return loaded
+
+            before = rss_mb()
+            start = time.perf_counter()
+            backend, model = self._loader(model_name)
+            elapsed = time.perf_counter() - start
+            after = rss_mb()
+
+            measured = (after - before) if before is not None and after is not None else 0.0
+            memory = measured if measured > estimate_memory_mb(model_name) / 4 else estimate_memory_mb(model_name)
+            loaded = LoadedModel(model_name, backend, model, memory, elapsed)
+            self._models[model_name] = loaded
+            self._evict(keep=model_name)
+
+            logger.info(
+                "Loaded %s-whisper '%s' in %.1fs — ~%.0f MB (process RSS %s; resident: %s, %.0f/%d MB)",
+                backend, model_name, elapsed, memory,
+                f"{after:.0f} MB" if after is not None else "n/a",
+                ", ".join(self._models), self.resident_mb(), self._budget_mb,
+            )
+            return loaded
+
+    def _evict(self, keep: str) -> None:
+        while self.resident_mb() > self._budget_mb and len(self._models) > 1:
+            name = next(n for n in self._models if n != keep)
+            evicted = self._models.pop(name)
+            logger.info(
+                "Evicted whisper model '%s' (~%.0f MB) to stay under %d MB",
+                name, evicted.memory_mb, self._budget_mb,
+            )
+            del evicted
+            gc.collect()
+
+    def resident_mb(self) -> float:
+        return sum(m.memory_mb for m in self._models.values())
+
+    def loaded(self) -> List[LoadedModel]:
+        """Resident models, least recently used first."""
+        return list(self._models.values())
+
+    def last_used(self) -> Optional[LoadedModel]:
+        return next(reversed(self._models.values()), None)
@@ -0,0 +1,237 @@
+import logging
+import multiprocessing
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.audio import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+SEARCH_SECONDS = 10.0   # how far around a target cut to look for the quietest frame
+FRAME_SECONDS = 0.03
+
+# ---------------------------------------------------------------------------
+# Parallel chunked transcription
+#
+# Long audio is cut at its quietest points into ~N-minute chunks that
+# overlap slightly, transcribed in a process pool (each process holds its
+# own preloaded model), then stitched back together. The pool outlives a
+# single task so models stay resident between lectures.
+# ---------------------------------------------------------------------------
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_KEY: Optional[Tuple[str, str, int]] = None
+
+# Per-process state inside pool workers
+_worker_model = None
+
+
+def resolve_workers(configured: int) -> int:
+    """0 → one process per core."""
+    return configured if configured > 0 else (os.cpu_count() or 1)
+
+
+def can_use_process_pool() -> bool:
+    """
+    Celery's prefork children are daemonic and may not spawn processes.
+    Run the transcribe worker with `-P solo` or `-P threads` to enable this.
+    """
+    return not multiprocessing.current_process().daemon
+
+
+# ---------------------------------------------------------------------------
+# Chunk planning + stitching
+# ---------------------------------------------------------------------------
+
+def plan_chunks(
+    audio: np.ndarray,
+    chunk_seconds: float,
+    overlap_seconds: float,
+    sr: int = SAMPLE_RATE,
+) -> Tuple[List[Tuple[int, int]], List[int]]:
+    """
+    Choose cut points near every `chunk_seconds` at the quietest frame within
+    ±SEARCH_SECONDS, then widen each chunk by `overlap_seconds` on both sides.
+
+    Returns (chunks as (start_sample, end_sample), cuts as sample offsets).
+    """
+    n = len(audio)
+    target = int(chunk_seconds * sr)
+    if n <= target * 1.5:
+        return [(0, n)], []
+
+    frame = int(FRAME_SECONDS * sr)
+    search = int(SEARCH_SECONDS * sr)
+    cuts: List[int] = []
+    pos = target
+    while n - pos > target // 2:
+        lo = max(pos - search, (cuts[-1] if cuts else 0) + sr)
+        hi = min(pos + search, n - sr)
+        window = audio[lo:hi]
+        n_frames = len(window) // frame
+        if n_frames == 0:
+            cut = pos
+        else:
+            energy = np.mean(window[: n_frames * frame].reshape(n_frames, frame) ** 2, axis=1)
+            cut = lo + int(np.argmin(energy)) * frame + frame // 2
+        cuts.append(cut)
+        pos = cut + target
+
+    overlap = int(overlap_seconds * sr)
+    bounds = [0, *cuts, n]
+    chunks = [
+        (max(0, bounds[i] - overlap), min(n, bounds[i + 1] + overlap))
+        for i in range(len(bounds) - 1)
+    ]
+    return chunks, cuts
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\W+", " ", text.lower()).strip()
+
+
+def _stitch_chunk(stitched: List[dict], segments: List[dict], lo: float, hi: float) -> List[dict]:
+    """
+    Append one chunk's segments (already on the global timeline) to `stitched`.
+    Around each cut, a segment belongs to the chunk its midpoint falls in;
+    a repeated boundary sentence is dropped. Returns the segments added.
+    """
+    added = []
+    for seg in segments:
+        mid = (seg["start"] + seg["end"]) / 2
+        if not lo <= mid < hi:
+            continue
+        if stitched and _normalize(seg["text"]) == _normalize(stitched[-1]["text"]):
+            continue
+        stitched.append(seg)
+        added.append(seg)
+    return added
+
+
+def _chunk_bounds(i: int, cuts: List[float]) -> Tuple[float, float]:
+    lo = cuts[i - 1] if i > 0 else float("-inf")
+    hi = cuts[i] if i < len(cuts) else float("inf")
+    return lo, hi
+
+
+# ---------------------------------------------------------------------------
+# Process pool
+# ---------------------------------------------------------------------------
+
+def _init_worker(model_name: str, backend: str, threads: int) -> None:
+    """Pool initializer — split cores between processes, then preload the model
+    on the parent's backend (so "auto" doesn't re-benchmark in every process)."""
+    global _worker_model
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+    from app.services import transcriber
+    transcriber.use_backend(backend)
+    _worker_model = transcriber._load_model(model_name)
+    logger.info("Transcription worker %d ready (%d threads)", os.getpid(), threads)
+
+
+def _transcribe_chunk(audio: np.ndarray, offset_seconds: float) -> dict:
+    from app.services import transcriber
+    result = transcriber._run_model(_worker_model, audio)
+    result["segments"] = [
+        {
+            **seg,
+            "start": round(seg["start"] + offset_seconds, 2),
+            "end": round(seg["end"] + offset_seconds, 2),
+        }
+        for seg in result["segments"]
+    ]
+    return result
+
+
+def _get_pool(model_name: str, workers: int) -> ProcessPoolExecutor:
+    global _POOL, _POOL_KEY
+    from app.services import transcriber
+    backend = transcriber.resolve_backend()
+    key = (model_name, backend, workers)
+    if _POOL is None or _POOL_KEY != key:
+        if _POOL is not None:
+            _POOL.shutdown(wait=True)
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        # spawn, not fork — forking a process that already holds torch/ctranslate2
+        # state is unsafe
+        _POOL = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model_name, backend, threads),
+        )
+        _POOL_KEY = key
+        logger.info("Started transcription pool: %d processes × %d threads", workers, threads)
+    return _POOL
+
+
+def _discard_pool() -> None:
+    """Drop a broken pool so the next call starts a fresh one."""
+    global _POOL, _POOL_KEY
+    if _POOL is not None:
+        _POOL.shutdown(wait=False, cancel_futures=True)
+    _POOL, _POOL_KEY = None, None
+
+
+def transcribe_parallel(
+    audio: np.ndarray,
+    model_name: str,
+    workers: int,
+    chunk_seconds: float,
+    overlap_seconds: float,
+    sr: int = SAMPLE_RATE,
+    on_segments: Optional[Callable[[List[dict]], None]] = None,
+) -> dict:
+    """
+    Transcribe a 16 kHz array across `workers` processes. Same shape as
+    transcribe_audio. `on_segments` receives each chunk's stitched segments
+    in timeline order as soon as that chunk and all before it are done.
+    """
+    chunks, cuts = plan_chunks(audio, chunk_seconds, overlap_seconds, sr)
+    logger.info(
+        "Parallel transcription: %d chunks of ~%ds over %d processes",
+        len(chunks), chunk_seconds, workers,
+    )
+
+    cut_seconds = [c / sr for c in cuts]
+    segments: List[dict] = []
+    results = []
+    try:
+        pool = _get_pool(model_name, workers)
+        futures = [
+            pool.submit(_transcribe_chunk, audio[start:end], start / sr)
+            for start, end in chunks
+        ]
+        for i, future in enumerate(futures):
+            result = future.result()
+            results.append(result)
+            added = _stitch_chunk(segments, result["segments"], *_chunk_bounds(i, cut_seconds))
+            if on_segments and added:
+                on_segments(added)
+    except BrokenProcessPool:
+        # A child died (OOM kill, failed model load in _init_worker). The
+        # executor stays unusable, so replace it — the task's retry gets a
+        # fresh pool instead of failing until the worker restarts.
+        logger.error("Transcription pool broke — it will be restarted on the next call")
+        _discard_pool()
+        raise
+    languages = Counter(r.get("language", "unknown") for r in results)
+
+    return {
+        "full_text": " ".join(seg["text"] for seg in segments if seg["text"]),
+        "segments": segments,
+        "language": languages.most_common(1)[0][0],
+        "backend": results[0].get("backend"),
+    }
@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+
+from passlib.hash import bcrypt
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasherBusy(Exception):
+    """Too many hashes already queued — the caller should answer 503."""
+
+
+# ---------------------------------------------------------------------------
+# bcrypt off the event loop and off the shared thread pool
+#
+# Hashing is deliberately slow and holds the GIL, so a login burst in
+# FastAPI's thread pool delays every other threadpool-backed endpoint. Here
+# it runs in a small dedicated process pool. At most `max_pending` jobs may
+# be queued or running; past that, requests are refused rather than piling
+# up. verify() also rehashes passwords whose bcrypt cost differs from
+# BCRYPT_ROUNDS so existing users migrate on their next login.
+# ---------------------------------------------------------------------------
+
+def bcrypt_rounds(hashed: str) -> Optional[int]:
+    """Cost factor of a bcrypt hash ("$2b$12$…" → 12), or None if unparsable."""
+    try:
+        return int(hashed.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+
+def hash_password(password: str, rounds: int) -> str:
+    return bcrypt.using(rounds=rounds).hash(password)
+
+
+def verify_password(password: str, hashed: str, rounds: int) -> Tuple[bool, Optional[str]]:
+    """(matches, new hash at `rounds` if the stored cost differs, else None)."""
+    try:
+        ok = bcrypt.verify(password, hashed)
+    except ValueError:   # not a bcrypt hash
+        return False, None
+    if ok and bcrypt_rounds(hashed) != rounds:
+        return True, hash_password(password, rounds)
+    return ok, None
+
+
+def _timed(fn, *args):
+    """Runs in a pool process — returns (wall-clock start, seconds, result)."""
+    started = time.time()
+    result = fn(*args)
+    return started, time.time() - started, result
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, max_pending: int, rounds: int):
+        self.workers = max(1, workers)
+        self.max_pending = max(self.workers, max_pending)
+        self.rounds = rounds
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._jobs = 0
+        self._rejected = 0
+        self._rehashed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._run_total = 0.0
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(hash_password, password, self.rounds)
+
+    async def verify(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        ok, new_hash = await self._submit(verify_password, password, hashed, self.rounds)
+        if new_hash:
+            with self._lock:
+                self._rehashed += 1
+        return ok, new_hash
+
+    def stats(self) -> dict:
+        with self._lock:
+            jobs = self._jobs
+            return {
+                "workers": self.workers,
+                "rounds": self.rounds,
+                "pending": self._pending,
+                "max_pending": self.max_pending,
+                "jobs": jobs,
+                "rejected": self._rejected,
+                "rehashed": self._rehashed,
+                "avg_queue_ms": round(self._wait_total / jobs * 1000, 1) if jobs else 0.0,
+                "max_queue_ms": round(self._wait_max * 1000, 1),
+                "avg_hash_ms": round(self._run_total / jobs * 1000, 1) if jobs else 0.0,
+            }
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    # ------------------------------------------------------------------
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn, not fork — the API process runs threads and an event loop
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info("Started password hashing pool: %d processes, bcrypt cost %d", self.workers, self.rounds)
+        return self._executor
+
+    async def _submit(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise PasswordHasherBusy()
+            self._pending += 1
+        submitted = time.time()
+        try:
+            started, elapsed, result = await asyncio.wrap_future(self._pool().submit(_timed, fn, *args))
+        except BrokenProcessPool:
+            logger.error("Password hashing pool died — it will be restarted on the next request")
+            self.close()
+            raise
+        finally:
+            with self._lock:
+                self._pending -= 1
+        wait = max(0.0, started - submitted)
+        with self._lock:
+            self._jobs += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+            self._run_total += elapsed
+        return result
+
+
+# Singleton — used by the auth routes
+password_hasher = PasswordHasher(
+    settings.password_hash_workers,
+    settings.password_hash_max_pending,
+    settings.bcrypt_rounds,
+)
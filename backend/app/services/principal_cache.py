@@ -0,0 +1,135 @@
+import json
+import logging
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from app.config import settings
+from app.services.cache_base import CountingCache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as routes see it — no ORM row, no session."""
+
+    id: str
+    email: str
+    name: str
+
+
+# ---------------------------------------------------------------------------
+# Token subject → principal cache
+#
+# get_current_user runs on every authenticated request, status polls
+# included. A short TTL in-process map answers most of them; the optional
+# Redis layer lets every API process share warm entries. Deleting a user
+# drops their entry here and in Redis; other processes' in-process copies
+# expire within the TTL.
+# ---------------------------------------------------------------------------
+
+class PrincipalCache(CountingCache):
+    """In-process TTL cache. Subclasses add a shared second level."""
+
+    name = "Principal cache"
+    backend = "memory"
+
+    async def get(self, user_id: str) -> Optional[Principal]:
+        principal = self._get_local(user_id)
+        if principal is None:
+            try:
+                principal = await self._get_shared(user_id)
+            except Exception as e:
+                self._failed("read", e)
+            if principal is not None:
+                self._set_local(user_id, principal)
+        if principal is None:
+            self._record(misses=1)
+        else:
+            self._record(hits=1)
+        return principal
+
+    async def set(self, principal: Principal) -> None:
+        self._set_local(principal.id, principal)
+        try:
+            await self._set_shared(principal)
+        except Exception as e:
+            self._failed("write", e)
+
+    def invalidate(self, user_id: str) -> None:
+        """Forget a user (sync — safe to call from ORM events)."""
+        self._delete_local(user_id)
+        try:
+            self._delete_shared(user_id)
+        except Exception as e:
+            self._failed("invalidation", e)
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = len(self._entries)
+        return {**super().stats(), "entries": size}
+
+    # ------------------------------------------------------------------
+
+    async def _get_shared(self, user_id: str) -> Optional[Principal]:
+        return None
+
+    async def _set_shared(self, principal: Principal) -> None:
+        pass
+
+    def _delete_shared(self, user_id: str) -> None:
+        pass
+
+
+class RedisPrincipalCache(PrincipalCache):
+    """In-process first, then Redis (SETEX) shared by every API process."""
+
+    backend = "redis"
+    PREFIX = "auth-principal:"
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        super().__init__(ttl_seconds, max_entries)
+        self._redis = None
+
+    def _client(self):
+        if self._redis is None:
+            import redis.asyncio as aioredis
+            self._redis = aioredis.Redis.from_url(settings.redis_url, socket_timeout=1)
+        return self._redis
+
+    async def _get_shared(self, user_id: str) -> Optional[Principal]:
+        raw = await self._client().get(self.PREFIX + user_id)
+        return Principal(**json.loads(raw)) if raw else None
+
+    async def _set_shared(self, principal: Principal) -> None:
+        await self._client().set(self.PREFIX + principal.id, json.dumps(asdict(principal)), ex=self.ttl_seconds)
+
+    def _delete_shared(self, user_id: str) -> None:
+        from app.utils.redis_client import get_redis
+        get_redis().delete(self.PREFIX + user_id)
+
+
+class NullPrincipalCache(PrincipalCache):
+    """Caching off — every request reads the users table."""
+
+    backend = "off"
+
+    def _set_local(self, key: str, value: Principal) -> None:
+        pass
+
+
+def _build_cache() -> PrincipalCache:
+    backend = settings.auth_cache_backend.lower()
+    ttl, max_entries = settings.auth_cache_ttl_seconds, settings.auth_cache_max_entries
+    if backend == "off" or ttl <= 0:
+        logger.info("Principal cache disabled")
+        return NullPrincipalCache(ttl, max_entries)
+    if backend == "redis":
+        logger.info("Principal cache → memory + Redis (ttl=%ds)", ttl)
+        return RedisPrincipalCache(ttl, max_entries)
+    logger.info("Principal cache → memory (ttl=%ds, max=%d)", ttl, max_entries)
+    return PrincipalCache(ttl, max_entries)
+
+
+# Singleton — used by utils.auth.get_current_user
+principal_cache = _build_cache()
@@ -0,0 +1,146 @@
+import asyncio
+import json
+import logging
+from typing import Dict, Optional, Set
+
+from app.config import settings
+from app.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "lecture-progress:"
+SNAPSHOT_PREFIX = "lecture-progress-state:"
+SNAPSHOT_TTL_SECONDS = 24 * 3600
+TERMINAL_STATUSES = {"completed", "failed"}
+
+# ---------------------------------------------------------------------------
+# Lecture progress push channel
+#
+# Workers publish every progress change to Redis pub/sub and keep the latest
+# state (plus the owner's user id) in a hash. The API holds ONE pattern
+# subscription per process and fans messages out to connected SSE clients,
+# so waiting students cost no Postgres reads at all.
+# ---------------------------------------------------------------------------
+
+
+def _channel(lecture_id: str) -> str:
+    return f"{CHANNEL_PREFIX}{lecture_id}"
+
+
+def _snapshot_key(lecture_id: str) -> str:
+    return f"{SNAPSHOT_PREFIX}{lecture_id}"
+
+
+def publish_progress(
+    lecture_id: str,
+    status: str,
+    progress: int,
+    error_message: Optional[str] = None,
+    user_id: Optional[str] = None,
+) -> None:
+    """
+    Update the lecture's snapshot and notify subscribers. Never raises — a
+    Redis hiccup must not fail the pipeline; clients fall back to polling.
+    """
+    event = {"id": lecture_id, "status": status, "progress": progress, "error_message": error_message}
+    state = {"status": status, "progress": progress, "error_message": error_message or ""}
+    if user_id:
+        state["user_id"] = user_id
+    try:
+        r = get_redis()
+        pipe = r.pipeline()
+        pipe.hset(_snapshot_key(lecture_id), mapping=state)
+        pipe.expire(_snapshot_key(lecture_id), SNAPSHOT_TTL_SECONDS)
+        pipe.publish(_channel(lecture_id), json.dumps(event))
+        pipe.execute()
+    except Exception as e:
+        logger.warning("[%s] Progress publish failed: %s", lecture_id, e)
+
+
+class ProgressBroadcaster:
+    """One Redis pattern subscription per API process, fanned out to asyncio queues."""
+
+    RECONNECT_SECONDS = 2.0
+
+    def __init__(self):
+        self._redis = None
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def _client(self):
+        if self._redis is None:
+            import redis.asyncio as aioredis
+            self._redis = aioredis.Redis.from_url(settings.redis_url, decode_responses=True)
+        return self._redis
+
+    async def snapshot(self, lecture_id: str) -> Optional[dict]:
+        """Latest state published for this lecture, including `user_id`, or None."""
+        state = await self._client().hgetall(_snapshot_key(lecture_id))
+        if not state:
+            return None
+        return {
+            "id": lecture_id,
+            "status": state.get("status"),
+            "progress": int(state.get("progress") or 0),
+            "error_message": state.get("error_message") or None,
+            "user_id": state.get("user_id"),
+        }
+
+    def subscribe(self, lecture_id: str, queue: Optional[asyncio.Queue] = None) -> asyncio.Queue:
+        """Queue receiving the lecture's events. Pass an existing queue to
+        multiplex several lectures into one stream."""
+        if queue is None:
+            queue = asyncio.Queue(maxsize=100)
+        self._subscribers.setdefault(lecture_id, set()).add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+        return queue
+
+    def unsubscribe(self, lecture_id: str, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(lecture_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[lecture_id]
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = self._client().pubsub(ignore_subscribe_messages=True)
+                await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+                logger.info("Progress broadcaster subscribed to %s*", CHANNEL_PREFIX)
+                async for message in pubsub.listen():
+                    if message.get("type") != "pmessage":
+                        continue
+                    self._dispatch(message["channel"][len(CHANNEL_PREFIX):], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Progress broadcaster lost Redis (%s) — reconnecting", e)
+                await asyncio.sleep(self.RECONNECT_SECONDS)
+
+    def _dispatch(self, lecture_id: str, data: str) -> None:
+        queues = self._subscribers.get(lecture_id)
+        if not queues:
+            return
+        event = json.loads(data)
+        for queue in queues:
+            if queue.full():
+                queue.get_nowait()  # slow client — drop the oldest, progress is cumulative
+            queue.put_nowait(event)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+
+# Singleton — used by the lectures SSE endpoint
+progress_broadcaster = ProgressBroadcaster()
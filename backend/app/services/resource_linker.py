@@ -1,7 +1,10 @@
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
 from app.config import settings
+from app.services.youtube_cache import youtube_cache
 
 logger = logging.getLogger(__name__)
 
@@ -58,59 +61,88 @@ PRACTICE_MAP = {
 }
 
 
+# ---------------------------------------------------------------------------
+# YouTube search
+#
+# The client is built once per process: build() parses the whole YouTube
+# discovery document, which is far slower than the search itself. Its Http
+# transport (httplib2) is not thread-safe, so each concurrent search
+# executes on its own fresh Http object.
+# ---------------------------------------------------------------------------
+
+_youtube_client = None
+_youtube_client_lock = threading.Lock()
+
+
 def _get_youtube_client():
+    global _youtube_client
     key = settings.youtube_api_key
     if not key or key in ("your_youtube_api_key", "AIzaYOUR_KEY", ""):
         return None
-    try:
-        from googleapiclient.discovery import build
-        return build("youtube", "v3", developerKey=key)
-    except Exception as e:
-        logger.warning("YouTube client build failed: %s", e)
-        return None
+    if _youtube_client is not None:
+        return _youtube_client
+    with _youtube_client_lock:
+        if _youtube_client is None:
+            try:
+                from googleapiclient.discovery import build
+                _youtube_client = build("youtube", "v3", developerKey=key, cache_discovery=False)
+            except Exception as e:
+                logger.warning("YouTube client build failed: %s", e)   # retried on the next call
+        return _youtube_client
+
+
+def _search_youtube(youtube, topic: str, max_results: int) -> List[dict]:
+    import httplib2
+
+    response = youtube.search().list(
+        part="snippet",
+        q=f"{topic} tutorial explained",
+        maxResults=max_results + 2,
+        type="video",
+        videoCategoryId="27",    # Education
+        order="relevance",
+        relevanceLanguage="en",
+    ).execute(http=httplib2.Http(timeout=settings.youtube_timeout_seconds))
+
+    results = []
+    for item in response.get("items", []):
+        video_id = item.get("id", {}).get("videoId")
+        if not video_id:
+            continue
+        snippet = item["snippet"]
+        results.append({
+            "type": "youtube",
+            "title": snippet.get("title", "")[:200],
+            "url": f"https://www.youtube.com/watch?v={video_id}",
+            "thumbnail_url": snippet.get("thumbnails", {}).get("medium", {}).get("url"),
+            "topic": topic,
+            "relevance_score": 1.0,
+        })
+        if len(results) >= max_results:
+            break
+    return results
 
 
 def find_youtube_videos(topic: str, max_results: int = 2) -> List[dict]:
+    cached = youtube_cache.get(topic, max_results)
+    if cached is not None:
+        logger.info("YouTube: %d videos for '%s' (cached)", len(cached), topic)
+        return cached
+
     youtube = _get_youtube_client()
     if not youtube:
         return []
 
     try:
-        from googleapiclient.errors import HttpError
-        response = youtube.search().list(
-            part="snippet",
-            q=f"{topic} tutorial explained",
-            maxResults=max_results + 2,
-            type="video",
-            videoCategoryId="27",    # Education
-            order="relevance",
-            relevanceLanguage="en",
-        ).execute()
-
-        results = []
-        for item in response.get("items", []):
-            video_id = item.get("id", {}).get("videoId")
-            if not video_id:
-                continue
-            snippet = item["snippet"]
-            results.append({
-                "type": "youtube",
-                "title": snippet.get("title", "")[:200],
-                "url": f"https://www.youtube.com/watch?v={video_id}",
-                "thumbnail_url": snippet.get("thumbnails", {}).get("medium", {}).get("url"),
-                "topic": topic,
-                "relevance_score": 1.0,
-            })
-            if len(results) >= max_results:
-                break
-
-        logger.info("YouTube: %d videos for '%s'", len(results), topic)
-        return results
-
+        results = _search_youtube(youtube, topic, max_results)
     except Exception as e:
         logger.warning("YouTube search failed for '%s': %s", topic, e)
         return []
 
+    youtube_cache.set(topic, max_results, results)
+    logger.info("YouTube: %d videos for '%s'", len(results), topic)
+    return results
+
 
 def find_documentation(topic: str) -> List[dict]:
     topic_lower = topic.lower()
@@ -152,9 +184,21 @@ def get_resources_for_topics(topics: List[str], max_total: int = 5) -> List[dict
     all_resources: List[dict] = []
     seen_urls: set = set()
 
-    for topic in topics[:3]:     # cap at 3 topics to preserve YouTube quota
+    # Cap protects the YouTube quota (100 units per uncached search)
+    topics = topics[:settings.resource_max_topics]
+    if not topics:
+        return []
+
+    # Topic searches are independent network calls — run them side by side
+    with ThreadPoolExecutor(
+        max_workers=min(len(topics), max(1, settings.youtube_max_concurrency)),
+        thread_name_prefix="youtube",
+    ) as pool:
+        videos = list(pool.map(find_youtube_videos, topics))
+
+    for topic, topic_videos in zip(topics, videos):
         for resource in [
-            *find_youtube_videos(topic),
+            *topic_videos,
             *find_documentation(topic),
             *find_practice_problems(topic),
         ]:
@@ -1,14 +1,20 @@
+import errno
 import logging
 import os
+import shutil
 import tempfile
+from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import Optional
 
 from app.config import settings
+from app.services.audio_cache import AudioCache
 
 logger = logging.getLogger(__name__)
 
 UPLOAD_DIR = Path("uploads")
+S3_PART_SIZE = 8 * 1024 * 1024   # multipart part size (S3 minimum is 5 MB)
+MB = 1024 * 1024
 
 
 def _is_s3_configured() -> bool:
@@ -52,8 +58,13 @@ class StorageService:
                 region_name=settings.aws_region,
             )
             logger.info("StorageService → S3 backend (bucket: %s)", settings.s3_bucket_name)
+            self.audio_cache = (
+                AudioCache(settings.audio_cache_dir, settings.audio_cache_max_mb * MB)
+                if settings.audio_cache_max_mb > 0 else None
+            )
         else:
             self.backend = "local"
+            self.audio_cache = None
             UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
             logger.info("StorageService → LOCAL backend (%s)", UPLOAD_DIR.resolve())
 
@@ -69,18 +80,61 @@ class StorageService:
           - S3:    "lectures/{lecture_id}.{ext}"
           - local: absolute path string
         """
+        writer = self.open_writer(lecture_id, extension)
+        try:
+            writer.write(file_bytes)
+            return writer.commit()
+        except Exception:
+            writer.abort()
+            raise
+
+    def storage_key_for(self, lecture_id: str, extension: str) -> str:
+        """The key save_audio / open_writer would return for this lecture."""
         ext = extension.lstrip(".").lower()
+        if self.backend == "s3":
+            return f"lectures/{lecture_id}.{ext}"
+        return str((UPLOAD_DIR / f"{lecture_id}.{ext}").resolve())
+
+    def normalized_key_for(self, storage_key: str) -> str:
+        """Where the 16 kHz mono FLAC made from `storage_key` is stored —
+        right next to the original, so it is found (and deleted) with it."""
+        return storage_key.rsplit(".", 1)[0] + ".16k.flac"
 
+    def put_file(self, src_path: str, storage_key: str, content_type: str) -> str:
+        """Store a local file under `storage_key` (moved, for the local backend)."""
         if self.backend == "s3":
-            key = f"lectures/{lecture_id}.{ext}"
-            self._upload_s3(file_bytes, key, f"audio/{ext}")
-            return key
+            self._s3.upload_file(
+                src_path, settings.s3_bucket_name, storage_key,
+                ExtraArgs={"ContentType": content_type, "ServerSideEncryption": "AES256"},
+            )
+            logger.info("Uploaded to S3: %s", storage_key)
+            return storage_key
 
-        # Local
-        path = UPLOAD_DIR / f"{lecture_id}.{ext}"
-        path.write_bytes(file_bytes)
-        logger.info("Saved locally: %s", path)
-        return str(path.resolve())
+        try:
+            os.replace(src_path, storage_key)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            # src is on another filesystem (e.g. /tmp on tmpfs, uploads on a
+            # volume) — copy next to the target, then rename, so readers
+            # never see a partial file
+            part = f"{storage_key}.part"
+            shutil.copyfile(src_path, part)
+            os.replace(part, storage_key)
+            os.unlink(src_path)
+        logger.info("Saved locally: %s", storage_key)
+        return storage_key
+
+    def open_writer(self, lecture_id: str, extension: str) -> "AudioWriter":
+        """
+        Streaming counterpart of save_audio: call write() per chunk, then
+        commit() for the storage key, or abort() to discard. Memory held is
+        at most one chunk (local) or one multipart part (S3).
+        """
+        ext = extension.lstrip(".").lower()
+        if self.backend == "s3":
+            return _S3AudioWriter(self._s3, f"lectures/{lecture_id}.{ext}", f"audio/{ext}")
+        return _LocalAudioWriter(UPLOAD_DIR / f"{lecture_id}.{ext}")
 
     # ------------------------------------------------------------------
     # Read — always returns a local filesystem path for Whisper
@@ -88,9 +142,11 @@ class StorageService:
 
     def get_local_path(self, storage_key: str) -> str:
         """
-        For S3: downloads the object to a temp file, returns that path.
+        For S3: returns a path in the worker-local audio cache, downloading
+        the object first unless a valid copy of the same version is cached.
+        With the cache disabled (AUDIO_CACHE_MAX_MB=0) it downloads to a temp
+        file, which the Celery task cleans up after transcription.
         For local: validates the path exists, returns it directly.
-        The Celery task cleans up temp files after transcription.
         """
         if self.backend == "local":
             p = Path(storage_key)
@@ -98,13 +154,28 @@ class StorageService:
                 raise FileNotFoundError(f"Audio file not found: {storage_key}")
             return str(p)
 
+        if self.audio_cache is not None:
+            head = self._s3.head_object(Bucket=settings.s3_bucket_name, Key=storage_key)
+            etag, size = head["ETag"].strip('"'), head["ContentLength"]
+            cached = self.audio_cache.lookup(storage_key, etag, size)
+            if cached:
+                logger.info("Audio cache hit: %s → %s", storage_key, cached)
+                return cached
+            # Versioned buckets report the VersionId we validated against;
+            # otherwise store() catches a concurrent overwrite by size/MD5
+            version_id = head.get("VersionId")
+            path = self.audio_cache.store(
+                storage_key, etag, size, lambda dest: self._download(storage_key, dest, version_id)
+            )
+            logger.info("S3 → audio cache: %s → %s (%d bytes)", storage_key, path, size)
+            return path
+
         # S3 — download to a named temp file
         suffix = Path(storage_key).suffix or ".mp3"
         tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
         tmp.close()
         try:
-            from botocore.exceptions import ClientError
-            self._s3.download_file(settings.s3_bucket_name, storage_key, tmp.name)
+            self._download(storage_key, tmp.name)
             logger.info("S3 → local temp: %s → %s", storage_key, tmp.name)
             return tmp.name
         except Exception as e:
@@ -112,6 +183,25 @@ class StorageService:
             logger.error("S3 download failed: %s", e)
             raise
 
+    def is_cached_path(self, path: Optional[str]) -> bool:
+        """True for files owned by the audio cache (callers must not delete them)."""
+        return self.audio_cache is not None and self.audio_cache.contains(path)
+
+    def _download(self, storage_key: str, dest: str, version_id: Optional[str] = None) -> None:
+        """Objects above one part are fetched as concurrent ranged GETs."""
+        from boto3.s3.transfer import TransferConfig
+        part = settings.audio_download_part_mb * MB
+        config = TransferConfig(
+            multipart_threshold=part,
+            multipart_chunksize=part,
+            max_concurrency=settings.audio_download_concurrency,
+        )
+        # VersionId pins every range to the version we validated against
+        extra = {"VersionId": version_id} if version_id else None
+        self._s3.download_file(
+            settings.s3_bucket_name, storage_key, dest, ExtraArgs=extra, Config=config
+        )
+
     # ------------------------------------------------------------------
     # Delete
     # ------------------------------------------------------------------
@@ -136,6 +226,43 @@ class StorageService:
     def get_backend(self) -> str:
         return self.backend
 
+    def get_size(self, storage_key: str) -> Optional[int]:
+        """Size in bytes of a stored object, or None if it doesn't exist."""
+        if self.backend == "s3":
+            from botocore.exceptions import ClientError
+            try:
+                head = self._s3.head_object(Bucket=settings.s3_bucket_name, Key=storage_key)
+            except ClientError as e:
+                if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                    return None
+                raise
+            return head["ContentLength"]
+
+        path = Path(storage_key)
+        return path.stat().st_size if path.exists() else None
+
+    def get_presigned_upload(
+        self, storage_key: str, content_type: str, max_bytes: int, expiry: int = 3600
+    ) -> Optional[dict]:
+        """
+        Presigned POST so a client can upload straight to S3. Returns
+        {"url": ..., "fields": {...}} — send `fields` plus the file as a
+        multipart form. Only available for S3 backend. Returns None for local.
+        """
+        if self.backend != "s3":
+            return None
+        return self._s3.generate_presigned_post(
+            Bucket=settings.s3_bucket_name,
+            Key=storage_key,
+            Fields={"Content-Type": content_type, "x-amz-server-side-encryption": "AES256"},
+            Conditions=[
+                {"Content-Type": content_type},
+                {"x-amz-server-side-encryption": "AES256"},
+                ["content-length-range", 1, max_bytes],
+            ],
+            ExpiresIn=expiry,
+        )
+
     def get_presigned_url(self, storage_key: str, expiry: int = 3600) -> Optional[str]:
         """Only available for S3 backend. Returns None for local."""
         if self.backend != "s3":
@@ -146,23 +273,128 @@ class StorageService:
             ExpiresIn=expiry,
         )
 
-    # ------------------------------------------------------------------
-    # Internal
-    # ------------------------------------------------------------------
 
-    def _upload_s3(self, file_bytes: bytes, key: str, content_type: str) -> None:
-        try:
-            self._s3.put_object(
+# ---------------------------------------------------------------------------
+# Streaming writers
+# ---------------------------------------------------------------------------
+
+class AudioWriter(ABC):
+    bytes_written = 0
+
+    @abstractmethod
+    def write(self, chunk: bytes) -> None:
+        ...
+
+    @abstractmethod
+    def commit(self) -> str:
+        """Finish the upload and return its storage key."""
+
+    @abstractmethod
+    def abort(self) -> None:
+        """Discard everything written so far. Safe to call more than once."""
+
+
+class _LocalAudioWriter(AudioWriter):
+    """Writes to `<name>.part` and renames on commit, so a half-written
+    upload never appears under the final name."""
+
+    def __init__(self, path: Path):
+        self._path = path
+        self._part = path.with_name(path.name + ".part")
+        self._file = open(self._part, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        self._file.write(chunk)
+        self.bytes_written += len(chunk)
+
+    def commit(self) -> str:
+        self._file.close()
+        os.replace(self._part, self._path)
+        logger.info("Saved locally: %s (%d bytes)", self._path, self.bytes_written)
+        return str(self._path.resolve())
+
+    def abort(self) -> None:
+        self._file.close()
+        if self._part.exists():
+            self._part.unlink()
+
+
+class _S3AudioWriter(AudioWriter):
+    """
+    S3 multipart upload, one part per S3_PART_SIZE bytes. The multipart
+    upload is only started once the first part fills up; smaller files go
+    up in a single put_object on commit.
+    """
+
+    def __init__(self, s3, key: str, content_type: str):
+        self._s3 = s3
+        self._key = key
+        self._content_type = content_type
+        self._buffer = bytearray()
+        self._upload_id: Optional[str] = None
+        self._parts = []
+
+    def write(self, chunk: bytes) -> None:
+        self._buffer += chunk
+        self.bytes_written += len(chunk)
+        while len(self._buffer) >= S3_PART_SIZE:
+            self._upload_part(bytes(self._buffer[:S3_PART_SIZE]))
+            del self._buffer[:S3_PART_SIZE]
+
+    def _upload_part(self, data: bytes) -> None:
+        if self._upload_id is None:
+            self._upload_id = self._s3.create_multipart_upload(
                 Bucket=settings.s3_bucket_name,
-                Key=key,
-                Body=file_bytes,
-                ContentType=content_type,
+                Key=self._key,
+                ContentType=self._content_type,
                 ServerSideEncryption="AES256",
-            )
-            logger.info("Uploaded to S3: %s", key)
+            )["UploadId"]
+        number = len(self._parts) + 1
+        resp = self._s3.upload_part(
+            Bucket=settings.s3_bucket_name,
+            Key=self._key,
+            UploadId=self._upload_id,
+            PartNumber=number,
+            Body=data,
+        )
+        self._parts.append({"PartNumber": number, "ETag": resp["ETag"]})
+
+    def commit(self) -> str:
+        try:
+            if self._upload_id is None:
+                self._s3.put_object(
+                    Bucket=settings.s3_bucket_name,
+                    Key=self._key,
+                    Body=bytes(self._buffer),
+                    ContentType=self._content_type,
+                    ServerSideEncryption="AES256",
+                )
+            else:
+                if self._buffer:
+                    self._upload_part(bytes(self._buffer))
+                self._s3.complete_multipart_upload(
+                    Bucket=settings.s3_bucket_name,
+                    Key=self._key,
+                    UploadId=self._upload_id,
+                    MultipartUpload={"Parts": self._parts},
+                )
         except Exception as e:
             logger.error("S3 upload failed: %s", e)
             raise
+        self._buffer.clear()
+        logger.info("Uploaded to S3: %s (%d bytes, %d parts)", self._key, self.bytes_written, len(self._parts) or 1)
+        return self._key
+
+    def abort(self) -> None:
+        self._buffer.clear()
+        if self._upload_id is not None:
+            try:
+                self._s3.abort_multipart_upload(
+                    Bucket=settings.s3_bucket_name, Key=self._key, UploadId=self._upload_id,
+                )
+            except Exception as e:
+                logger.warning("S3 multipart abort failed (non-fatal): %s", e)
+            self._upload_id = None
 
 
 # Singleton — imported by API routes and Celery tasks
@@ -1,74 +1,227 @@
 import os
+import importlib.util
 import logging
 import tempfile
-from typing import Optional
+import threading
+import time
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from app.config import settings
+from app.services.audio import SAMPLE_RATE, load_audio
+from app.services.model_registry import LoadedModel, ModelRegistry
+from app.services.parallel_transcriber import can_use_process_pool, resolve_workers, transcribe_parallel
+from app.services.vad import detect_speech, trim_silence
 
 logger = logging.getLogger(__name__)
 
+BACKENDS = ("openai", "faster")
+BENCHMARK_SECONDS = 10
+
 # ---------------------------------------------------------------------------
-# Whisper Backend Detection
-# Try openai-whisper first (as stated in PPT), fall back to faster-whisper
+# Whisper Backend Selection
+# WHISPER_BACKEND=openai|faster pins a backend. "auto" times both installed
+# backends on a short clip once per process (at worker start when preloading)
+# and keeps the faster one. If only one backend is installed it is used.
 # ---------------------------------------------------------------------------
 
-_BACKEND = None  # "openai" or "faster"
-_MODEL = None
+_backend_choice: Optional[str] = None
+_backend_lock = threading.Lock()
+_benchmarked = {}   # (backend, model_name) → model kept from the benchmark
 
 
-def _load_model(model_name: str = "base"):
-    """Load Whisper model — tries openai-whisper first, faster-whisper second."""
-    global _BACKEND, _MODEL
+def _installed(backend: str) -> bool:
+    module = "whisper" if backend == "openai" else "faster_whisper"
+    return importlib.util.find_spec(module) is not None
 
-    if _MODEL is not None:
-        return _MODEL
 
-    # --- Primary: openai-whisper ---
-    try:
+def _load_with(backend: str, model_name: str):
+    if backend == "openai":
         import whisper
         logger.info(f"Loading openai-whisper model '{model_name}'...")
-        _MODEL = whisper.load_model(model_name)
-        _BACKEND = "openai"
-        logger.info("✅ openai-whisper loaded successfully")
-        return _MODEL
-    except ImportError:
-        logger.warning("openai-whisper not installed — falling back to faster-whisper")
-    except Exception as e:
-        logger.warning(f"openai-whisper failed to load ({e}) — falling back to faster-whisper")
+        return whisper.load_model(model_name, device="cpu")
 
-    # --- Fallback: faster-whisper ---
-    try:
-        from faster_whisper import WhisperModel
-        logger.info(f"Loading faster-whisper model '{model_name}'...")
-        _MODEL = WhisperModel(model_name, device="cpu", compute_type="int8")
-        _BACKEND = "faster"
-        logger.info("✅ faster-whisper loaded as fallback")
-        return _MODEL
-    except ImportError:
+    from faster_whisper import WhisperModel
+    logger.info(
+        f"Loading faster-whisper model '{model_name}' "
+        f"(compute_type={settings.faster_whisper_compute_type}, "
+        f"cpu_threads={settings.faster_whisper_cpu_threads}, "
+        f"num_workers={settings.faster_whisper_num_workers})..."
+    )
+    return WhisperModel(
+        model_name,
+        device="cpu",
+        compute_type=settings.faster_whisper_compute_type,
+        cpu_threads=settings.faster_whisper_cpu_threads,
+        num_workers=settings.faster_whisper_num_workers,
+    )
+
+
+def _benchmark_clip() -> np.ndarray:
+    """
+    WHISPER_BENCHMARK_CLIP if set, else a synthetic voiced signal (harmonics
+    of a 140 Hz pitch modulated at syllable rate). Encoder cost — most of
+    Whisper's CPU time on a short clip — doesn't depend on the content.
+    """
+    if settings.whisper_benchmark_clip:
+        return load_audio(settings.whisper_benchmark_clip)[: BENCHMARK_SECONDS * SAMPLE_RATE]
+    t = np.arange(BENCHMARK_SECONDS * SAMPLE_RATE) / SAMPLE_RATE
+    voice = sum(np.sin(2 * np.pi * 140 * k * t) / k for k in range(1, 8))
+    envelope = 0.5 * (1 + np.sin(2 * np.pi * 4 * t))
+    noise = np.random.default_rng(0).standard_normal(len(t)) * 0.005
+    return (0.1 * voice * envelope + noise).astype(np.float32)
+
+
+def _benchmark_backends(backends: List[str]) -> str:
+    clip = _benchmark_clip()
+    model_name = settings.whisper_model
+    timings = {}
+    models = {}
+    for backend in backends:
+        try:
+            models[backend] = _load_with(backend, model_name)
+            run = _transcribe_openai if backend == "openai" else _transcribe_faster
+            start = time.perf_counter()
+            run(models[backend], clip)
+            timings[backend] = time.perf_counter() - start
+        except Exception as e:
+            logger.warning(f"Benchmark: {backend}-whisper failed ({e}) — skipping")
+
+    if not timings:
+        raise RuntimeError("No Whisper backend could transcribe the benchmark clip")
+
+    winner = min(timings, key=timings.get)
+    logger.info(
+        f"Backend benchmark ('{model_name}', {len(clip) / SAMPLE_RATE:.0f}s clip): "
+        + ", ".join(f"{b}={t:.2f}s" for b, t in sorted(timings.items(), key=lambda kv: kv[1]))
+        + f" → using {winner}-whisper"
+    )
+    # Hand the winner's model to the registry instead of loading it again
+    _benchmarked[(winner, model_name)] = models[winner]
+    return winner
+
+
+def _choose_backend() -> str:
+    available = [b for b in BACKENDS if _installed(b)]
+    if not available:
         raise RuntimeError(
             "Neither openai-whisper nor faster-whisper is installed. "
             "Run: pip install openai-whisper  OR  pip install faster-whisper"
         )
 
+    policy = settings.whisper_backend.lower()
+    if policy in available:
+        return policy
+    if policy != "auto":
+        logger.warning(f"WHISPER_BACKEND={policy} is not installed — using {available[0]}-whisper")
+        return available[0]
+    if len(available) == 1:
+        return available[0]
+    return _benchmark_backends(available)
+
+
+def resolve_backend() -> str:
+    """The backend this process uses, benchmarking on first call under "auto"."""
+    global _backend_choice
+    with _backend_lock:
+        if _backend_choice is None:
+            _backend_choice = _choose_backend()
+        return _backend_choice
+
+
+def use_backend(backend: str) -> None:
+    """Pin the backend without benchmarking (pool processes inherit the parent's)."""
+    global _backend_choice
+    with _backend_lock:
+        _backend_choice = backend
+
+
+def _load_backend(model_name: str):
+    """Load `model_name` on the resolved backend. Returns (backend, model)."""
+    backend = resolve_backend()
+    model = _benchmarked.pop((backend, model_name), None)
+    if model is None:
+        model = _load_with(backend, model_name)
+    return backend, model
+
+
+model_registry = ModelRegistry(_load_backend, budget_mb=settings.whisper_memory_budget_mb)
+
+
+def _load_model(model_name: str = "base") -> LoadedModel:
+    """Return a resident model from the registry, loading it on first use."""
+    return model_registry.get(model_name)
 
-def get_whisper_backend() -> str:
-    """Returns which backend is active: 'openai' or 'faster'."""
-    if _BACKEND is None:
-        _load_model()
-    return _BACKEND
+
+def configured_models() -> List[str]:
+    """Every model this deployment may select — what a worker should preload."""
+    models = [settings.whisper_model]
+    if settings.whisper_long_model and settings.whisper_long_model not in models:
+        models.append(settings.whisper_long_model)
+    return models
+
+
+def select_model(duration_seconds: float) -> str:
+    """Pick the model for a recording: the long-audio model at/above the threshold."""
+    if settings.whisper_long_model and duration_seconds >= settings.whisper_long_audio_seconds:
+        return settings.whisper_long_model
+    return settings.whisper_model
+
+
+def preload_models() -> None:
+    """Choose the backend and warm every configured model. Called from the
+    worker_process_init hook."""
+    try:
+        resolve_backend()
+    except Exception as e:
+        logger.error(f"Choosing a whisper backend failed: {e}")
+        return
+    for name in configured_models():
+        try:
+            _load_model(name)
+        except Exception as e:
+            # The task will retry the load (and surface the error) on first use
+            logger.error(f"Preloading whisper model '{name}' failed: {e}")
+
+
+def get_whisper_backend() -> Optional[str]:
+    """Backend this process uses ('openai' or 'faster'), or None if it hasn't
+    been chosen yet. Never triggers a load or benchmark."""
+    return _backend_choice
 
 
 # ---------------------------------------------------------------------------
 # Unified Transcription API
 # ---------------------------------------------------------------------------
 
-def transcribe_audio(audio_path: str, model_name: str = "base") -> dict:
+def transcribe_audio(
+    audio_path: str,
+    model_name: Optional[str] = None,
+    on_segments: Optional[Callable[[List[dict], float, float], None]] = None,
+) -> dict:
     """
     Transcribe an audio file using Whisper.
 
+    The file is decoded once to 16 kHz mono. With VAD enabled, long silences
+    are cut out before Whisper sees the audio, and segment timestamps are
+    mapped back onto the original timeline afterwards.
+
+    Streaming: `on_segments(batch, decoded_seconds, total_seconds)` is called
+    as segments are decoded (every TRANSCRIBE_STREAM_BATCH segments with
+    faster-whisper, per chunk in parallel mode, once at the end with
+    openai-whisper). Batches are in order, already on the original timeline,
+    and together equal the final "segments" list.
+
+    If `model_name` is omitted it is chosen from the recording's length
+    (WHISPER_MODEL, or WHISPER_LONG_MODEL for long recordings).
+
     Returns:
         {
             "full_text": str,
             "segments": [{"start": float, "end": float, "text": str}],
             "language": str,
+            "duration": float,          # seconds, original recording
             "backend": "openai" | "faster"
         }
 
@@ -78,21 +231,93 @@ def transcribe_audio(audio_path: str, model_name: str = "base") -> dict:
     if not os.path.exists(audio_path):
         raise FileNotFoundError(f"Audio file not found: {audio_path}")
 
-    model = _load_model(model_name)
+    audio = load_audio(audio_path)
+    duration = len(audio) / SAMPLE_RATE
+    model_name = model_name or select_model(duration)
 
-    logger.info(f"Transcribing '{audio_path}' using {_BACKEND}-whisper...")
+    time_map = None
+    if settings.vad_enabled:
+        regions = detect_speech(
+            audio,
+            threshold_db=settings.vad_threshold_db,
+            min_silence=settings.vad_min_silence_seconds,
+            padding=settings.vad_padding_seconds,
+        )
+        if regions:
+            audio, time_map = trim_silence(audio, regions)
+            speech = len(audio) / SAMPLE_RATE
+            logger.info(
+                f"VAD: {speech:.0f}s of speech in {duration:.0f}s "
+                f"({100 * (1 - speech / max(duration, 1e-6)):.0f}% trimmed, {len(regions)} regions)"
+            )
+        elif len(audio):
+            # Nothing cleared the detector (e.g. a quiet recording under the
+            # absolute floor) — let Whisper judge the untrimmed audio
+            logger.warning(f"VAD found no speech in '{audio_path}' — transcribing untrimmed audio")
 
-    if _BACKEND == "openai":
-        return _transcribe_openai(model, audio_path)
+    if len(audio) == 0:
+        logger.warning(f"Empty audio in '{audio_path}'")
+        return {
+            "full_text": "",
+            "segments": [],
+            "language": "unknown",
+            "duration": duration,
+            "backend": get_whisper_backend(),
+        }
+
+    emit = None
+    if on_segments:
+        def emit(batch: List[dict]) -> None:
+            if not batch:
+                return
+            if time_map is not None:
+                batch = time_map.remap_segments(batch)
+            on_segments(batch, min(batch[-1]["end"], duration), duration)
+
+    workers = resolve_workers(settings.transcribe_workers)
+    long_enough = len(audio) > 2 * settings.transcribe_chunk_seconds * SAMPLE_RATE
+    if workers > 1 and long_enough and not can_use_process_pool():
+        logger.warning(
+            "TRANSCRIBE_WORKERS=%d ignored — daemonic worker process can't start a pool "
+            "(run the transcribe worker with -P solo or -P threads)", workers,
+        )
+        workers = 1
+
+    if workers > 1 and long_enough:
+        logger.info(f"Transcribing '{audio_path}' across {workers} processes...")
+        result = transcribe_parallel(
+            audio,
+            model_name,
+            workers=workers,
+            chunk_seconds=settings.transcribe_chunk_seconds,
+            overlap_seconds=settings.transcribe_chunk_overlap_seconds,
+            on_segments=emit,
+        )
     else:
-        return _transcribe_faster(model, audio_path)
+        model = _load_model(model_name)
+        logger.info(f"Transcribing '{audio_path}' using {model.backend}-whisper '{model_name}'...")
+        result = _run_model(model, audio, on_segments=emit)
+
+    if time_map is not None:
+        result["segments"] = time_map.remap_segments(result["segments"])
+    result["duration"] = duration
+    return result
+
 
+def _run_model(
+    model: LoadedModel, audio, on_segments: Optional[Callable[[List[dict]], None]] = None
+) -> dict:
+    """Dispatch to whichever backend loaded `model`."""
+    if model.backend == "openai":
+        return _transcribe_openai(model.model, audio, on_segments)
+    return _transcribe_faster(model.model, audio, on_segments)
 
-def _transcribe_openai(model, audio_path: str) -> dict:
-    """Transcription using openai-whisper."""
+
+def _transcribe_openai(model, audio, on_segments=None) -> dict:
+    """Transcription using openai-whisper. `audio` is a path or 16 kHz float32 array."""
     try:
         result = model.transcribe(
-            audio_path,
+            audio,
             fp16=False,          # CPU-safe
             task="transcribe",
             verbose=False,
@@ -107,6 +332,10 @@ def _transcribe_openai(model, audio_path: str) -> dict:
             for seg in result.get("segments", [])
         ]
 
+        # openai-whisper has no incremental API — deliver everything at once
+        if on_segments:
+            on_segments(segments)
+
         full_text = result.get("text", "").strip()
         language = result.get("language", "unknown")
 
@@ -123,18 +352,20 @@ def _transcribe_openai(model, audio_path: str) -> dict:
         raise RuntimeError(f"Transcription failed: {e}")
 
 
-def _transcribe_faster(model, audio_path: str) -> dict:
-    """Transcription using faster-whisper."""
+def _transcribe_faster(model, audio, on_segments=None) -> dict:
+    """Transcription using faster-whisper. `audio` is a path or 16 kHz float32 array."""
     try:
         segments_iter, info = model.transcribe(
-            audio_path,
-            beam_size=5,
+            audio,
+            beam_size=settings.faster_whisper_beam_size,
             task="transcribe",
         )
 
         segments = []
         text_parts = []
+        flushed = 0
 
+        # segments_iter is lazy — decoding happens as we iterate
         for seg in segments_iter:
             segments.append({
                 "start": round(seg.start, 2),
@@ -142,6 +373,12 @@ def _transcribe_faster(model, audio_path: str) -> dict:
                 "text": seg.text.strip(),
             })
             text_parts.append(seg.text.strip())
+            if on_segments and len(segments) - flushed >= settings.transcribe_stream_batch:
+                on_segments(segments[flushed:])
+                flushed = len(segments)
+
+        if on_segments and len(segments) > flushed:
+            on_segments(segments[flushed:])
 
         full_text = " ".join(text_parts)
         language = info.language if hasattr(info, "language") else "unknown"
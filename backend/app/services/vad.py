@@ -0,0 +1,156 @@
+import bisect
+import logging
+from typing import List, Tuple
+
+import numpy as np
+
+from app.services.audio import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+FRAME_SECONDS = 0.03
+MIN_SPEECH_SECONDS = 0.25
+ABSOLUTE_FLOOR_DB = -50.0   # never treat anything quieter than this as speech
+
+
+# ---------------------------------------------------------------------------
+# Energy-based voice activity detection
+#
+# Classroom recordings are mostly one speaker close to a mic with long
+# silent stretches (breaks, board work). A frame-energy detector relative to
+# the recording's own noise floor finds those stretches cheaply on CPU —
+# no extra model to load on the worker.
+# ---------------------------------------------------------------------------
+
+def detect_speech(
+    audio: np.ndarray,
+    sr: int = SAMPLE_RATE,
+    threshold_db: float = 12.0,
+    min_silence: float = 2.0,
+    padding: float = 0.4,
+) -> List[Tuple[int, int]]:
+    """
+    Return speech regions as (start_sample, end_sample) pairs.
+
+    A frame counts as speech when it is `threshold_db` louder than the noise
+    floor (10th percentile frame energy). Gaps shorter than `min_silence`
+    seconds are kept so normal pauses between sentences stay intact; each
+    region is padded by `padding` seconds so word onsets are not clipped.
+    """
+    frame = int(sr * FRAME_SECONDS)
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return [(0, len(audio))] if len(audio) else []
+
+    frames = audio[: n_frames * frame].reshape(n_frames, frame)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1) + 1e-12)
+    db = 20 * np.log10(rms)
+
+    noise_floor = np.percentile(db, 10)
+    is_speech = db > max(noise_floor + threshold_db, ABSOLUTE_FLOOR_DB)
+    if not is_speech.any():
+        return []
+
+    # Run-length encode speech frames into [start, end) frame ranges
+    edges = np.diff(np.concatenate(([0], is_speech.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    # Bridge short pauses, drop blips
+    max_gap = int(min_silence / FRAME_SECONDS)
+    regions: List[List[int]] = []
+    for s, e in zip(starts, ends):
+        if regions and s - regions[-1][1] < max_gap:
+            regions[-1][1] = e
+        else:
+            regions.append([s, e])
+    min_frames = int(MIN_SPEECH_SECONDS / FRAME_SECONDS)
+    regions = [r for r in regions if r[1] - r[0] >= min_frames]
+
+    # Pad, convert to samples, and merge anything the padding made overlap
+    pad = int(padding * sr)
+    merged: List[Tuple[int, int]] = []
+    for s, e in regions:
+        start = max(0, int(s) * frame - pad)
+        end = min(len(audio), int(e) * frame + pad)
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class TimeMap:
+    """Maps timestamps on the trimmed (speech-only) timeline back to the original."""
+
+    def __init__(self, regions: List[Tuple[int, int]], sr: int = SAMPLE_RATE):
+        self._trimmed_starts: List[float] = []
+        self._original_starts: List[float] = []
+        self._lengths: List[float] = []
+        offset = 0.0
+        for start, end in regions:
+            length = float(end - start) / sr
+            self._trimmed_starts.append(offset)
+            self._original_starts.append(float(start) / sr)
+            self._lengths.append(length)
+            offset += length
+
+    def remap_segments(self, segments: List[dict]) -> List[dict]:
+        """
+        Map segments back to the original timeline. A segment that crosses a
+        cut is split at the cut — mapped as one piece it would stretch over
+        the removed silence — and its words are shared out between the
+        pieces in proportion to their duration.
+        """
+        remapped: List[dict] = []
+        for seg in segments:
+            pieces = self._pieces(seg["start"], seg["end"])
+            if len(pieces) == 1:
+                (i, start, end), = pieces
+                remapped.append({**seg, "start": self._at(i, start), "end": self._at(i, end)})
+                continue
+
+            words = seg["text"].split()
+            lead = seg["text"][: len(seg["text"]) - len(seg["text"].lstrip())]
+            total = sum(end - start for _, start, end in pieces)
+            elapsed, taken = 0.0, 0
+            for i, start, end in pieces:
+                elapsed += end - start
+                upto = round(len(words) * elapsed / total) if total > 0 else len(words)
+                if upto > taken:
+                    remapped.append({
+                        **seg,
+                        "start": self._at(i, start),
+                        "end": self._at(i, end),
+                        "text": lead + " ".join(words[taken:upto]),
+                    })
+                    taken = upto
+        return remapped
+
+    def _pieces(self, start: float, end: float) -> List[Tuple[int, float, float]]:
+        """(region, start, end) parts of a trimmed-timeline span, split at cuts."""
+        if not self._trimmed_starts:
+            return [(-1, start, end)]
+        first = max(0, bisect.bisect_right(self._trimmed_starts, start) - 1)
+        last = max(first, bisect.bisect_left(self._trimmed_starts, end) - 1)
+        pieces = []
+        for i in range(first, last + 1):
+            lo = max(start, self._trimmed_starts[i])
+            hi = min(end, self._trimmed_starts[i] + self._lengths[i])
+            if hi > lo or not pieces and i == last:
+                pieces.append((i, lo, max(lo, hi)))
+        return pieces or [(first, start, start)]
+
+    def _at(self, region: int, t: float) -> float:
+        if region < 0:
+            return round(t, 2)
+        within = min(max(t - self._trimmed_starts[region], 0.0), self._lengths[region])
+        return round(self._original_starts[region] + within, 2)
+
+
+def trim_silence(audio: np.ndarray, regions: List[Tuple[int, int]], sr: int = SAMPLE_RATE):
+    """Concatenate speech regions. Returns (speech_audio, TimeMap)."""
+    if not regions:
+        return audio[:0], TimeMap([], sr)
+    speech = np.concatenate([audio[start:end] for start, end in regions])
+    return speech, TimeMap(regions, sr)
@@ -0,0 +1,115 @@
+import json
+import logging
+import re
+from typing import List, Optional
+
+from app.config import settings
+from app.services.cache_base import CountingCache
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+# ---------------------------------------------------------------------------
+# Topic → YouTube search results cache
+#
+# Concept extraction keeps producing the same popular topics ("binary search
+# tree", "recursion", ...) across lectures, and every search.list call costs
+# 100 units of the daily YouTube quota. Results are cached per normalized
+# topic for YOUTUBE_CACHE_TTL_SECONDS, in Redis so every resources worker
+# shares them. Failed and empty searches are never cached.
+# ---------------------------------------------------------------------------
+
+
+class YouTubeCache(CountingCache):
+    """In-process TTL cache (one per worker). Subclasses replace _get/_set."""
+
+    name = "YouTube cache"
+    backend = "memory"
+
+    @staticmethod
+    def make_key(topic: str, max_results: int) -> str:
+        """Case- and whitespace-insensitive: "Binary  Search Tree" == "binary search tree"."""
+        return f"{max_results}:{_WHITESPACE.sub(' ', topic.strip().lower())}"
+
+    def get(self, topic: str, max_results: int) -> Optional[List[dict]]:
+        try:
+            results = self._get(self.make_key(topic, max_results))
+        except Exception as e:
+            self._failed("read", e)
+            results = None
+        if results is None:
+            self._record(misses=1)
+            return None
+        self._record(hits=1)
+        # Cached under another lecture's spelling of the topic
+        return [{**video, "topic": topic} for video in results]
+
+    def set(self, topic: str, max_results: int, results: List[dict]) -> None:
+        if not results:
+            return   # videos for a new topic may appear any day — search again next time
+        try:
+            self._set(self.make_key(topic, max_results), results)
+        except Exception as e:
+            self._failed("write", e)
+
+    # ------------------------------------------------------------------
+
+    def _get(self, key: str) -> Optional[List[dict]]:
+        return self._get_local(key)
+
+    def _set(self, key: str, results: List[dict]) -> None:
+        self._set_local(key, results)
+
+
+class RedisYouTubeCache(YouTubeCache):
+    """Redis backend — shared by every worker, TTL via SETEX."""
+
+    backend = "redis"
+    PREFIX = "ytcache:"
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        super().__init__(ttl_seconds, max_entries)
+        from app.utils.redis_client import get_redis
+        self._redis = get_redis()
+
+    def _get(self, key: str) -> Optional[List[dict]]:
+        raw = self._redis.get(self.PREFIX + key)
+        return json.loads(raw) if raw is not None else None
+
+    def _set(self, key: str, results: List[dict]) -> None:
+        self._redis.set(self.PREFIX + key, json.dumps(results), ex=self.ttl_seconds)
+
+
+class NullYouTubeCache(YouTubeCache):
+    """Caching off — every topic is searched."""
+
+    backend = "off"
+
+    def _get(self, key: str) -> Optional[List[dict]]:
+        return None
+
+    def _set(self, key: str, results: List[dict]) -> None:
+        pass
+
+
+def _build_cache() -> YouTubeCache:
+    backend = settings.youtube_cache_backend.lower()
+    ttl, max_entries = settings.youtube_cache_ttl_seconds, settings.youtube_cache_max_entries
+
+    if backend == "off" or ttl <= 0:
+        logger.info("YouTube cache disabled")
+        return NullYouTubeCache(ttl, max_entries)
+    if backend == "redis":
+        try:
+            cache = RedisYouTubeCache(ttl, max_entries)
+            logger.info("YouTube cache → Redis (ttl=%ds)", ttl)
+            return cache
+        except Exception as e:
+            logger.warning("Redis YouTube cache unavailable (%s) — falling back to memory", e)
+    logger.info("YouTube cache → memory (ttl=%ds, max=%d)", ttl, max_entries)
+    return YouTubeCache(ttl, max_entries)
+
+
+# Singleton — used by resource_linker.find_youtube_videos
+youtube_cache = _build_cache()
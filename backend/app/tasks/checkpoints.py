@@ -0,0 +1,40 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict
+
+from app.models.pipeline_checkpoint import PipelineCheckpoint, PipelineStage
+
+logger = logging.getLogger(__name__)
+
+
+def load_checkpoints(db, lecture_id: str) -> Dict[PipelineStage, Any]:
+    """Return {stage: data} for every stage this lecture has already finished."""
+    rows = (
+        db.query(PipelineCheckpoint)
+        .filter(PipelineCheckpoint.lecture_id == lecture_id)
+        .all()
+    )
+    return {row.stage: row.data for row in rows}
+
+
+def save_checkpoint(db, lecture_id: str, stage: PipelineStage, data: Any = None) -> None:
+    """
+    Record a finished stage (upsert). Does NOT commit — callers commit the
+    checkpoint together with the stage's own writes so both land atomically.
+    """
+    row = (
+        db.query(PipelineCheckpoint)
+        .filter(PipelineCheckpoint.lecture_id == lecture_id, PipelineCheckpoint.stage == stage)
+        .first()
+    )
+    if row:
+        row.data = data
+        row.completed_at = datetime.utcnow()
+    else:
+        db.add(PipelineCheckpoint(lecture_id=lecture_id, stage=stage, data=data))
+    logger.debug("[%s] Checkpoint: %s", lecture_id, stage.value)
+
+
+def clear_checkpoints(db, lecture_id: str) -> None:
+    """Drop all checkpoints once the pipeline has completed. Does NOT commit."""
+    db.query(PipelineCheckpoint).filter(PipelineCheckpoint.lecture_id == lecture_id).delete()
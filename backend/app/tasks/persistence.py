@@ -0,0 +1,94 @@
+import logging
+from typing import Dict, List
+
+from sqlalchemy import delete, insert
+
+from app.models.flashcard import Flashcard
+from app.models.mcq import MCQ
+from app.models.note import Note
+from app.models.resource import Resource
+from app.models.transcript_segment import TranscriptSegment
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------------
+# Bulk writes for pipeline artifacts
+#
+# Each artifact type is written with one multi-row INSERT (executemany) per
+# call instead of one ORM object per row. None of these commit: stages call
+# them inside their own transaction and commit once, together with the
+# checkpoint and progress update, so a stage's writes land atomically.
+# ---------------------------------------------------------------------------
+
+def insert_segments(db, transcript_id: str, position: int, batch: List[Dict]) -> int:
+    """Append a batch of Whisper segments starting at `position`. Returns the next position."""
+    if batch:
+        db.execute(insert(TranscriptSegment), [
+            {
+                "transcript_id": transcript_id,
+                "position": position + i,
+                "start": seg["start"],
+                "end": seg["end"],
+                "text": seg["text"],
+            }
+            for i, seg in enumerate(batch)
+        ])
+    return position + len(batch)
+
+
+def replace_study_materials(
+    db,
+    lecture_id: str,
+    notes: str,
+    concepts: List[str],
+    flashcards: List[Dict],
+    mcqs: List[Dict],
+) -> None:
+    """
+    Replace the lecture's notes, flashcards and MCQs — replace, don't append,
+    so a retry landing after a partial write leaves no duplicates.
+    """
+    for model in (Note, Flashcard, MCQ):
+        db.execute(delete(model).where(model.lecture_id == lecture_id))
+
+    db.execute(insert(Note), [{"lecture_id": lecture_id, "content": notes, "key_concepts": concepts}])
+    if flashcards:
+        db.execute(insert(Flashcard), [
+            {"lecture_id": lecture_id, "question": fc["question"], "answer": fc["answer"], "order": i}
+            for i, fc in enumerate(flashcards)
+        ])
+    if mcqs:
+        db.execute(insert(MCQ), [
+            {
+                "lecture_id": lecture_id,
+                "question": mcq["question"],
+                "options": mcq["options"],
+                "correct_index": mcq["correct_index"],
+                "explanation": mcq["explanation"],
+                "order": i,
+            }
+            for i, mcq in enumerate(mcqs)
+        ])
+    logger.debug(
+        "[%s] Study materials written: %d flashcards, %d MCQs",
+        lecture_id, len(flashcards), len(mcqs),
+    )
+
+
+def replace_resources(db, lecture_id: str, resources: List[Dict]) -> None:
+    """Replace the lecture's linked resources."""
+    db.execute(delete(Resource).where(Resource.lecture_id == lecture_id))
+    if resources:
+        db.execute(insert(Resource), [
+            {
+                "lecture_id": lecture_id,
+                "type": res["type"],
+                "title": res["title"],
+                "url": res["url"],
+                "thumbnail_url": res.get("thumbnail_url"),
+                "topic": res.get("topic"),
+                "relevance_score": res.get("relevance_score", 1.0),
+            }
+            for res in resources
+        ])
@@ -4,58 +4,166 @@ import tempfile
 import uuid
 from datetime import datetime
 
+from celery import chain, chord
+
 from app.celery_app import celery_app
+from app.config import settings
 from app.database import SessionLocal
-from app.models.flashcard import Flashcard
 from app.models.lecture import Lecture, ProcessingStatus
-from app.models.mcq import MCQ
-from app.models.note import Note
-from app.models.resource import Resource
+from app.models.pipeline_checkpoint import PipelineCheckpoint, PipelineStage
 from app.models.transcript import Transcript
-from app.services.generator import (
-    extract_key_concepts,
-    generate_flashcards,
-    generate_mcqs,
-    generate_notes,
-)
+from app.models.transcript_segment import TranscriptSegment
+from app.services.audio import probe_duration, transcode_for_whisper
+from app.services.generator import GENERATION_STEPS, generate_study_materials
+from app.services.lecture_bundle import invalidate_bundle, load_lecture_detail, write_bundle
+from app.services.llm_cache import llm_cache
+from app.services.progress_events import publish_progress
 from app.services.resource_linker import get_resources_for_topics
 from app.services.storage import storage_service
 from app.services.transcriber import transcribe_audio
-from app.config import settings
+from app.services.youtube_cache import youtube_cache
+from app.tasks.checkpoints import clear_checkpoints, load_checkpoints, save_checkpoint
+from app.tasks.persistence import insert_segments, replace_resources, replace_study_materials
 
 logger = logging.getLogger(__name__)
 
+# Progress window covered by streaming transcription
+TRANSCRIBE_START = 10
 
-def _set_progress(db, lecture: Lecture, status: ProcessingStatus, progress: int, error: str = None):
+# Progress window covered by the concurrent generation stage
+GENERATION_START = 40
+GENERATION_END = 85
+
+GENERATION_STAGES = [PipelineStage(step) for step in GENERATION_STEPS]
+
+
+def _apply_progress(lecture: Lecture, status: ProcessingStatus, progress: int, error: str = None):
+    """Set status fields in the open transaction (caller commits)."""
     lecture.status = status
     lecture.progress = progress
     if error:
         lecture.error_message = error[:500]
     if status == ProcessingStatus.COMPLETED:
         lecture.processed_at = datetime.utcnow()
+
+
+def _set_progress(db, lecture: Lecture, status: ProcessingStatus, progress: int, error: str = None):
+    """
+    Update status and progress, then commit — together with whatever else the
+    stage has pending in the session, so artifacts and status share one
+    transaction.
+    """
+    _apply_progress(lecture, status, progress, error)
+    # Read before commit — afterwards the row is expired and would be re-SELECTed
+    event = (lecture.id, status.value, progress, lecture.error_message)
+    user_id = lecture.user_id
+    db.commit()
+    publish_progress(*event, user_id=user_id)
+
+
+def _bump_progress(db, lecture_id: str, progress: int) -> None:
+    """
+    Monotonic progress update — safe when parallel stage tasks race. Commits
+    the stage's pending writes along with it.
+    """
+    updated = (
+        db.query(Lecture)
+        .filter(Lecture.id == lecture_id, Lecture.progress < progress)
+        .update({Lecture.progress: progress}, synchronize_session=False)
+    )
     db.commit()
+    if updated:
+        publish_progress(lecture_id, ProcessingStatus.PROCESSING.value, progress)
 
 
-@celery_app.task(
-    bind=True,
-    max_retries=3,
-    name="app.tasks.process_lecture.run",
-)
-def process_lecture_task(self, lecture_id: str):
+def _generation_progress(completed: int) -> int:
+    span = GENERATION_END - GENERATION_START
+    return GENERATION_START + span * completed // len(GENERATION_STAGES)
+
+
+def _is_temp_file(path: str) -> bool:
+    """A per-task S3 download — never a file owned by the audio cache."""
+    return (
+        bool(path) and
+        path.startswith(tempfile.gettempdir()) and
+        not storage_service.is_cached_path(path)
+    )
+
+
+def _retry_or_fail(task, db, lecture_id: str, exc: Exception):
+    """Shared error path: retry with exponential backoff, else mark FAILED."""
+    logger.error("[%s] %s failed: %s", lecture_id, task.name, exc, exc_info=True)
+    db.rollback()
+
+    retries_left = task.max_retries - task.request.retries
+    if retries_left > 0:
+        logger.info("[%s] Retrying %s... (%d attempts left)", lecture_id, task.name, retries_left)
+        raise task.retry(exc=exc, countdown=60 * (2 ** task.request.retries))
+
+    # All retries exhausted — mark as FAILED
+    try:
+        lec = db.query(Lecture).filter(Lecture.id == lecture_id).first()
+        if lec:
+            _set_progress(db, lec, ProcessingStatus.FAILED, 0, error=str(exc))
+    except Exception:
+        pass
+    raise exc
+
+
+# ---------------------------------------------------------------------------
+# Pipeline wiring
+#
+#   ingest ──► transcribe ──► chord(concepts | notes | flashcards | mcqs) ──► persist ──► resources
+#   [transcribe] [transcribe]         [generate, high concurrency]          [generate]  [resources]
+#
+# Each stage is its own task on its own queue so the Whisper pool and the
+# network-bound pools scale independently. Every stage is checkpointed
+# (see PipelineStage), so a retry only repeats the work that failed.
+# ---------------------------------------------------------------------------
+
+def build_pipeline(lecture_id: str):
+    return chain(
+        ingest_stage.si(lecture_id),
+        transcribe_stage.si(lecture_id),
+        chord(
+            [generate_stage.si(lecture_id, step) for step in GENERATION_STEPS],
+            persist_materials_stage.si(lecture_id),
+        ),
+        link_resources_stage.si(lecture_id),
+    )
+
+
+@celery_app.task(name="app.tasks.process_lecture.run")
+def process_lecture_task(lecture_id: str):
     """
-    Full processing pipeline:
+    Entry point — fans the lecture out across the per-stage queues:
       5%  → Start
+       8% → Audio normalized to 16 kHz mono FLAC
       10% → Audio retrieved
+  10–40% → Transcribing (decoded audio time / duration)
       40% → Transcription done
-      50% → Concepts extracted
-      65% → Notes generated
-      75% → Flashcards generated
-      85% → MCQs generated
-      95% → Resources found
-     100% → Completed ✅
+  40–85% → Concepts, notes, flashcards, MCQs (parallel, +~11% each)
+      85% → Study materials saved
+     100% → Resources linked, completed ✅
+    """
+    logger.info("[%s] ▶ Pipeline queued", lecture_id)
+    build_pipeline(lecture_id).apply_async()
+
+
+# ---------------------------------------------------------------------------
+# Stage 1: Ingest — transcode once to Whisper's native format   (queue: transcribe)
+# ---------------------------------------------------------------------------
+
+@celery_app.task(bind=True, max_retries=3, name="app.tasks.process_lecture.ingest")
+def ingest_stage(self, lecture_id: str):
+    """
+    Transcode the upload to 16 kHz mono FLAC next to the original and record
+    its duration. Transcription, its retries and re-processing all read this
+    small, already-resampled file instead of the original upload.
     """
     db = SessionLocal()
-    tmp_audio_path = None
+    original_path = None
+    flac_path = None
 
     try:
         lecture = db.query(Lecture).filter(Lecture.id == lecture_id).first()
@@ -63,134 +171,282 @@ def process_lecture_task(self, lecture_id: str):
             logger.error("Lecture %s not found — aborting task", lecture_id)
             return
 
-        logger.info("[%s] ▶ Pipeline started", lecture_id)
-        _set_progress(db, lecture, ProcessingStatus.PROCESSING, 5)
+        invalidate_bundle(db, lecture_id)   # re-processing — the old detail snapshot is stale
+        done = load_checkpoints(db, lecture_id)
+        if done:
+            logger.info(
+                "[%s] ▶ Resuming pipeline — finished stages: %s",
+                lecture_id, ", ".join(stage.value for stage in done),
+            )
+        else:
+            logger.info("[%s] ▶ Pipeline started", lecture_id)
+        _set_progress(db, lecture, ProcessingStatus.PROCESSING, max(lecture.progress or 0, 5))
 
-        # ── Step 1: Get audio ──────────────────────────────────────────
-        logger.info("[%s] Fetching audio...", lecture_id)
-        tmp_audio_path = storage_service.get_local_path(lecture.s3_key)
-        _set_progress(db, lecture, ProcessingStatus.PROCESSING, 10)
+        if PipelineStage.INGEST in done:
+            logger.info("[%s] Ingest checkpoint found — skipping", lecture_id)
+            return
+        if not settings.audio_normalize:
+            save_checkpoint(db, lecture_id, PipelineStage.INGEST, {"key": lecture.s3_key})
+            db.commit()
+            return
 
-        # ── Step 2: Transcribe ─────────────────────────────────────────
-        logger.info("[%s] Transcribing...", lecture_id)
-        result = transcribe_audio(tmp_audio_path, model_name=settings.whisper_model)
+        normalized_key = storage_service.normalized_key_for(lecture.s3_key)
+        if lecture.duration and storage_service.get_size(normalized_key):
+            # Re-processing — the upload was already normalized once
+            logger.info("[%s] Reusing normalized audio: %s", lecture_id, normalized_key)
+            save_checkpoint(db, lecture_id, PipelineStage.INGEST, {"key": normalized_key, "duration": lecture.duration})
+            db.commit()
+            return
 
-        db.add(Transcript(
-            id=str(uuid.uuid4()),
-            lecture_id=lecture_id,
-            full_text=result["full_text"],
-            segments=result["segments"],
-            language=result.get("language", "unknown"),
-        ))
+        logger.info("[%s] Normalizing audio...", lecture_id)
+        original_path = storage_service.get_local_path(lecture.s3_key)
+        fd, flac_path = tempfile.mkstemp(suffix=".flac")
+        os.close(fd)
+        transcode_for_whisper(original_path, flac_path)
+        duration = probe_duration(flac_path)
+        logger.info(
+            "[%s] Normalized %.1f MB → %.1f MB FLAC (%.0fs)",
+            lecture_id, os.path.getsize(original_path) / 1e6, os.path.getsize(flac_path) / 1e6, duration,
+        )
 
-        # Set duration from last segment
-        if result["segments"]:
-            lecture.duration = int(result["segments"][-1].get("end", 0))
+        key = storage_service.put_file(flac_path, normalized_key, "audio/flac")
+        lecture.duration = int(duration)
+        save_checkpoint(db, lecture_id, PipelineStage.INGEST, {"key": key, "duration": duration})
+        _set_progress(db, lecture, ProcessingStatus.PROCESSING, max(lecture.progress or 0, 8))
 
-        db.commit()
-        _set_progress(db, lecture, ProcessingStatus.PROCESSING, 40)
-        logger.info("[%s] Transcription done — %d segments", lecture_id, len(result["segments"]))
+    except Exception as exc:
+        _retry_or_fail(self, db, lecture_id, exc)
 
-        full_text = result["full_text"]
+    finally:
+        db.close()
+        for path in (original_path, flac_path):
+            if _is_temp_file(path) and os.path.exists(path):
+                try:
+                    os.unlink(path)
+                except Exception:
+                    pass
 
-        # ── Step 3: Extract concepts ───────────────────────────────────
-        logger.info("[%s] Extracting key concepts...", lecture_id)
-        concepts = extract_key_concepts(full_text)
-        logger.info("[%s] Concepts: %s", lecture_id, concepts)
-        _set_progress(db, lecture, ProcessingStatus.PROCESSING, 50)
-
-        # ── Step 4: Notes ──────────────────────────────────────────────
-        logger.info("[%s] Generating notes...", lecture_id)
-        notes_md = generate_notes(full_text)
-        db.add(Note(
-            id=str(uuid.uuid4()),
-            lecture_id=lecture_id,
-            content=notes_md,
-            key_concepts=concepts,
-        ))
-        db.commit()
-        _set_progress(db, lecture, ProcessingStatus.PROCESSING, 65)
-
-        # ── Step 5: Flashcards ─────────────────────────────────────────
-        logger.info("[%s] Generating flashcards...", lecture_id)
-        for i, fc in enumerate(generate_flashcards(full_text)):
-            db.add(Flashcard(
-                id=str(uuid.uuid4()),
-                lecture_id=lecture_id,
-                question=fc["question"],
-                answer=fc["answer"],
-                order=i,
-            ))
-        db.commit()
-        _set_progress(db, lecture, ProcessingStatus.PROCESSING, 75)
-
-        # ── Step 6: MCQs ───────────────────────────────────────────────
-        logger.info("[%s] Generating MCQs...", lecture_id)
-        for i, mcq in enumerate(generate_mcqs(full_text)):
-            db.add(MCQ(
-                id=str(uuid.uuid4()),
-                lecture_id=lecture_id,
-                question=mcq["question"],
-                options=mcq["options"],
-                correct_index=mcq["correct_index"],
-                explanation=mcq["explanation"],
-                order=i,
-            ))
-        db.commit()
-        _set_progress(db, lecture, ProcessingStatus.PROCESSING, 85)
 
-        # ── Step 7: Resources (non-critical) ───────────────────────────
-        logger.info("[%s] Finding resources...", lecture_id)
-        try:
-            for res in get_resources_for_topics(concepts):
-                db.add(Resource(
-                    id=str(uuid.uuid4()),
-                    lecture_id=lecture_id,
-                    type=res["type"],
-                    title=res["title"],
-                    url=res["url"],
-                    thumbnail_url=res.get("thumbnail_url"),
-                    topic=res.get("topic"),
-                    relevance_score=res.get("relevance_score", 1.0),
-                ))
-            db.commit()
-        except Exception as e:
-            # Resource failure must NEVER fail the whole pipeline
-            logger.warning("[%s] Resource linking failed (non-fatal): %s", lecture_id, e)
+# ---------------------------------------------------------------------------
+# Stage 2–3: Fetch audio + transcribe   (queue: transcribe)
+# ---------------------------------------------------------------------------
 
-        _set_progress(db, lecture, ProcessingStatus.PROCESSING, 95)
+@celery_app.task(bind=True, max_retries=3, name="app.tasks.process_lecture.transcribe")
+def transcribe_stage(self, lecture_id: str):
+    db = SessionLocal()
+    tmp_audio_path = None
+    retrying = False
 
-        # ── Done ───────────────────────────────────────────────────────
-        _set_progress(db, lecture, ProcessingStatus.COMPLETED, 100)
-        logger.info("[%s] ✅ Pipeline complete!", lecture_id)
+    try:
+        lecture = db.query(Lecture).filter(Lecture.id == lecture_id).first()
+        if not lecture:
+            logger.error("Lecture %s not found — aborting task", lecture_id)
+            return
 
-    except Exception as exc:
-        logger.error("[%s] Pipeline failed: %s", lecture_id, exc, exc_info=True)
+        done = load_checkpoints(db, lecture_id)
+
+        if PipelineStage.TRANSCRIBE in done and lecture.transcript:
+            # Audio a failed attempt left behind is no longer needed
+            tmp_audio_path = (done.get(PipelineStage.FETCH) or {}).get("path")
+            logger.info("[%s] Transcript checkpoint found — skipping fetch + Whisper", lecture_id)
+            return
 
-        retries_left = self.max_retries - self.request.retries
-        if retries_left > 0:
-            logger.info("[%s] Retrying... (%d attempts left)", lecture_id, retries_left)
-            raise self.retry(exc=exc, countdown=60 * (2 ** self.request.retries))
+        # The normalized FLAC from the ingest stage (or the original upload)
+        audio_key = (done.get(PipelineStage.INGEST) or {}).get("key") or lecture.s3_key
+        fetched = (done.get(PipelineStage.FETCH) or {}).get("path")
+        if fetched and os.path.exists(fetched):
+            tmp_audio_path = fetched
+            logger.info("[%s] Reusing fetched audio: %s", lecture_id, fetched)
         else:
-            # All retries exhausted — mark as FAILED
-            try:
-                lec = db.query(Lecture).filter(Lecture.id == lecture_id).first()
-                if lec:
-                    _set_progress(db, lec, ProcessingStatus.FAILED, 0, error=str(exc))
-            except Exception:
-                pass
-            raise
+            logger.info("[%s] Fetching audio...", lecture_id)
+            tmp_audio_path = storage_service.get_local_path(audio_key)
+            save_checkpoint(db, lecture_id, PipelineStage.FETCH, {"path": tmp_audio_path})
+
+        # Create (or reset) the transcript row up front so decoded segments
+        # can be streamed into transcript_segments while Whisper runs
+        transcript = lecture.transcript or Transcript(id=str(uuid.uuid4()), lecture_id=lecture_id)
+        transcript_id = transcript.id
+        transcript.full_text = ""
+        transcript.segments = []
+        db.add(transcript)
+        db.flush()
+        db.query(TranscriptSegment).filter(TranscriptSegment.transcript_id == transcript_id).delete()
+        _set_progress(db, lecture, ProcessingStatus.PROCESSING, TRANSCRIBE_START)
+
+        written = 0
+
+        def _on_segments(batch: list, decoded: float, total: float):
+            # One multi-row INSERT + progress update per batch, one commit
+            nonlocal written
+            written = insert_segments(db, transcript_id, written, batch)
+            span = GENERATION_START - TRANSCRIBE_START
+            progress = TRANSCRIBE_START + int(span * decoded / max(total, 1e-6))
+            _set_progress(db, lecture, ProcessingStatus.PROCESSING, progress)
+
+        logger.info("[%s] Transcribing...", lecture_id)
+        result = transcribe_audio(tmp_audio_path, on_segments=_on_segments)
+        segments = result["segments"]
+
+        transcript.full_text = result["full_text"]
+        transcript.segments = segments
+        transcript.language = result.get("language", "unknown")
+
+        # Decoded length of the recording; last segment end as a fallback
+        if result.get("duration"):
+            lecture.duration = int(result["duration"])
+        elif segments:
+            lecture.duration = int(segments[-1].get("end", 0))
+
+        save_checkpoint(db, lecture_id, PipelineStage.TRANSCRIBE)
+        _set_progress(db, lecture, ProcessingStatus.PROCESSING, GENERATION_START)
+        logger.info("[%s] Transcription done — %d segments", lecture_id, len(segments))
+
+    except Exception as exc:
+        # Keep the fetched file for the retry — the FETCH checkpoint points at it
+        retrying = self.request.retries < self.max_retries
+        _retry_or_fail(self, db, lecture_id, exc)
 
     finally:
         db.close()
-        # Clean up S3-downloaded temp files
+        # Clean up S3-downloaded temp files (cached audio stays for retries
+        # and re-processing)
         if (
-            tmp_audio_path and
-            os.path.exists(tmp_audio_path) and
-            tmp_audio_path.startswith(tempfile.gettempdir())
+            not retrying and
+            _is_temp_file(tmp_audio_path) and
+            os.path.exists(tmp_audio_path)
         ):
             try:
                 os.unlink(tmp_audio_path)
                 logger.debug("Cleaned up temp file: %s", tmp_audio_path)
             except Exception:
                 pass
+
+
+# ---------------------------------------------------------------------------
+# Stages 4–7: One LLM generation step each   (queue: generate)
+# ---------------------------------------------------------------------------
+
+@celery_app.task(bind=True, max_retries=3, name="app.tasks.process_lecture.generate")
+def generate_stage(self, lecture_id: str, step: str):
+    db = SessionLocal()
+    stage = PipelineStage(step)
+
+    try:
+        if stage in load_checkpoints(db, lecture_id):
+            logger.info("[%s] %s checkpoint found — skipping", lecture_id, step)
+            return
+
+        transcript = db.query(Transcript).filter(Transcript.lecture_id == lecture_id).first()
+        if not transcript:
+            raise RuntimeError(f"Transcript missing for lecture {lecture_id}")
+
+        logger.info("[%s] Generating %s...", lecture_id, step)
+        result = generate_study_materials(
+            transcript.full_text, transcript.segments, steps=[step]
+        )[step]
+        save_checkpoint(db, lecture_id, stage, result)
+        db.flush()   # the count below must see this step's checkpoint
+
+        # Steps finish in any order — progress tracks how many are done.
+        # The checkpoint commits with the progress update.
+        completed = (
+            db.query(PipelineCheckpoint)
+            .filter(
+                PipelineCheckpoint.lecture_id == lecture_id,
+                PipelineCheckpoint.stage.in_(GENERATION_STAGES),
+            )
+            .count()
+        )
+        _bump_progress(db, lecture_id, _generation_progress(completed))
+        logger.info("[%s] %s ready (%d/%d)", lecture_id, step.capitalize(), completed, len(GENERATION_STAGES))
+
+    except Exception as exc:
+        _retry_or_fail(self, db, lecture_id, exc)
+
+    finally:
+        db.close()
+
+
+@celery_app.task(bind=True, max_retries=3, name="app.tasks.process_lecture.persist")
+def persist_materials_stage(self, lecture_id: str):
+    """Chord callback — writes notes, flashcards and MCQs in one transaction."""
+    db = SessionLocal()
+
+    try:
+        done = load_checkpoints(db, lecture_id)
+        missing = [stage.value for stage in GENERATION_STAGES if stage not in done]
+        if missing:
+            raise RuntimeError(f"Generation checkpoints missing: {', '.join(missing)}")
+
+        concepts = done[PipelineStage.CONCEPTS]
+        logger.info("[%s] Concepts: %s", lecture_id, concepts)
+
+        replace_study_materials(
+            db,
+            lecture_id,
+            notes=done[PipelineStage.NOTES],
+            concepts=concepts,
+            flashcards=done[PipelineStage.FLASHCARDS],
+            mcqs=done[PipelineStage.MCQS],
+        )
+        _bump_progress(db, lecture_id, GENERATION_END)   # commits the materials too
+
+    except Exception as exc:
+        _retry_or_fail(self, db, lecture_id, exc)
+
+    finally:
+        db.close()
+
+
+# ---------------------------------------------------------------------------
+# Stage 8: Resources + completion   (queue: resources)
+# ---------------------------------------------------------------------------
+
+@celery_app.task(bind=True, max_retries=3, name="app.tasks.process_lecture.link_resources")
+def link_resources_stage(self, lecture_id: str):
+    db = SessionLocal()
+
+    try:
+        lecture = db.query(Lecture).filter(Lecture.id == lecture_id).first()
+        if not lecture:
+            logger.error("Lecture %s not found — aborting task", lecture_id)
+            return
+
+        done = load_checkpoints(db, lecture_id)
+        logger.info("[%s] Finding resources...", lecture_id)
+        try:
+            resources = get_resources_for_topics(done.get(PipelineStage.CONCEPTS) or [])
+            replace_resources(db, lecture_id, resources)
+        except Exception as e:
+            # Resource failure must NEVER fail the whole pipeline
+            db.rollback()
+            logger.warning("[%s] Resource linking failed (non-fatal): %s", lecture_id, e)
+
+        # ── Done ───────────────────────────────────────────────────────
+        # Resources, completion and the detail bundle commit together
+        user_id = lecture.user_id
+        clear_checkpoints(db, lecture_id)
+        _apply_progress(lecture, ProcessingStatus.COMPLETED, 100)
+        db.flush()
+
+        # Precompute the compressed detail payload students will read. The
+        # savepoint keeps a failed bundle write from poisoning the commit below.
+        try:
+            with db.begin_nested():
+                write_bundle(db, load_lecture_detail(db, lecture_id), commit=False)
+        except Exception as e:
+            # get_lecture builds it on first read instead
+            logger.warning("[%s] Detail bundle failed (non-fatal): %s", lecture_id, e)
+
+        db.commit()
+        publish_progress(lecture_id, ProcessingStatus.COMPLETED.value, 100, user_id=user_id)
+        logger.info(
+            "[%s] ✅ Pipeline complete! LLM cache: %s, YouTube cache: %s",
+            lecture_id, llm_cache.stats(), youtube_cache.stats(),
+        )
+
+    except Exception as exc:
+        _retry_or_fail(self, db, lecture_id, exc)
+
+    finally:
+        db.close()
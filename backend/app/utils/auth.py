@@ -1,27 +1,19 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import List, Optional, Tuple
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
 from app.database import get_db
 from app.models.user import User
+from app.services.principal_cache import Principal, principal_cache
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 bearer_scheme = HTTPBearer()
 
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
-
-
-def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
-
-
 def create_access_token(user_id: str) -> str:
     expire = datetime.utcnow() + timedelta(days=settings.jwt_expire_days)
     payload = {"sub": user_id, "exp": expire, "iat": datetime.utcnow()}
@@ -33,15 +25,59 @@ def decode_token(token: str) -> Optional[str]:
         payload = jwt.decode(
             token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm]
         )
+        if payload.get("purpose"):
+            return None   # scoped token (e.g. upload) — not a login session
         return payload.get("sub")
     except JWTError:
         return None
 
 
-def get_current_user(
+def create_upload_token(lecture_id: str, expires_seconds: int) -> str:
+    """Short-lived token authorising one direct upload (local storage stand-in
+    for an S3 presigned POST)."""
+    expire = datetime.utcnow() + timedelta(seconds=expires_seconds)
+    payload = {"sub": lecture_id, "purpose": "upload", "exp": expire}
+    return jwt.encode(payload, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
+
+
+def decode_upload_token(token: str) -> Optional[str]:
+    """Returns the lecture id an upload token was issued for, or None."""
+    try:
+        payload = jwt.decode(
+            token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm]
+        )
+    except JWTError:
+        return None
+    if payload.get("purpose") != "upload":
+        return None
+    return payload.get("sub")
+
+
+def create_events_token(user_id: str, lecture_ids: List[str], expires_seconds: int) -> str:
+    """Short-lived token for one progress stream over the given lectures —
+    EventSource can only send it in the URL, so it must not be a login JWT."""
+    expire = datetime.utcnow() + timedelta(seconds=expires_seconds)
+    payload = {"sub": user_id, "purpose": "events", "lectures": lecture_ids, "exp": expire}
+    return jwt.encode(payload, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
+
+
+def decode_events_token(token: str) -> Optional[Tuple[str, List[str]]]:
+    """Returns (user id, lecture ids) an events token was issued for, or None."""
+    try:
+        payload = jwt.decode(
+            token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm]
+        )
+    except JWTError:
+        return None
+    if payload.get("purpose") != "events" or not payload.get("lectures"):
+        return None
+    return payload.get("sub"), list(payload["lectures"])
+
+
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    db: Session = Depends(get_db),
-) -> User:
+    db: AsyncSession = Depends(get_db),
+) -> Principal:
     token = credentials.credentials
     user_id = decode_token(token)
 
@@ -52,10 +88,22 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = db.query(User).filter(User.id == user_id).first()
+    principal = await principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
-    return user
+    principal = Principal(id=user.id, email=user.email, name=user.name)
+    await principal_cache.set(principal)
+    return principal
+
+
+@event.listens_for(User, "after_delete")
+def _forget_deleted_user(mapper, connection, target: User) -> None:
+    # ORM deletes only — a bulk query.delete() must call principal_cache.invalidate
+    principal_cache.invalidate(target.id)
@@ -18,6 +18,13 @@ celery_app.conf.update(
     task_acks_late=True,
     worker_prefetch_multiplier=1,   # One task at a time (Whisper is heavy)
     task_routes={
-        "app.tasks.process_lecture.*": {"queue": "lectures"},
+        # CPU-bound Whisper — low concurrency, one task per process
+        "app.tasks.process_lecture.ingest": {"queue": "transcribe"},
+        "app.tasks.process_lecture.transcribe": {"queue": "transcribe"},
+        # Network-bound Groq / YouTube — run with a high-concurrency thread pool
+        "app.tasks.process_lecture.run": {"queue": "generate"},
+        "app.tasks.process_lecture.generate": {"queue": "generate"},
+        "app.tasks.process_lecture.persist": {"queue": "generate"},
+        "app.tasks.process_lecture.link_resources": {"queue": "resources"},
     },
 )
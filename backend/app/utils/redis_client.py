@@ -0,0 +1,15 @@
+import logging
+from functools import lru_cache
+
+import redis
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache()
+def get_redis() -> redis.Redis:
+    """Shared Redis client (same instance Celery uses as its broker)."""
+    logger.debug("Connecting to Redis at %s", settings.redis_url)
+    return redis.Redis.from_url(settings.redis_url, socket_timeout=5)
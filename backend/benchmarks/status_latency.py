@@ -0,0 +1,123 @@
+"""
+/status latency while uploads are in flight.
+
+Usage (from backend/, against a running API — uvicorn app.main:app):
+    python -m benchmarks.status_latency
+    python -m benchmarks.status_latency --url http://localhost:8000 --uploads 8 --upload-mb 20
+
+Registers a throwaway user, creates one lecture to poll, then measures
+GET /api/lectures/{id}/status twice: alone, and while `--uploads` clients
+upload audio back to back. Prints p50 / p95 / p99 / max for both phases.
+Each upload queues a Celery task, so run it against a dev stack (Redis
+running; a worker is optional).
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+
+
+def _percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def _register(client: httpx.AsyncClient) -> dict:
+    r = await client.post("/api/auth/register", json={
+        "email": f"bench-{uuid.uuid4().hex[:8]}@example.com",
+        "password": "benchmark-password",
+        "name": "Benchmark",
+    })
+    r.raise_for_status()
+    return {"Authorization": f"Bearer {r.json()['token']}"}
+
+
+async def _upload(client: httpx.AsyncClient, headers: dict, payload: bytes) -> str:
+    r = await client.post(
+        "/api/lectures/upload",
+        headers=headers,
+        files={"file": ("bench.mp3", payload, "audio/mpeg")},
+        data={"title": "status latency benchmark"},
+    )
+    r.raise_for_status()
+    return r.json()["id"]
+
+
+async def _poll(client, headers, lecture_id, stop: asyncio.Event, interval: float, samples: list):
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        r = await client.get(f"/api/lectures/{lecture_id}/status", headers=headers)
+        samples.append((time.perf_counter() - t0) * 1000)
+        r.raise_for_status()
+        await asyncio.sleep(interval)
+
+
+async def _uploader(client, headers, payload, stop: asyncio.Event, created: list):
+    while not stop.is_set():
+        created.append(await _upload(client, headers, payload))
+
+
+async def _phase(client, headers, lecture_id, args, payload=None):
+    stop = asyncio.Event()
+    samples, created = [], []
+    tasks = [
+        asyncio.create_task(_poll(client, headers, lecture_id, stop, args.interval, samples))
+        for _ in range(args.pollers)
+    ]
+    if payload is not None:
+        tasks += [
+            asyncio.create_task(_uploader(client, headers, payload, stop, created))
+            for _ in range(args.uploads)
+        ]
+    await asyncio.sleep(args.seconds)
+    stop.set()
+    await asyncio.gather(*tasks)
+    return samples, created
+
+
+def _report(label: str, samples: list) -> None:
+    print(
+        f"{label:>16} | {len(samples):>6} | {statistics.median(samples):>7.1f} | "
+        f"{_percentile(samples, 95):>7.1f} | {_percentile(samples, 99):>7.1f} | {max(samples):>7.1f}"
+    )
+
+
+async def run(args) -> None:
+    limits = httpx.Limits(max_connections=args.pollers + args.uploads + 4)
+    async with httpx.AsyncClient(base_url=args.url, timeout=120, limits=limits) as client:
+        headers = await _register(client)
+        target = await _upload(client, headers, b"\0" * 1024)
+        payload = b"\0" * int(args.upload_mb * 1024 * 1024)
+
+        print(
+            f"{args.url}: {args.pollers} pollers every {args.interval * 1000:.0f} ms, "
+            f"{args.uploads} × {args.upload_mb:g} MB uploads, {args.seconds:g}s per phase"
+        )
+        print(f"{'phase':>16} | {'reqs':>6} | {'p50 ms':>7} | {'p95 ms':>7} | {'p99 ms':>7} | {'max ms':>7}")
+        print("-" * 70)
+
+        idle, _ = await _phase(client, headers, target, args)
+        _report("idle", idle)
+        loaded, created = await _phase(client, headers, target, args, payload)
+        _report(f"{len(created)} uploads", loaded)
+
+        for lecture_id in [target, *created]:
+            await client.delete(f"/api/lectures/{lecture_id}", headers=headers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--pollers", type=int, default=4)
+    parser.add_argument("--interval", type=float, default=0.05, help="Seconds between polls per poller")
+    parser.add_argument("--uploads", type=int, default=4, help="Concurrent upload clients")
+    parser.add_argument("--upload-mb", type=float, default=10)
+    parser.add_argument("--seconds", type=float, default=15, help="Duration of each phase")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Parallel transcription speed-up vs. process count.
+
+Usage (from backend/, with ffmpeg + a Whisper backend installed):
+    python -m benchmarks.transcription_speedup path/to/lecture.mp3
+    python -m benchmarks.transcription_speedup lecture.mp3 --workers 1 2 4 8 --model base
+
+Prints wall time, speed-up over 1 process and parallel efficiency for each
+worker count. Pool start-up (spawn + model load) is timed separately, since
+in production the pool stays warm between lectures.
+"""
+import argparse
+import logging
+import os
+import time
+
+from app.config import settings
+from app.services import parallel_transcriber, transcriber
+from app.services.audio import SAMPLE_RATE, load_audio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("audio", help="Audio file to transcribe")
+    parser.add_argument("--model", default=settings.whisper_model)
+    parser.add_argument(
+        "--workers", type=int, nargs="+",
+        default=sorted({1, 2, 4, os.cpu_count() or 1}),
+    )
+    parser.add_argument("--chunk-seconds", type=float, default=settings.transcribe_chunk_seconds)
+    parser.add_argument("--overlap-seconds", type=float, default=settings.transcribe_chunk_overlap_seconds)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    audio = load_audio(args.audio)
+    duration = len(audio) / SAMPLE_RATE
+    print(f"{args.audio}: {duration:.0f}s audio, model={args.model}, cores={os.cpu_count()}")
+    print(f"{'workers':>7} | {'startup':>8} | {'wall':>8} | {'RTF':>6} | {'speed-up':>8} | {'efficiency':>10}")
+    print("-" * 64)
+
+    baseline = None
+    for workers in args.workers:
+        if workers == 1:
+            t0 = time.perf_counter()
+            model = transcriber._load_model(args.model)
+            startup = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            transcriber._run_model(model, audio)
+        else:
+            t0 = time.perf_counter()
+            pool = parallel_transcriber._get_pool(args.model, workers)
+            # Wait until every process has loaded its model
+            list(pool.map(int, range(workers)))
+            startup = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            parallel_transcriber.transcribe_parallel(
+                audio, args.model, workers, args.chunk_seconds, args.overlap_seconds,
+            )
+        wall = time.perf_counter() - t0
+
+        baseline = baseline or wall
+        speedup = baseline / wall
+        print(
+            f"{workers:>7} | {startup:>7.1f}s | {wall:>7.1f}s | {wall / duration:>6.2f} | "
+            f"{speedup:>7.2f}x | {speedup / workers:>9.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
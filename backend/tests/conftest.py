@@ -0,0 +1,99 @@
+"""
+Shared fixtures. Tests run against a throwaway SQLite file — no Postgres,
+Redis, S3, Groq or YouTube needed. The environment is set before anything
+under app/ is imported, since Settings and the engines are built at import.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+_DB_PATH = Path(tempfile.mkdtemp(prefix="lectureiq-tests-")) / "test.db"
+
+os.environ.update({
+    "APP_ENV": "test",
+    "DATABASE_URL": f"sqlite:///{_DB_PATH}",
+    "LLM_CACHE_BACKEND": "off",
+    "AUTH_CACHE_BACKEND": "off",
+    "YOUTUBE_CACHE_BACKEND": "off",
+    "STORAGE_BACKEND": "local",
+})
+for _name, _value in {
+    "APP_SECRET_KEY": "test-secret",
+    "JWT_SECRET_KEY": "test-jwt-secret",
+    "REDIS_URL": "redis://localhost:6379/15",
+    "CELERY_BROKER_URL": "redis://localhost:6379/15",
+    "CELERY_RESULT_BACKEND": "redis://localhost:6379/15",
+    "AWS_ACCESS_KEY_ID": "your_aws_access_key",
+    "AWS_SECRET_ACCESS_KEY": "your_aws_secret_key",
+    "S3_BUCKET_NAME": "test-bucket",
+    "GROQ_API_KEY": "test-groq-key",
+    "YOUTUBE_API_KEY": "your_youtube_api_key",
+}.items():
+    os.environ.setdefault(_name, _value)
+
+import pytest  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import Lecture, User  # noqa: E402
+from app.models.lecture import ProcessingStatus  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def fresh_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def lecture(db):
+    """A user with one uploaded lecture; returns the lecture's id."""
+    user = User(email="student@example.com", password_hash="x", name="Student")
+    db.add(user)
+    db.flush()
+    lec = Lecture(user_id=user.id, title="Trees", s3_key="uploads/trees.mp3", status=ProcessingStatus.PROCESSING)
+    db.add(lec)
+    db.commit()
+    return lec.id
+
+
+class StatementCounter:
+    """Counts SQL statements and commits on a sync engine while active."""
+
+    def __init__(self, sync_engine):
+        self.engine = sync_engine
+        self.statements = []
+        self.commits = 0
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def _on_commit(self, conn):
+        self.commits += 1
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        event.listen(self.engine, "commit", self._on_commit)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+        event.remove(self.engine, "commit", self._on_commit)
+
+
+@pytest.fixture
+def count_statements():
+    return StatementCounter
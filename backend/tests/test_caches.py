@@ -0,0 +1,94 @@
+"""
+Service caches on the shared CountingCache base: counting, TTL + LRU
+eviction, failures degrading to misses, and what is worth caching.
+"""
+import asyncio
+
+import pytest
+
+from app.services.cache_base import CountingCache
+from app.services.llm_cache import LLMCache
+from app.services.principal_cache import Principal, PrincipalCache
+from app.services.youtube_cache import YouTubeCache
+
+VIDEO = {"type": "youtube", "title": "BSTs", "url": "https://youtu.be/x", "topic": "BST"}
+
+
+def test_local_map_is_lru_and_expires():
+    cache = CountingCache(ttl_seconds=10, max_entries=2)
+    cache._set_local("a", 1)
+    cache._set_local("b", 2)
+    assert cache._get_local("a") == 1   # touch "a" — "b" is now the oldest
+    cache._set_local("c", 3)
+    assert (cache._get_local("a"), cache._get_local("b"), cache._get_local("c")) == (1, None, 3)
+
+    expired = CountingCache(ttl_seconds=-1, max_entries=2)
+    expired._set_local("a", 1)
+    assert expired._get_local("a") is None
+
+
+def test_youtube_cache_counts_and_respells_topic():
+    cache = YouTubeCache(ttl_seconds=60, max_entries=10)
+    assert cache.get("Binary Search Tree", 2) is None
+    cache.set("Binary Search Tree", 2, [VIDEO])
+
+    hit = cache.get("binary  search tree", 2)
+    assert hit == [{**VIDEO, "topic": "binary  search tree"}]
+    assert cache.stats() == {"backend": "memory", "hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_youtube_cache_skips_empty_results():
+    cache = YouTubeCache(ttl_seconds=60, max_entries=10)
+    cache.set("obscure topic", 2, [])
+    assert cache.get("obscure topic", 2) is None
+
+
+@pytest.mark.parametrize("cache", [YouTubeCache(60, 10), LLMCache(60, 10)])
+def test_backend_failure_is_a_miss(cache, monkeypatch, caplog):
+    def broken(*args):
+        raise ConnectionError("store down")
+
+    monkeypatch.setattr(cache, "_get", broken)
+    monkeypatch.setattr(cache, "_set", broken)
+    if isinstance(cache, YouTubeCache):
+        cache.set("topic", 2, [VIDEO])
+        assert cache.get("topic", 2) is None
+    else:
+        cache.set("key", "content", tokens=5)
+        assert cache.get("key") is None
+    assert cache.stats()["misses"] == 1
+    assert "store down" in caplog.text
+
+
+def test_llm_cache_counts_saved_tokens(monkeypatch):
+    cache = LLMCache(60, 10)
+    monkeypatch.setattr(cache, "_get", lambda key: {"content": "x", "tokens": 120})
+    assert cache.get("key") == "x"
+    assert cache.stats() == {"backend": "off", "hits": 1, "misses": 0, "hit_rate": 1.0, "saved_tokens": 120}
+
+
+def test_principal_cache_set_get_invalidate():
+    cache = PrincipalCache(ttl_seconds=60, max_entries=10)
+    alice = Principal(id="u1", email="a@example.com", name="Alice")
+
+    assert asyncio.run(cache.get("u1")) is None
+    asyncio.run(cache.set(alice))
+    assert asyncio.run(cache.get("u1")) == alice
+    cache.invalidate("u1")
+    assert asyncio.run(cache.get("u1")) is None
+    assert cache.stats() == {"backend": "memory", "hits": 1, "misses": 2, "hit_rate": 0.333, "entries": 0}
+
+
+def test_principal_cache_survives_shared_layer_outage(monkeypatch, caplog):
+    cache = PrincipalCache(ttl_seconds=60, max_entries=10)
+    alice = Principal(id="u1", email="a@example.com", name="Alice")
+
+    async def down(*args):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(cache, "_get_shared", down)
+    monkeypatch.setattr(cache, "_set_shared", down)
+    assert asyncio.run(cache.get("u1")) is None
+    asyncio.run(cache.set(alice))
+    assert asyncio.run(cache.get("u1")) == alice   # local layer still answers
+    assert "redis down" in caplog.text
@@ -0,0 +1,153 @@
+"""
+GET /api/lectures/{id} must run a fixed number of queries however many
+flashcards, MCQs and resources the lecture has (no per-row lazy loads).
+"""
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import async_engine
+from app.main import app
+from app.models import MCQ, Flashcard, Lecture, LectureBundle, Note, Resource, Transcript
+from app.models.lecture import ProcessingStatus
+from app.services.lecture_bundle import BUNDLED_SECTIONS, bundle_key
+from app.utils.auth import create_access_token
+
+# 1 users lookup (auth cache off) + lecture/transcript/note join + one
+# selectin each for flashcards, MCQs and resources
+DETAIL_QUERIES = 5
+
+
+def _complete(db, lecture_id: str, n: int) -> str:
+    lec = db.get(Lecture, lecture_id)
+    lec.status = ProcessingStatus.COMPLETED
+    lec.progress = 100
+    lec.processed_at = datetime.utcnow()
+    db.add(Transcript(
+        lecture_id=lecture_id,
+        full_text="text",
+        segments=[{"start": 0.0, "end": 1.0, "text": "text"}],
+        language="en",
+    ))
+    db.add(Note(lecture_id=lecture_id, content="## Notes", key_concepts=["heap"]))
+    for i in range(n):
+        db.add(Flashcard(lecture_id=lecture_id, question=f"Q{i}", answer="A", order=i))
+        db.add(MCQ(
+            lecture_id=lecture_id, question=f"M{i}", options=["a", "b", "c", "d"],
+            correct_index=0, explanation="e", order=i,
+        ))
+        db.add(Resource(lecture_id=lecture_id, type="documentation", title=f"R{i}", url=f"https://example.com/{i}"))
+    db.commit()
+    return lec.user_id
+
+
+@pytest.mark.parametrize("n", [1, 25])
+def test_detail_query_count_is_constant(db, lecture, count_statements, n):
+    user_id = _complete(db, lecture, n)
+    client = TestClient(app)
+    headers = {
+        "Authorization": f"Bearer {create_access_token(user_id)}",
+        "Accept-Encoding": "identity",   # build from the tables, not the gzip bundle
+    }
+
+    with count_statements(async_engine.sync_engine) as counted:
+        r = client.get(f"/api/lectures/{lecture}", headers=headers)
+
+    assert r.status_code == 200
+    body = r.json()
+    assert len(body["flashcards"]) == len(body["mcqs"]) == len(body["resources"]) == n
+    assert [c["question"] for c in body["flashcards"]] == [f"Q{i}" for i in range(n)]
+    assert len(counted.statements) == DETAIL_QUERIES, counted.statements
+
+
+STUDY_VIEW = "notes,flashcards,mcqs,resources"   # what LectureDetailPage requests
+
+
+def _get(client, lecture_id: str, user_id: str, encoding: str, include=None, etag=None):
+    headers = {"Authorization": f"Bearer {create_access_token(user_id)}", "Accept-Encoding": encoding}
+    if etag:
+        headers["If-None-Match"] = etag
+    params = {} if include is None else {"include": include}
+    return client.get(f"/api/lectures/{lecture_id}", params=params, headers=headers)
+
+
+@pytest.mark.parametrize("include", [None, STUDY_VIEW])
+def test_bundle_written_on_first_read_then_sent_as_stored(db, lecture, count_statements, include):
+    user_id = _complete(db, lecture, 3)
+    client = TestClient(app)
+
+    first = _get(client, lecture, user_id, "gzip", include)
+    assert first.headers["content-encoding"] == "gzip"
+    # Both stored variants are written, whichever one was asked for
+    assert {b.sections for b in db.query(LectureBundle)} == {bundle_key(s) for s in BUNDLED_SECTIONS}
+
+    with count_statements(async_engine.sync_engine) as counted:
+        second = _get(client, lecture, user_id, "gzip", include)
+
+    # users lookup + the bundle row — no child tables
+    assert len(counted.statements) == 2, counted.statements
+    assert second.json() == first.json()
+    assert ("transcript" in second.json()) == (include is None)
+    assert len(second.json()["flashcards"]) == 3
+
+
+def test_unbundled_subset_is_built_from_tables(db, lecture):
+    user_id = _complete(db, lecture, 2)
+    r = _get(TestClient(app), lecture, user_id, "gzip", "notes")
+
+    assert "content-encoding" not in r.headers
+    assert set(r.json()) >= {"notes", "key_concepts"} and "flashcards" not in r.json()
+    assert db.query(LectureBundle).count() == 0
+
+
+# ── ETags per content coding ───────────────────────────────────────────────
+
+@pytest.mark.parametrize("encoding", ["gzip", "identity"])
+def test_etag_revalidates_to_304(db, lecture, encoding):
+    user_id = _complete(db, lecture, 2)
+    client = TestClient(app)
+
+    first = _get(client, lecture, user_id, encoding)
+    assert first.headers.get("content-encoding") == ("gzip" if encoding == "gzip" else None)
+    etag = first.headers["etag"]
+
+    again = _get(client, lecture, user_id, encoding, etag=etag)
+    assert again.status_code == 304
+    assert again.headers["etag"] == etag
+
+
+def test_etag_differs_per_coding_sent(db, lecture):
+    user_id = _complete(db, lecture, 2)
+    client = TestClient(app)
+
+    identity = _get(client, lecture, user_id, "identity").headers["etag"]
+    gzipped = _get(client, lecture, user_id, "gzip").headers["etag"]
+    assert identity != gzipped
+    # Sent as identity to a gzip-capable client (no bundle for this subset) —
+    # so it must carry the identity ETag
+    subset_gzip_client = _get(client, lecture, user_id, "gzip", include="notes")
+    assert "content-encoding" not in subset_gzip_client.headers
+    assert subset_gzip_client.headers["etag"] == _get(client, lecture, user_id, "identity", include="notes").headers["etag"]
+
+
+def test_identity_copy_stays_fresh_once_bundle_exists(db, lecture):
+    user_id = _complete(db, lecture, 2)
+    client = TestClient(app)
+    etag = _get(client, lecture, user_id, "identity").headers["etag"]
+    _get(client, lecture, user_id, "gzip")   # writes the bundle
+
+    r = _get(client, lecture, user_id, "gzip", etag=etag)
+    assert r.status_code == 304 and r.headers["etag"] == etag
+
+
+def test_identity_fallback_carries_identity_etag(db, lecture, monkeypatch):
+    from app.api import lectures as api
+
+    user_id = _complete(db, lecture, 2)
+    client = TestClient(app)
+    monkeypatch.setattr(api, "write_bundle", lambda session, lec: [])   # bundle write didn't happen
+
+    r = _get(client, lecture, user_id, "gzip")
+    assert "content-encoding" not in r.headers
+    assert r.headers["etag"] == _get(client, lecture, user_id, "identity").headers["etag"]
@@ -0,0 +1,117 @@
+"""
+Persistence round trip for the last two pipeline stages: bulk writes,
+one commit per stage, and re-processing that replaces rather than appends.
+"""
+import pytest
+
+from app.database import engine
+from app.models import Flashcard, Lecture, MCQ, PipelineCheckpoint, Resource
+from app.models.lecture import ProcessingStatus
+from app.models.pipeline_checkpoint import PipelineStage
+from app.services.lecture_bundle import load_bundle
+from app.tasks import process_lecture as pl
+from app.tasks.checkpoints import save_checkpoint
+
+
+def _materials(n_cards: int, n_mcqs: int, tag: str = "") -> dict:
+    return {
+        PipelineStage.CONCEPTS: ["binary search tree", "heap"],
+        PipelineStage.NOTES: f"## Notes {tag}",
+        PipelineStage.FLASHCARDS: [
+            {"question": f"Q{i}{tag}", "answer": "A"} for i in range(n_cards)
+        ],
+        PipelineStage.MCQS: [
+            {"question": f"M{i}{tag}", "options": ["a", "b", "c", "d"], "correct_index": 1, "explanation": "e"}
+            for i in range(n_mcqs)
+        ],
+    }
+
+
+def _checkpoint(db, lecture_id: str, materials: dict) -> None:
+    for stage, data in materials.items():
+        save_checkpoint(db, lecture_id, stage, data)
+    db.commit()
+
+
+def _resources(n: int):
+    return [
+        {"type": "documentation", "title": f"Doc {i}", "url": f"https://example.com/{i}", "topic": "heap"}
+        for i in range(n)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch):
+    monkeypatch.setattr(pl, "publish_progress", lambda *a, **k: None)
+    monkeypatch.setattr(pl, "get_resources_for_topics", lambda topics: _resources(3))
+
+
+@pytest.mark.parametrize("n_cards,n_mcqs", [(2, 1), (15, 10)])
+def test_persist_is_one_commit_and_row_count_independent(db, lecture, count_statements, n_cards, n_mcqs):
+    _checkpoint(db, lecture, _materials(n_cards, n_mcqs))
+
+    with count_statements(engine) as counted:
+        pl.persist_materials_stage(lecture)
+
+    assert counted.commits == 1
+    # checkpoints SELECT, 3 DELETEs, 3 bulk INSERTs, progress UPDATE
+    assert len(counted.statements) == 8
+    db.expire_all()
+    assert db.query(Flashcard).filter_by(lecture_id=lecture).count() == n_cards
+    assert db.query(MCQ).filter_by(lecture_id=lecture).count() == n_mcqs
+    assert db.get(Lecture, lecture).progress == pl.GENERATION_END
+
+
+def test_link_resources_completes_in_one_commit(db, lecture, count_statements):
+    _checkpoint(db, lecture, _materials(3, 2))
+    pl.persist_materials_stage(lecture)
+
+    with count_statements(engine) as counted:
+        pl.link_resources_stage(lecture)
+
+    assert counted.commits == 1
+    db.expire_all()
+    lec = db.get(Lecture, lecture)
+    assert lec.status == ProcessingStatus.COMPLETED and lec.progress == 100
+    assert db.query(Resource).filter_by(lecture_id=lecture).count() == 3
+    assert db.query(PipelineCheckpoint).filter_by(lecture_id=lecture).count() == 0
+    assert load_bundle(db, lecture, lec.user_id) is not None
+
+
+def test_reprocess_replaces_artifacts(db, lecture, monkeypatch):
+    _checkpoint(db, lecture, _materials(5, 4, tag="-v1"))
+    pl.persist_materials_stage(lecture)
+    pl.link_resources_stage(lecture)
+
+    # Second run produces fewer, different items
+    monkeypatch.setattr(pl, "get_resources_for_topics", lambda topics: _resources(1))
+    _checkpoint(db, lecture, _materials(2, 1, tag="-v2"))
+    pl.persist_materials_stage(lecture)
+    pl.link_resources_stage(lecture)
+
+    db.expire_all()
+    cards = db.query(Flashcard).filter_by(lecture_id=lecture).order_by(Flashcard.order).all()
+    assert [c.question for c in cards] == ["Q0-v2", "Q1-v2"]
+    assert [m.question for m in db.query(MCQ).filter_by(lecture_id=lecture)] == ["M0-v2"]
+    assert db.query(Resource).filter_by(lecture_id=lecture).count() == 1
+    lec = db.get(Lecture, lecture)
+    assert lec.note.content == "## Notes -v2"
+    assert lec.status == ProcessingStatus.COMPLETED
+    assert load_bundle(db, lecture, lec.user_id) is not None
+
+
+def test_failed_bundle_write_still_completes(db, lecture, monkeypatch):
+    from sqlalchemy import text
+
+    def broken_bundle(session, lec, commit=True):
+        session.execute(text("INSERT INTO no_such_table VALUES (1)"))
+
+    monkeypatch.setattr(pl, "write_bundle", broken_bundle)
+    _checkpoint(db, lecture, _materials(3, 2))
+    pl.persist_materials_stage(lecture)
+    pl.link_resources_stage(lecture)
+
+    db.expire_all()
+    lec = db.get(Lecture, lecture)
+    assert lec.status == ProcessingStatus.COMPLETED
+    assert db.query(Resource).filter_by(lecture_id=lecture).count() == 3
@@ -0,0 +1,116 @@
+"""
+Progress streams: scoped stream tokens, and one SSE connection carrying
+several lectures until each reaches a terminal status.
+"""
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import lectures as api
+from app.main import app
+from app.models import Lecture, User
+from app.models.lecture import ProcessingStatus
+from app.services.progress_events import progress_broadcaster
+from app.utils.auth import create_access_token, create_events_token, decode_token
+
+
+@pytest.fixture(autouse=True)
+def no_redis(monkeypatch):
+    async def idle():
+        await asyncio.Event().wait()
+
+    async def unavailable(lecture_id):
+        raise ConnectionError("no redis in tests")
+
+    monkeypatch.setattr(progress_broadcaster, "_listen", idle)
+    monkeypatch.setattr(progress_broadcaster, "snapshot", unavailable)
+
+
+def _events(body: str) -> list:
+    return [json.loads(line[len("data: "):]) for line in body.splitlines() if line.startswith("data: ")]
+
+
+def _second_lecture(db, lecture_id: str, status: ProcessingStatus) -> str:
+    lec = db.get(Lecture, lecture_id)
+    other = Lecture(user_id=lec.user_id, title="Graphs", s3_key="uploads/graphs.mp3", status=status, progress=100)
+    db.add(other)
+    db.commit()
+    return other.id
+
+
+def test_stream_url_needs_owned_lectures(db, lecture):
+    user_id = db.get(Lecture, lecture).user_id
+    stranger = User(email="other@example.com", password_hash="x", name="Other")
+    db.add(stranger)
+    db.commit()
+    client = TestClient(app)
+
+    def issue(as_user, ids):
+        headers = {"Authorization": f"Bearer {create_access_token(as_user)}"}
+        return client.post("/api/lectures/events/token", json={"lecture_ids": ids}, headers=headers)
+
+    assert issue(user_id, [lecture]).status_code == 200
+    assert issue(stranger.id, [lecture]).status_code == 404
+    assert issue(user_id, [lecture, "no-such-lecture"]).status_code == 404
+    assert issue(user_id, []).status_code == 422
+
+
+def test_login_jwt_is_not_a_stream_token(db, lecture):
+    user_id = db.get(Lecture, lecture).user_id
+    client = TestClient(app)
+
+    r = client.get("/api/lectures/events", params={"token": create_access_token(user_id)})
+    assert r.status_code == 401
+    # …and a stream token can't be used as a login session either
+    assert decode_token(create_events_token(user_id, [lecture], 60)) is None
+
+
+def test_one_stream_for_several_lectures(db, lecture):
+    lec = db.get(Lecture, lecture)
+    lec.status, lec.progress = ProcessingStatus.FAILED, 40
+    db.commit()
+    done = _second_lecture(db, lecture, ProcessingStatus.COMPLETED)
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {create_access_token(lec.user_id)}"}
+
+    url = client.post(
+        "/api/lectures/events/token", json={"lecture_ids": [lecture, done]}, headers=headers,
+    ).json()["url"]
+    with client.stream("GET", url) as r:
+        body = "".join(r.iter_text())
+
+    events = _events(body)
+    assert {e["id"]: e["status"] for e in events} == {lecture: "failed", done: "completed"}
+    assert all("user_id" not in e for e in events)
+
+
+def test_stream_waits_for_every_lecture(monkeypatch):
+    monkeypatch.setattr(api, "SSE_KEEPALIVE_SECONDS", 0.05)
+    stored = {"b": {"id": "b", "status": "completed", "progress": 100, "error_message": None, "user_id": "u"}}
+
+    async def snapshot(lecture_id):
+        return stored.get(lecture_id)
+
+    monkeypatch.setattr(api, "_progress_snapshot", snapshot)
+
+    class Connected:
+        async def is_disconnected(self):
+            return False
+
+    async def run():
+        queue = asyncio.Queue()
+        snapshots = {
+            "a": {"id": "a", "status": "processing", "progress": 10, "error_message": None, "user_id": "u"},
+            "b": {"id": "b", "status": "processing", "progress": 50, "error_message": None, "user_id": "u"},
+        }
+        # "a" arrives over pub/sub; "b"'s completion was missed and is found on keepalive
+        queue.put_nowait({"id": "a", "status": "processing", "progress": 60, "error_message": None})
+        queue.put_nowait({"id": "a", "status": "completed", "progress": 100, "error_message": None})
+        return [chunk async for chunk in api._progress_stream(Connected(), queue, snapshots)]
+
+    events = _events("".join(asyncio.run(asyncio.wait_for(run(), 5))))
+    assert [(e["id"], e["progress"]) for e in events] == [
+        ("a", 10), ("b", 50), ("a", 60), ("a", 100), ("b", 100),
+    ]
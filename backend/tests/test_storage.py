@@ -0,0 +1,184 @@
+"""
+StorageService against a stubbed S3 client: downloads through s3transfer
+(so its ExtraArgs whitelist applies), the audio cache in front of it, and
+the streaming writers' commit / abort paths.
+"""
+import asyncio
+import hashlib
+import io
+
+import boto3
+import pytest
+from botocore.response import StreamingBody
+from botocore.stub import Stubber
+from fastapi import HTTPException, UploadFile
+
+from app.config import settings
+from app.services import storage
+from app.services.audio_cache import AudioCache
+from app.services.storage import AudioWriter, StorageService, _LocalAudioWriter, _S3AudioWriter
+
+AUDIO = b"ID3" + bytes(range(256)) * 40
+ETAG = hashlib.md5(AUDIO).hexdigest()
+KEY = "lectures/abc.mp3"
+
+
+@pytest.fixture
+def s3():
+    client = boto3.client(
+        "s3", region_name="us-east-1",
+        aws_access_key_id="test", aws_secret_access_key="test",
+    )
+    with Stubber(client) as stub:
+        yield client, stub
+        stub.assert_no_pending_responses()
+
+
+def _service(client, cache=None) -> StorageService:
+    service = StorageService.__new__(StorageService)
+    service.backend = "s3"
+    service._s3 = client
+    service.audio_cache = cache
+    return service
+
+
+def _head(stub, version_id=None, params=None):
+    response = {"ETag": f'"{ETAG}"', "ContentLength": len(AUDIO)}
+    if version_id:
+        response["VersionId"] = version_id
+    stub.add_response("head_object", response, params or {"Bucket": settings.s3_bucket_name, "Key": KEY})
+
+
+def _get(stub, params):
+    body = StreamingBody(io.BytesIO(AUDIO), len(AUDIO))
+    stub.add_response(
+        "get_object",
+        {"Body": body, "ETag": f'"{ETAG}"', "ContentLength": len(AUDIO)},
+        params,
+    )
+
+
+def test_download_pins_version(s3, tmp_path):
+    client, stub = s3
+    pinned = {"Bucket": settings.s3_bucket_name, "Key": KEY, "VersionId": "v2"}
+    _head(stub, "v2", pinned)                         # s3transfer's own size lookup
+    _get(stub, pinned)
+    dest = tmp_path / "audio.mp3"
+
+    _service(client)._download(KEY, str(dest), "v2")
+
+    assert dest.read_bytes() == AUDIO
+
+
+def test_get_local_path_fills_then_hits_cache(s3, tmp_path):
+    client, stub = s3
+    service = _service(client, AudioCache(str(tmp_path / "cache"), 10 * 1024 * 1024))
+    _head(stub)                                       # get_local_path
+    _head(stub)                                       # s3transfer
+    _get(stub, {"Bucket": settings.s3_bucket_name, "Key": KEY})
+
+    path = service.get_local_path(KEY)
+
+    assert open(path, "rb").read() == AUDIO
+    assert service.is_cached_path(path)
+
+    _head(stub)                                       # second call: HEAD only
+    assert service.get_local_path(KEY) == path
+
+
+# ── Streaming writers ──────────────────────────────────────────────────────
+
+def test_incomplete_writer_fails_at_construction():
+    class NoAbort(AudioWriter):
+        def write(self, chunk):
+            pass
+
+        def commit(self):
+            return "key"
+
+    with pytest.raises(TypeError):
+        NoAbort()
+
+
+def test_local_writer_commit_and_abort(tmp_path):
+    writer = _LocalAudioWriter(tmp_path / "a.mp3")
+    writer.write(b"abc")
+    writer.write(b"def")
+    assert writer.commit() == str((tmp_path / "a.mp3").resolve())
+    assert (tmp_path / "a.mp3").read_bytes() == b"abcdef"
+    assert writer.bytes_written == 6
+
+    writer = _LocalAudioWriter(tmp_path / "b.mp3")
+    writer.write(b"abc")
+    writer.abort()
+    writer.abort()   # idempotent
+    assert list(tmp_path.iterdir()) == [tmp_path / "a.mp3"]
+
+
+def _s3_key(**extra):
+    return {"Bucket": settings.s3_bucket_name, "Key": KEY, **extra}
+
+
+def test_s3_writer_small_file_is_one_put(s3):
+    client, stub = s3
+    stub.add_response("put_object", {"ETag": '"x"'}, _s3_key(
+        Body=b"abc", ContentType="audio/mp3", ServerSideEncryption="AES256",
+    ))
+    writer = _S3AudioWriter(client, KEY, "audio/mp3")
+    writer.write(b"abc")
+    assert writer.commit() == KEY
+
+
+def test_s3_writer_multipart_commit(s3, monkeypatch):
+    client, stub = s3
+    monkeypatch.setattr(storage, "S3_PART_SIZE", 4)
+    stub.add_response("create_multipart_upload", {"UploadId": "u1"}, _s3_key(
+        ContentType="audio/mp3", ServerSideEncryption="AES256",
+    ))
+    stub.add_response("upload_part", {"ETag": '"p1"'}, _s3_key(UploadId="u1", PartNumber=1, Body=b"abcd"))
+    stub.add_response("upload_part", {"ETag": '"p2"'}, _s3_key(UploadId="u1", PartNumber=2, Body=b"ef"))
+    stub.add_response("complete_multipart_upload", {}, _s3_key(
+        UploadId="u1",
+        MultipartUpload={"Parts": [{"PartNumber": 1, "ETag": '"p1"'}, {"PartNumber": 2, "ETag": '"p2"'}]},
+    ))
+    writer = _S3AudioWriter(client, KEY, "audio/mp3")
+    writer.write(b"abcdef")
+    assert writer.commit() == KEY
+
+
+def test_upload_over_the_limit_aborts_s3_multipart(s3, monkeypatch):
+    from app.api import lectures as api
+
+    client, stub = s3
+    monkeypatch.setattr(storage, "S3_PART_SIZE", 4)
+    monkeypatch.setattr(api, "UPLOAD_CHUNK_BYTES", 4)
+    monkeypatch.setattr(api, "MAX_FILE_SIZE_BYTES", 10)
+    monkeypatch.setattr(api, "storage_service", _service(client))
+    stub.add_response("create_multipart_upload", {"UploadId": "u1"}, _s3_key(
+        ContentType="audio/mp3", ServerSideEncryption="AES256",
+    ))
+    stub.add_response("upload_part", {"ETag": '"p1"'}, _s3_key(UploadId="u1", PartNumber=1, Body=b"0123"))
+    stub.add_response("upload_part", {"ETag": '"p2"'}, _s3_key(UploadId="u1", PartNumber=2, Body=b"4567"))
+    stub.add_response("abort_multipart_upload", {}, _s3_key(UploadId="u1"))
+
+    upload = UploadFile(io.BytesIO(b"0123456789AB"), filename="abc.mp3")
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(api._stream_to_storage(upload, "abc", "mp3"))
+    assert exc.value.status_code == 413
+
+
+def test_upload_over_the_limit_leaves_no_local_file(tmp_path, monkeypatch):
+    from app.api import lectures as api
+
+    monkeypatch.setattr(storage, "UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr(api, "UPLOAD_CHUNK_BYTES", 4)
+    monkeypatch.setattr(api, "MAX_FILE_SIZE_BYTES", 10)
+    local = StorageService.__new__(StorageService)
+    local.backend = "local"
+    monkeypatch.setattr(api, "storage_service", local)
+
+    upload = UploadFile(io.BytesIO(b"0123456789AB"), filename="abc.mp3")
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(api._stream_to_storage(upload, "abc", "mp3"))
+    assert exc.value.status_code == 413
+    assert list(tmp_path.iterdir()) == []
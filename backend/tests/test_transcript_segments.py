@@ -0,0 +1,107 @@
+"""
+GET /api/lectures/{id}/transcript/segments: time windows, paging, the
+legacy backfill, and that seeking never reads the transcript's text.
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import async_engine
+from app.main import app
+from app.models import Lecture, Transcript, TranscriptSegment, User
+from app.utils.auth import create_access_token
+
+# 10s segments 0–10, 10–20, ... 90–100, plus one long VAD-stretched segment
+SEGMENTS = [{"start": i * 10.0, "end": i * 10.0 + 10.0, "text": f"s{i}"} for i in range(10)]
+LONG = {"start": 100.0, "end": 400.0, "text": "long"}
+
+
+def _transcript(db, lecture_id: str, rows: bool = True) -> str:
+    segments = SEGMENTS + [LONG]
+    transcript = Transcript(lecture_id=lecture_id, full_text="text", segments=segments, language="en")
+    db.add(transcript)
+    db.flush()
+    if rows:
+        db.add_all(
+            TranscriptSegment(transcript_id=transcript.id, position=i, **seg)
+            for i, seg in enumerate(segments)
+        )
+    db.commit()
+    return db.get(Lecture, lecture_id).user_id
+
+
+def _get(lecture_id: str, user_id: str, **params):
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {create_access_token(user_id)}"}
+    return client.get(f"/api/lectures/{lecture_id}/transcript/segments", params=params, headers=headers)
+
+
+def _texts(body: dict) -> list:
+    return [s["text"] for s in body["segments"]]
+
+
+def test_time_window_includes_overlapping_segments(db, lecture):
+    user_id = _transcript(db, lecture)
+
+    body = _get(lecture, user_id, **{"from": 15, "to": 35}).json()
+    assert _texts(body) == ["s1", "s2", "s3"]
+    assert body["total"] is None and body["page"] is None and not body["has_more"]
+
+    # Starts long before the window but still covers it
+    assert _texts(_get(lecture, user_id, **{"from": 300, "to": 310}).json()) == ["long"]
+    # Touching at a boundary is not overlapping: [from, to)
+    assert _texts(_get(lecture, user_id, **{"from": 20, "to": 30}).json()) == ["s2"]
+
+
+def test_time_window_limit_sets_has_more(db, lecture):
+    user_id = _transcript(db, lecture)
+    body = _get(lecture, user_id, **{"from": 0, "limit": 4}).json()
+    assert _texts(body) == ["s0", "s1", "s2", "s3"]
+    assert body["has_more"]
+
+
+def test_inverted_window_is_400(db, lecture):
+    user_id = _transcript(db, lecture)
+    assert _get(lecture, user_id, **{"from": 30, "to": 20}).status_code == 400
+
+
+def test_paging(db, lecture):
+    user_id = _transcript(db, lecture)
+
+    first = _get(lecture, user_id, page=1, limit=4).json()
+    assert _texts(first) == ["s0", "s1", "s2", "s3"]
+    assert first["total"] == 11 and first["has_more"]
+
+    last = _get(lecture, user_id, page=3, limit=4).json()
+    assert _texts(last) == ["s8", "s9", "long"]
+    assert last["total"] is None and not last["has_more"]
+
+
+def test_unknown_or_foreign_lecture_is_404(db, lecture):
+    user_id = _transcript(db, lecture)
+    other = User(email="other@example.com", password_hash="x", name="Other")
+    db.add(other)
+    db.commit()
+
+    assert _get("no-such-lecture", user_id).status_code == 404
+    assert _get(lecture, other.id).status_code == 404
+
+
+def test_legacy_transcript_is_backfilled_once(db, lecture):
+    user_id = _transcript(db, lecture, rows=False)
+
+    assert _texts(_get(lecture, user_id, **{"from": 0, "to": 20}).json()) == ["s0", "s1"]
+    assert db.query(TranscriptSegment).count() == 11
+    assert _texts(_get(lecture, user_id, page=1, limit=2).json()) == ["s0", "s1"]
+    assert db.query(TranscriptSegment).count() == 11
+
+
+@pytest.mark.parametrize("params", [{"from": 40, "to": 60}, {"page": 2, "limit": 3}])
+def test_seek_reads_only_segment_rows(db, lecture, count_statements, params):
+    user_id = _transcript(db, lecture)
+
+    with count_statements(async_engine.sync_engine) as counted:
+        assert _get(lecture, user_id, **params).status_code == 200
+
+    # users lookup, ownership check, transcript id, segment rows — no COUNT
+    assert len(counted.statements) == 4, counted.statements
+    assert not any("full_text" in s or "count(" in s.lower() for s in counted.statements)
@@ -0,0 +1,91 @@
+"""
+Voice activity detection: speech regions from frame energy, and mapping
+Whisper segments on the trimmed timeline back to the original recording.
+"""
+import numpy as np
+
+from app.services.audio import SAMPLE_RATE
+from app.services.vad import TimeMap, detect_speech, trim_silence
+
+SR = SAMPLE_RATE
+
+
+def _seconds(*spans):
+    return [(int(a * SR), int(b * SR)) for a, b in spans]
+
+
+def _speech(seconds: float) -> np.ndarray:
+    """Syllable-like bursts: 0.2s of tone, 0.1s of near silence."""
+    t = np.arange(int(seconds * SR)) / SR
+    tone = 0.3 * np.sin(2 * np.pi * 220 * t)
+    return np.where((t % 0.3) < 0.2, tone, 1e-4).astype(np.float32)
+
+
+def _silence(seconds: float) -> np.ndarray:
+    return np.full(int(seconds * SR), 1e-4, dtype=np.float32)
+
+
+# ── detect_speech ──────────────────────────────────────────────────────────
+
+def test_no_speech_finds_no_regions():
+    assert detect_speech(_silence(10)) == []
+    assert detect_speech(np.zeros(SR * 5, dtype=np.float32)) == []
+
+
+def test_all_speech_is_one_region_covering_the_recording():
+    audio = _speech(20)
+    assert detect_speech(audio) == [(0, len(audio))]
+
+
+def test_long_silence_splits_regions():
+    audio = np.concatenate([_speech(10), _silence(20), _speech(10)])
+    regions = detect_speech(audio, padding=0.4)
+
+    assert len(regions) == 2
+    (s1, e1), (s2, e2) = regions
+    assert s1 == 0 and e2 == len(audio)
+    # Cuts land inside the silence, padding kept around the speech
+    assert 10 * SR < e1 < 11 * SR
+    assert 29 * SR < s2 < 30 * SR
+
+
+# ── TimeMap.remap_segments ─────────────────────────────────────────────────
+# Regions 10–20s and 30–40s: trimmed 0–10 → 10–20, trimmed 10–20 → 30–40
+
+def _map():
+    return TimeMap(_seconds((10, 20), (30, 40)), SR)
+
+
+def test_segment_inside_a_region_is_shifted():
+    assert _map().remap_segments([{"start": 2.0, "end": 5.0, "text": " hi"}]) == [
+        {"start": 12.0, "end": 15.0, "text": " hi"},
+    ]
+
+
+def test_segment_on_a_boundary_stays_in_one_region():
+    ending = {"start": 8.0, "end": 10.0, "text": " end"}
+    starting = {"start": 10.0, "end": 12.0, "text": " start"}
+    assert _map().remap_segments([ending, starting]) == [
+        {"start": 18.0, "end": 20.0, "text": " end"},
+        {"start": 30.0, "end": 32.0, "text": " start"},
+    ]
+
+
+def test_segment_spanning_a_cut_is_split_with_its_words():
+    seg = {"start": 9.0, "end": 13.0, "text": " one two three four", "id": 7}
+    assert _map().remap_segments([seg]) == [
+        {"start": 19.0, "end": 20.0, "text": " one", "id": 7},
+        {"start": 30.0, "end": 33.0, "text": " two three four", "id": 7},
+    ]
+
+
+def test_piece_too_short_for_a_word_is_dropped():
+    seg = {"start": 9.9, "end": 14.0, "text": " hello"}
+    assert _map().remap_segments([seg]) == [{"start": 30.0, "end": 34.0, "text": " hello"}]
+
+
+def test_no_regions_leaves_segments_unchanged():
+    _, time_map = trim_silence(_silence(1), [], SR)
+    assert time_map.remap_segments([{"start": 1.234, "end": 2.0, "text": "x"}]) == [
+        {"start": 1.23, "end": 2.0, "text": "x"},
+    ]
@@ -23,12 +23,25 @@ export default function DashboardPage() {
 
     useEffect(() => { fetchLectures(); }, [fetchLectures]);
 
+    // Live progress for every active lecture over one SSE connection (one per
+    // lecture would exhaust the browser's ~6 HTTP/1.1 connections per origin);
+    // fall back to polling if the stream fails
+    const activeIds = lectures
+        .filter(l => l.status === "processing" || l.status === "uploading")
+        .map(l => l.id)
+        .join(",");
+    const [live, setLive] = useState(true);
     useEffect(() => {
-        const hasActive = lectures.some(l => l.status === "processing" || l.status === "uploading");
-        if (!hasActive) return;
+        if (!activeIds) return;
+        if (live) {
+            return lectureService.subscribeProgress(activeIds.split(","), (ev) => {
+                setLectures(p => p.map(l => l.id === ev.id ? { ...l, ...ev } : l));
+                if (ev.status === "completed" || ev.status === "failed") fetchLectures(true);
+            }, () => setLive(false));
+        }
         const t = setInterval(() => fetchLectures(true), 5000);
         return () => clearInterval(t);
-    }, [lectures, fetchLectures]);
+    }, [activeIds, live, fetchLectures]);
 
     async function handleDelete(id, title) {
         if (!window.confirm(`Delete "${title}"?`)) return;
@@ -12,6 +12,9 @@ import ResourceList from "../components/ResourceList";
 import { LectureCardSkeleton } from "../components/LoadingSkeleton";
 import { formatDuration, formatDate } from "../utils/formatters";
 
+// The transcript is the largest section — fetched only when its tab is opened
+const DETAIL_SECTIONS = "notes,flashcards,mcqs,resources";
+
 const TABS = [
     { id: "notes", label: "📝 Notes" },
     { id: "flashcards", label: "🃏 Flashcards" },
@@ -30,7 +33,7 @@ export default function LectureDetailPage() {
     const fetch = useCallback(async (silent = false) => {
         if (!silent) setLoading(true);
         try {
-            const res = await lectureService.getDetail(id);
+            const res = await lectureService.getDetail(id, DETAIL_SECTIONS);
             setLecture(res.data);
         } catch (err) {
             if (err.response?.status === 404) { toast.error("Not found."); navigate("/dashboard"); }
@@ -40,12 +43,29 @@ export default function LectureDetailPage() {
 
     useEffect(() => { fetch(); }, [fetch]);
 
+    const [transcript, setTranscript] = useState(null);
+    const completed = lecture?.status === "completed";
+    useEffect(() => {
+        if (tab !== "transcript" || !completed || transcript) return;
+        lectureService.getTranscript(id)
+            .then(res => setTranscript(res.data))
+            .catch(() => toast.error("Failed to load transcript."));
+    }, [tab, completed, transcript, id]);
+
+    // Live progress over SSE; fall back to polling if the stream fails
+    const active = !!lecture && ["processing", "uploading"].includes(lecture.status);
+    const [live, setLive] = useState(true);
     useEffect(() => {
-        if (!lecture) return;
-        if (!["processing", "uploading"].includes(lecture.status)) return;
+        if (!active) return;
+        if (live) {
+            return lectureService.subscribeProgress([id], (ev) => {
+                setLecture(prev => ({ ...prev, status: ev.status, progress: ev.progress, error_message: ev.error_message }));
+                if (ev.status === "completed" || ev.status === "failed") fetch(true);
+            }, () => setLive(false));
+        }
         const t = setInterval(() => fetch(true), 4000);
         return () => clearInterval(t);
-    }, [lecture, fetch]);
+    }, [active, live, id, fetch]);
 
     if (loading) return (
         <div className="min-h-screen" style={{ background: "#07070f" }}>
@@ -165,15 +185,15 @@ export default function LectureDetailPage() {
 
                             {tab === "transcript" && (
                                 <div className="p-6">
-                                    {lecture.transcript ? (
+                                    {transcript ? (
                                         <>
                                             <div className="flex items-center gap-4 text-xs text-gray-500 mb-4">
-                                                <span>Language: <strong className="text-neon-cyan">{lecture.transcript.language}</strong></span>
+                                                <span>Language: <strong className="text-neon-cyan">{transcript.language}</strong></span>
                                                 <span>·</span>
-                                                <span>{lecture.transcript.segments?.length} segments</span>
+                                                <span>{transcript.segments?.length} segments</span>
                                             </div>
                                             <div className="space-y-1 max-h-[60vh] overflow-y-auto pr-2">
-                                                {lecture.transcript.segments?.map((seg, i) => (
+                                                {transcript.segments?.map((seg, i) => (
                                                     <div key={i} className="flex gap-3 text-sm hover:bg-white/[0.02] rounded-lg px-2 py-1.5 group">
                                                         <span className="text-gray-700 shrink-0 w-14 text-xs pt-0.5 font-mono group-hover:text-neon-cyan transition-colors">
                                                             {formatDuration(seg.start)}
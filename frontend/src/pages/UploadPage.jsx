@@ -36,10 +36,7 @@ export default function UploadPage() {
         if (!title.trim()) { toast.error("Enter a lecture title."); return; }
         setUploading(true);
         try {
-            const form = new FormData();
-            form.append("file", file);
-            form.append("title", title.trim());
-            const res = await lectureService.upload(form, setProgress);
+            const res = await lectureService.uploadDirect(file, title.trim(), setProgress);
             toast.success("Upload complete! Processing started 🚀");
             navigate(`/lectures/${res.data.id}`);
         } catch (err) {
@@ -1,3 +1,4 @@
+import axios from "axios";
 import api from "./api";
 
 export const lectureService = {
@@ -11,15 +12,75 @@ export const lectureService = {
             },
         }),
 
+    // Direct upload: the file goes straight to storage (S3 presigned POST,
+    // or the API's local stand-in), then the API is told to start processing.
+    uploadDirect: async (file, title, onProgress) => {
+        const { data: target } = await api.post("/api/lectures/uploads", {
+            filename: file.name,
+            title,
+        });
+        const form = new FormData();
+        Object.entries(target.fields).forEach(([k, v]) => form.append(k, v));
+        form.append("file", file);   // S3 requires the file as the last field
+        await axios.post(target.url, form, {
+            onUploadProgress: (e) => {
+                if (onProgress && e.total) {
+                    onProgress(Math.round((e.loaded / e.total) * 100));
+                }
+            },
+        });
+        return api.post(`/api/lectures/${target.lecture_id}/finalize`);
+    },
+
     list: (page = 1) =>
         api.get("/api/lectures", { params: { page, limit: 20 } }),
 
-    getDetail: (id) =>
-        api.get(`/api/lectures/${id}`),
+    // include: comma-separated sections (transcript, notes, flashcards, mcqs, resources)
+    getDetail: (id, include) =>
+        api.get(`/api/lectures/${id}`, { params: include === undefined ? {} : { include } }),
+
+    getTranscript: (id) =>
+        api.get(`/api/lectures/${id}/transcript`),
 
     getStatus: (id) =>
         api.get(`/api/lectures/${id}/status`),
 
+    // Server-sent progress events (same payload as getStatus) for one or more
+    // lectures over a single connection. The stream URL carries a short-lived
+    // token scoped to these lectures. Closes itself once every lecture has
+    // completed or failed; onError lets callers fall back to polling.
+    // Returns an unsubscribe function.
+    subscribeProgress: (ids, onProgress, onError) => {
+        const pending = new Set(ids);
+        let source = null;
+        let closed = false;
+        const fail = () => {
+            if (source) source.close();
+            if (!closed && onError) onError();
+            closed = true;
+        };
+        api.post("/api/lectures/events/token", { lecture_ids: ids })
+            .then(({ data }) => {
+                if (closed) return;
+                source = new EventSource(data.url);
+                source.addEventListener("progress", (e) => {
+                    const ev = JSON.parse(e.data);
+                    onProgress(ev);
+                    if (ev.status === "completed" || ev.status === "failed") pending.delete(ev.id);
+                    if (pending.size === 0) {
+                        closed = true;
+                        source.close();
+                    }
+                });
+                source.onerror = fail;
+            })
+            .catch(fail);
+        return () => {
+            closed = true;
+            if (source) source.close();
+        };
+    },
+
     delete: (id) =>
         api.delete(`/api/lectures/${id}`),
 